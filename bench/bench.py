@@ -0,0 +1,307 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Benchmark of weechat-script-lint, with comparison to a baseline.
+
+Usage:
+
+    python bench/bench.py --baseline bench/baseline.json
+
+Each workload is run multiple times: the median and 95th percentile of
+times and the peak of memory allocated are compared to the baseline, and
+the exit code is 1 if one of them exceeds the baseline plus the tolerance.
+
+Times are normalized with a calibration loop run on the current machine,
+so that a baseline saved on a machine can be used on another one.
+"""
+
+# ruff: noqa: T201
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import pathlib
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from weechat_script_lint.lint import check_scripts, get_parser
+from weechat_script_lint.script import WeechatScript
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+SCRIPT_HEADER = """\
+# SPDX-FileCopyrightText: 2026 Some Name <some.name@example.com>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import weechat
+
+"""
+
+SCRIPT_CODE = """\
+def buffer_cb(data, buffer, args):
+    infolist = weechat.infolist_get("buffer", "", "")
+    while weechat.infolist_next(infolist):
+        name = weechat.infolist_string(infolist, "name")
+        weechat.prnt("", f"buffer: {name}")
+    weechat.infolist_free(infolist)
+    return weechat.WEECHAT_RC_OK
+
+"""
+
+# one message on each line
+SCRIPT_HITS = """\
+sys.exit(1)
+weechat.hook_modifier("irc_in_privmsg", "modifier_cb", "")
+weechat.hook_signal("*,irc_out_privmsg", "signal_cb", "")
+weechat.prnt("", "see http://www.weechat.org/")
+"""
+
+# long lines without any e-mail: worst case for the search of an e-mail
+SCRIPT_NO_EMAIL = "# " + "some.long_name-without+email" * 3 + "\n"
+
+
+def huge_file(directory: pathlib.Path) -> Callable[[], Any]:
+    """Return workload: check of a single huge script (memory-mapped).
+
+    :param directory: directory for files of the workload
+    :return: workload
+    """
+    path = directory / "huge.py"
+    path.write_text(SCRIPT_HEADER + SCRIPT_CODE * 20_000)
+    return lambda: WeechatScript(path).check()
+
+
+def tiny_files(directory: pathlib.Path) -> Callable[[], Any]:
+    """Return workload: check of many tiny scripts in a directory.
+
+    :param directory: directory for files of the workload
+    :return: workload
+    """
+    scripts_dir = directory / "tiny"
+    scripts_dir.mkdir()
+    for i in range(2_000):
+        (scripts_dir / f"script{i:04d}.py").write_text(SCRIPT_HEADER + SCRIPT_CODE)
+    args = get_parser().parse_args(["--quiet", "--recursive", str(scripts_dir)])
+    return lambda: check_scripts(args)
+
+
+def high_density(directory: pathlib.Path) -> Callable[[], Any]:
+    """Return workload: check of a script with a message on each line.
+
+    :param directory: directory for files of the workload
+    :return: workload
+    """
+    path = directory / "density.py"
+    path.write_text(SCRIPT_HEADER + SCRIPT_HITS * 5_000)
+    return lambda: WeechatScript(path).check()
+
+
+def no_email(directory: pathlib.Path) -> Callable[[], Any]:
+    """Return workload: check of a script without e-mail and long lines.
+
+    :param directory: directory for files of the workload
+    :return: workload
+    """
+    path = directory / "no_email.py"
+    path.write_text(SCRIPT_NO_EMAIL * 1_000)
+    return lambda: WeechatScript(path).check()
+
+
+WORKLOADS: dict[str, Callable[[pathlib.Path], Callable[[], Any]]] = {
+    "huge_file": huge_file,
+    "tiny_files": tiny_files,
+    "high_density": high_density,
+    "no_email": no_email,
+}
+
+
+def warm_up(directory: pathlib.Path) -> None:
+    """Check a small script, so that caches (like compiled regexes) are filled before measures.
+
+    :param directory: directory for the script
+    """
+    scripts_dir = directory / "warm_up"
+    scripts_dir.mkdir()
+    path = scripts_dir / "warm_up.py"
+    path.write_text(SCRIPT_HEADER + SCRIPT_CODE + SCRIPT_HITS)
+    WeechatScript(path).check()
+    check_scripts(get_parser().parse_args(["--quiet", str(scripts_dir)]))
+
+
+def calibrate(repeat: int = 7) -> float:
+    """Return the time of a fixed CPU-bound loop, used to normalize times.
+
+    :param repeat: number of runs
+    :return: min time, in seconds
+    """
+    data = b"some text with weechat.hook_signal\n" * 30_000
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sum(i * i for i in range(200_000))
+        re.findall(rb"hook_\w+", data)
+        times.append(time.perf_counter() - start)
+    return round(min(times), 6)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Return a percentile of values (nearest-rank method).
+
+    :param values: values
+    :param percent: percentile (from 0 to 100)
+    :return: percentile
+    """
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def run_workload(workload: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Run a workload and measure times and peak of memory allocated.
+
+    :param workload: workload
+    :param repeat: number of runs for times (memory is measured in a first
+        run, which is also a warm-up run)
+    :return: dictionary with median and 95th percentile of times (in seconds)
+        and peak of memory allocated (in bytes)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        workload()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload()
+        times.append(time.perf_counter() - start)
+    return {
+        "median": round(statistics.median(times), 6),
+        "p95": round(percentile(times, 95), 6),
+        "peak_memory": peak_memory,
+    }
+
+
+def compare(
+    name: str,
+    results: dict[str, float],
+    baseline: dict[str, float],
+    time_ratio: float,
+    args: argparse.Namespace,
+) -> list[str]:
+    """Compare results of a workload to the baseline.
+
+    :param name: name of workload
+    :param results: results of workload
+    :param baseline: results of workload in baseline
+    :param time_ratio: ratio to apply on times of baseline (calibration)
+    :param args: command-line arguments
+    :return: regressions found
+    """
+    regressions = []
+    limits = {
+        "median": baseline["median"] * time_ratio * (1 + args.tolerance),
+        "p95": baseline["p95"] * time_ratio * (1 + args.tolerance),
+        "peak_memory": baseline["peak_memory"] * (1 + args.memory_tolerance),
+    }
+    for key, limit in limits.items():
+        if results[key] > limit:
+            regressions.append(f"{name}: {key} = {results[key]:g} > {limit:g}")
+    return regressions
+
+
+def get_bench_parser() -> argparse.ArgumentParser:
+    """Return the command line parser.
+
+    :return: argument parser
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of weechat-script-lint")
+    parser.add_argument("-b", "--baseline", type=pathlib.Path, help="compare results to this baseline (JSON file)")
+    parser.add_argument("-s", "--save", type=pathlib.Path, help="save results in this file, as a new baseline")
+    parser.add_argument("-r", "--repeat", type=int, default=7, help="number of runs of each workload")
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="max increase of times, as a ratio of baseline (default: 0.3 = +30%%)",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory-tolerance",
+        type=float,
+        default=0.1,
+        help="max increase of peak memory, as a ratio of baseline (default: 0.1 = +10%%)",
+    )
+    parser.add_argument("workload", nargs="*", help=f"workloads to run: {', '.join(WORKLOADS)} (default: all)")
+    return parser
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = get_bench_parser()
+    args = parser.parse_args()
+    unknown = [name for name in args.workload if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    calibration = calibrate()
+    results: dict[str, Any] = {"calibration": calibration, "workloads": {}}
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        warm_up(pathlib.Path(tmp_dir))
+        for name in args.workload or WORKLOADS:
+            workload_dir = pathlib.Path(tmp_dir) / name
+            workload_dir.mkdir()
+            results["workloads"][name] = run_workload(WORKLOADS[name](workload_dir), args.repeat)
+    # calibration is done again, in case the load of the machine changed
+    results["calibration"] = calibration = min(calibration, calibrate())
+    time_ratio = calibration / baseline["calibration"] if baseline else 1
+    for name, workload_results in results["workloads"].items():
+        line = (
+            f"{name:<14} median: {workload_results['median']:.4f}s  p95: {workload_results['p95']:.4f}s  "
+            f"peak memory: {workload_results['peak_memory'] / 1024:.0f} KB"
+        )
+        if baseline and name in baseline["workloads"]:
+            base = baseline["workloads"][name]
+            line += f"  (median vs baseline: {workload_results['median'] / (base['median'] * time_ratio):.2f}x)"
+            regressions.extend(compare(name, workload_results, base, time_ratio, args))
+        print(line)
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
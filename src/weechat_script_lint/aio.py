@@ -0,0 +1,181 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Asyncio API: check scripts without blocking the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import TYPE_CHECKING
+
+from weechat_script_lint.script import WeechatScript
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import AsyncGenerator, AsyncIterable, Iterable
+    from concurrent.futures import Executor
+
+    from weechat_script_lint.rules import CustomRules
+    from weechat_script_lint.script import ScriptContent
+
+# default max number of scripts read and checked at the same time
+MAX_IN_FLIGHT = 8
+
+
+def check_script(  # noqa: PLR0913
+    path: pathlib.Path,
+    *,
+    ignore: str = "",
+    msg_level: str = "info",
+    use_colors: bool = True,
+    content: ScriptContent | None = None,
+    rules: CustomRules | None = None,
+) -> WeechatScript:
+    """Read and check a script (function run in the executor).
+
+    :param path: path to the script
+    :param ignore: comma-separated list of messages to ignore
+    :param msg_level: min level of messages to report
+    :param use_colors: True to use colors in output
+    :param content: content of the script (read from path if not given)
+    :param rules: custom rules to check in addition to built-in checks
+    :return: checked script
+    """
+    if rules:
+        # messages of rules are not inherited by a worker process which is
+        # not forked (start method "spawn" or "forkserver")
+        rules.register()
+    script = WeechatScript(
+        path,
+        ignore=ignore,
+        msg_level=msg_level,
+        use_colors=use_colors,
+        content=content,
+        rules=rules,
+    )
+    script.check()
+    return script
+
+
+async def lint_path(  # noqa: PLR0913
+    path: pathlib.Path,
+    *,
+    content: ScriptContent | None = None,
+    ignore: str = "",
+    msg_level: str = "info",
+    use_colors: bool = True,
+    rules: CustomRules | None = None,
+    executor: Executor | None = None,
+) -> WeechatScript:
+    """Read and check a script in an executor.
+
+    With a process pool executor, the rules and the checked script are
+    sent between processes (they must be picklable, like the content).
+
+    :param path: path to the script
+    :param content: content of the script (read from path if not given)
+    :param ignore: comma-separated list of messages to ignore
+    :param msg_level: min level of messages to report
+    :param use_colors: True to use colors in output
+    :param rules: custom rules to check in addition to built-in checks
+    :param executor: executor (None = default executor of the event loop)
+    :return: checked script
+    """
+    if rules:
+        # messages of rules are displayed in this process
+        rules.register()
+    loop = asyncio.get_running_loop()
+    check = functools.partial(
+        check_script,
+        ignore=ignore,
+        msg_level=msg_level,
+        use_colors=use_colors,
+        content=content,
+        rules=rules,
+    )
+    return await loop.run_in_executor(executor, check, path)
+
+
+async def iterate(items: Iterable[pathlib.Path] | AsyncIterable[pathlib.Path]) -> AsyncGenerator[pathlib.Path, None]:
+    """Iterate on items of an iterable or an asynchronous iterable.
+
+    :param items: iterable or asynchronous iterable
+    :return: items
+    """
+    if hasattr(items, "__aiter__"):
+        async for item in items:  # ty: ignore[not-iterable]
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def lint_paths(  # noqa: PLR0913
+    paths: Iterable[pathlib.Path] | AsyncIterable[pathlib.Path],
+    *,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    ignore: str = "",
+    msg_level: str = "info",
+    use_colors: bool = True,
+    rules: CustomRules | None = None,
+    executor: Executor | None = None,
+) -> AsyncGenerator[tuple[pathlib.Path, WeechatScript], None]:
+    """Read and check scripts in an executor, return them as soon as they are checked.
+
+    At most max_in_flight scripts are read and checked at the same time:
+    the next path is taken only when a script is checked, so that paths
+    can be produced on demand (backpressure).
+
+    If a script can not be read or checked, the exception is raised and
+    the scripts in progress are cancelled (the scripts already running
+    in the executor are not interrupted).
+
+    :param paths: paths to scripts (iterable or asynchronous iterable)
+    :param max_in_flight: max number of scripts read and checked at the
+        same time
+    :param ignore: comma-separated list of messages to ignore
+    :param msg_level: min level of messages to report
+    :param use_colors: True to use colors in output
+    :param rules: custom rules to check in addition to built-in checks
+    :param executor: executor (None = default executor of the event loop)
+    :return: tuples (path, script), in the order scripts are checked
+    """
+    if rules:
+        # messages of rules are displayed in this process
+        rules.register()
+    loop = asyncio.get_running_loop()
+    check = functools.partial(check_script, ignore=ignore, msg_level=msg_level, use_colors=use_colors, rules=rules)
+    pending: dict[asyncio.Future[WeechatScript], pathlib.Path] = {}
+    try:
+        async for path in iterate(paths):
+            while len(pending) >= max(1, max_in_flight):
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+            pending[loop.run_in_executor(executor, check, path)] = path
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
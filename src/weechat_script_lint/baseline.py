@@ -0,0 +1,155 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Baseline of known messages, to report only new messages."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any
+
+from weechat_script_lint.output import Output
+from weechat_script_lint.script import TRANSIENT_MESSAGES
+
+if TYPE_CHECKING:
+    import pathlib
+
+    from weechat_script_lint.script import WeechatScript
+
+# version of the baseline format
+BASELINE_VERSION = 1
+
+
+class BaselineError(Exception):
+    """Invalid baseline."""
+
+
+def get_key(path: pathlib.Path, root: pathlib.Path) -> str:
+    """Return the key of a script in the baseline.
+
+    :param path: path to the script
+    :param root: directory of the baseline
+    :return: path to the script relative to the directory of the baseline
+        (absolute path if the script is not in this directory)
+    """
+    absolute = path.absolute()
+    try:
+        return absolute.relative_to(root).as_posix()
+    except ValueError:
+        return absolute.as_posix()
+
+
+class Baseline:
+    """Fingerprints of known messages, by script.
+
+    A message is known if a message with the same fingerprint is in the
+    same script in the baseline; the fingerprint does not depend on the
+    line number, so known messages are still found after lines are added
+    or removed in the script.
+    """
+
+    def __init__(self, path: pathlib.Path, scripts: dict[str, dict[str, int]], digest: str = "") -> None:
+        """Initialize the baseline.
+
+        :param path: path to the baseline
+        :param scripts: fingerprints of known messages: script key ->
+            fingerprint -> number of messages
+        :param digest: digest of the baseline content
+        """
+        self.root: pathlib.Path = path.absolute().parent
+        self.scripts: dict[str, dict[str, int]] = scripts
+        self.digest: str = digest
+
+    def get_script(self, path: pathlib.Path) -> dict[str, int] | None:
+        """Return the fingerprints of known messages in a script.
+
+        :param path: path to the script
+        :return: new dictionary with fingerprint -> number of messages, None
+            if the script has no known messages
+        """
+        known = self.scripts.get(get_key(path, self.root))
+        return dict(known) if known else None
+
+
+def load_baseline(path: pathlib.Path) -> Baseline:
+    """Load a baseline from a JSON file.
+
+    :param path: path to the JSON file
+    :return: baseline
+    """
+    try:
+        content = path.read_bytes()
+        data = json.loads(content)
+    except (OSError, ValueError) as exc:
+        msg = f"unable to read baseline file {path}: {exc}"
+        raise BaselineError(msg) from exc
+    if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION:
+        msg = f"invalid baseline file {path}: unsupported version"
+        raise BaselineError(msg)
+    scripts: dict[str, dict[str, int]] = {}
+    for key, fingerprints in data.get("scripts", {}).items():
+        known = scripts.setdefault(key, {})
+        for fingerprint in fingerprints:
+            known[fingerprint] = known.get(fingerprint, 0) + 1
+    return Baseline(path, scripts, digest=hashlib.sha256(content).hexdigest())
+
+
+class BaselineWriter(Output):
+    """Write the baseline with the messages of all checked scripts (JSON)."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """Initialize the writer of baseline, written on close.
+
+        :param path: path to the baseline
+        """
+        self.path: pathlib.Path = path
+        self.root: pathlib.Path = path.absolute().parent
+        self.scripts: dict[str, list[str]] = {}
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:  # noqa: ARG002
+        """Add fingerprints of messages of a script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+        fingerprints = [
+            script.get_fingerprint(msg.msg_name, msg.line, msg.kwargs)
+            for msg in script.messages
+            if msg.msg_name not in TRANSIENT_MESSAGES
+        ]
+        if fingerprints:
+            self.scripts[get_key(path, self.root)] = sorted(fingerprints)
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:  # noqa: ARG002
+        """Write the baseline.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+        data: dict[str, Any] = {"version": BASELINE_VERSION, "scripts": dict(sorted(self.scripts.items()))}
+        new_path = self.path.with_name(f"{self.path.name}.new")
+        with new_path.open("w", encoding="utf-8") as baseline_file:
+            json.dump(data, baseline_file, ensure_ascii=False, indent=2)
+            baseline_file.write("\n")
+        new_path.replace(self.path)
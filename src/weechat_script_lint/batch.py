@@ -0,0 +1,159 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Check of small scripts in batch, with a single scan of all scripts for each check."""
+
+from __future__ import annotations
+
+import bisect
+from typing import TYPE_CHECKING, TypeVar
+
+from weechat_script_lint.script import CHECK_EXCLUDES, CHECK_REQUIRES, find_invalid_utf8
+
+if TYPE_CHECKING:
+    import re
+    from collections.abc import Generator, Iterable
+
+    from weechat_script_lint.script import WeechatScript
+
+T = TypeVar("T")
+
+# max size of a script checked in batch (bigger scripts are checked alone)
+BATCH_MAX_SCRIPT_SIZE = 64 * 1024
+
+# max number of bytes of scripts in a batch
+BATCH_SIZE = 1024 * 1024
+
+# separator before each script in a batch: the regexes of CHECK_REQUIRES
+# and CHECK_EXCLUDES match the beginning of a script with "\n"
+BATCH_SEPARATOR = b"\n"
+
+
+class ScriptBatch:
+    """Scripts concatenated in a single buffer, each one preceded by a separator."""
+
+    def __init__(self, scripts: list[WeechatScript]) -> None:
+        """Initialize the batch.
+
+        :param scripts: scripts (content must be bytes)
+        """
+        self.scripts: list[WeechatScript] = scripts
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        parts: list[bytes] = []
+        offset = 0
+        for script in scripts:
+            offset += len(BATCH_SEPARATOR)
+            self.starts.append(offset)
+            offset += len(script.script)
+            self.ends.append(offset)
+            parts += [BATCH_SEPARATOR, bytes(script.script)]
+        self.buffer: bytes = b"".join(parts)
+
+    def search(self, regex: re.Pattern[bytes]) -> dict[int, bool]:
+        """Search a regular expression in all scripts, with a single scan of the batch.
+
+        Only the first match in each script is searched. A match starting in
+        a script (or on the separator before it) and ending after the end of
+        the script is not a match in the script alone, but it could hide one:
+        the result is uncertain for this script.
+
+        :param regex: regular expression
+        :return: dict with index of scripts where the regex is found: True if
+            found in the script, False if uncertain
+        """
+        found: dict[int, bool] = {}
+        m = regex.search(self.buffer)
+        while m:
+            index = bisect.bisect_right(self.starts, m.start() + len(BATCH_SEPARATOR)) - 1
+            found[index] = m.end() <= self.ends[index]
+            m = regex.search(self.buffer, self.ends[index])
+        return found
+
+    def skip_checks(self) -> None:
+        """Set the checks skipped in each script of the batch (checks known to add no message)."""
+        skipped: list[set[str]] = [set() for _ in self.scripts]
+        for name, regex in CHECK_REQUIRES.items():
+            found = self.search(regex)
+            for index, checks in enumerate(skipped):
+                if index not in found:
+                    checks.add(name)
+        for name, regexes in CHECK_EXCLUDES.items():
+            found_all = set(range(len(self.scripts)))
+            for regex in regexes:
+                found_all.intersection_update(index for index, certain in self.search(regex).items() if certain)
+            for index in found_all:
+                skipped[index].add(name)
+        # the separator is ASCII, so if the batch is valid UTF-8, all scripts are
+        if find_invalid_utf8(self.buffer) < 0:
+            for checks in skipped:
+                checks.add("_check_utf8")
+        for script, checks in zip(self.scripts, skipped):
+            script.skipped_checks = frozenset(checks)
+
+
+def skip_checks(batch: list[tuple[T, WeechatScript]]) -> list[tuple[T, WeechatScript]]:
+    """Set the checks skipped in scripts of a batch.
+
+    :param batch: tuples (key, script)
+    :return: tuples (key, script)
+    """
+    if batch:
+        ScriptBatch([script for _, script in batch]).skip_checks()
+    return batch
+
+
+def batch_scripts(
+    tasks: Iterable[tuple[T, WeechatScript]],
+    max_bytes: int = BATCH_SIZE,
+    max_script_size: int = BATCH_MAX_SCRIPT_SIZE,
+) -> Generator[tuple[T, WeechatScript], None, None]:
+    """Group small scripts in batches, to skip checks adding no message.
+
+    For each check, a text required to add messages (see CHECK_REQUIRES
+    and CHECK_EXCLUDES) is searched once in all scripts of a batch instead
+    of once per script; the check is then skipped in scripts where it would
+    add no message. The messages are still found by the checks done on each
+    script, so the results are the same as a check of each script alone.
+
+    Scripts are returned not yet checked, in the same order as tasks; big
+    and memory-mapped scripts are returned without being in a batch.
+
+    :param tasks: tuples (key, script), the key is returned with the script
+    :param max_bytes: max number of bytes of scripts in a batch
+    :param max_script_size: max size of a script in a batch
+    :return: tuples (key, script)
+    """
+    batch: list[tuple[T, WeechatScript]] = []
+    size = 0
+    for task in tasks:
+        script = task[1]
+        if isinstance(script.script, bytes) and len(script.script) <= max_script_size:
+            batch.append(task)
+            size += len(script.script)
+            if size >= max_bytes:
+                yield from skip_checks(batch)
+                batch, size = [], 0
+        else:
+            yield from skip_checks(batch)
+            batch, size = [], 0
+            yield task
+    yield from skip_checks(batch)
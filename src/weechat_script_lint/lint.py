@@ -23,14 +23,46 @@
 
 # ruff: noqa: FBT001,FBT002,T201
 
+from __future__ import annotations
+
 import argparse
+import heapq
 import importlib.metadata
+import math
+import os
 import pathlib
+import stat
 import sys
-from collections.abc import Generator
+from itertools import chain, tee
+from typing import TYPE_CHECKING
 
-from weechat_script_lint.script import WeechatScript
+from weechat_script_lint.baseline import Baseline, BaselineError, BaselineWriter, load_baseline
+from weechat_script_lint.batch import batch_scripts
+from weechat_script_lint.manifest import Manifest
+from weechat_script_lint.observer import MetricsExporter
+from weechat_script_lint.output import OUTPUT_WRITERS, Output
+from weechat_script_lint.reader import PREFETCH_BYTES, read_scripts
+from weechat_script_lint.results import ResultsError, ResultsWriter, in_shard, merge_results_files
+from weechat_script_lint.rules import CustomRules, RulesError, load_rules
+from weechat_script_lint.sampling import SCORE_RANGES, Sampler
+from weechat_script_lint.scores import MAX_SCORE, ScoreAggregator
+from weechat_script_lint.script import MESSAGES, WeechatScript
+from weechat_script_lint.server import LanguageServer
+from weechat_script_lint.store import ResultStore
 from weechat_script_lint.utils import color, no_color
+from weechat_script_lint.worker import (
+    EXECUTORS,
+    check_in_process,
+    check_in_threads,
+    check_in_workers,
+    get_executor,
+    in_order,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+    from weechat_script_lint.observer import Observer
 
 SUPPORTED_SUFFIXES: tuple[str, ...] = (
     ".js",
@@ -50,6 +82,39 @@ STATUS_COLORS = (
 )
 
 
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard specification "K/N".
+
+    :param value: shard specification: shard number K (from 1 to N) and
+        number of shards N
+    :return: tuple (K, N)
+    """
+    try:
+        shard, num_shards = (int(number) for number in value.split("/"))
+    except ValueError:
+        shard, num_shards = 0, 0
+    if not 1 <= shard <= num_shards:
+        msg = f"invalid shard: {value} (expected K/N with 1 <= K <= N)"
+        raise argparse.ArgumentTypeError(msg)
+    return shard, num_shards
+
+
+def parse_fraction(value: str) -> float:
+    """Parse a fraction of scripts.
+
+    :param value: fraction, greater than 0 and lower than or equal to 1
+    :return: fraction
+    """
+    try:
+        fraction = float(value)
+    except ValueError:
+        fraction = 0
+    if not 0 < fraction <= 1:
+        msg = f"invalid fraction: {value} (expected a number greater than 0 and lower than or equal to 1)"
+        raise argparse.ArgumentTypeError(msg)
+    return fraction
+
+
 def get_parser() -> argparse.ArgumentParser:
     """Return the command line parser.
 
@@ -58,17 +123,92 @@ def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Static analysis tool for WeeChat scripts",
     )
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        help=(
+            "JSON file with fingerprints of known messages, which are not reported: "
+            "only new messages are displayed and counted in the return code"
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=(
+            "check small scripts in batches: the texts required by checks to add messages are searched "
+            "once in all scripts of a batch, and checks are skipped in scripts where they are not found "
+            "(results are the same)"
+        ),
+    )
     parser.add_argument(
         "-c",
         "--no-colors",
         action="store_true",
         help="do not use colors in output",
     )
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTORS,
+        default="auto",
+        help=(
+            "how to check scripts in parallel with --jobs: process = worker processes, "
+            "thread = worker threads (scripts are not copied between processes, checks run in parallel "
+            "only on a free-threaded Python build), auto = threads if the GIL is disabled "
+            "and there is no --file-timeout, otherwise processes"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help=(
+            "stop at the first script with an error (or a warning with --strict): "
+            "scripts not yet checked are skipped"
+        ),
+    )
+    parser.add_argument(
+        "--file-timeout",
+        type=float,
+        help=(
+            "max time in seconds to check a single script; the check is done in a separate process "
+            "which is killed on timeout and the error file_timeout is reported"
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["text", "jsonl", "sarif"],
+        default="text",
+        help=(
+            "output format: text = human-readable text, jsonl = JSON Lines (one object per message, "
+            "per script and for the final report), sarif = SARIF 2.1.0 log"
+        ),
+    )
+    parser.add_argument(
+        "-g",
+        "--group-by",
+        choices=["script", "message"],
+        default="script",
+        help=(
+            "group messages: script = display messages of each script after its check, "
+            "message = display all messages at the end, grouped by message"
+        ),
+    )
     parser.add_argument(
         "-i",
         "--ignore-files",
         help="comma-separated list of file names to ignore",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "number of workers (see --executor) used to check scripts in parallel; "
+            "biggest scripts are checked first, "
+            "output is in the same order as a check with a single job"
+        ),
+    )
     parser.add_argument(
         "-l",
         "--level",
@@ -76,17 +216,62 @@ def get_parser() -> argparse.ArgumentParser:
         default="info",
         help=("level of messages to display: error = errors only, warning = errors and warnings, info = all messages"),
     )
+    parser.add_argument(
+        "--lsp",
+        action="store_true",
+        help=(
+            "run a language server (LSP) on standard input/output, for use in an editor: "
+            "documents are checked when opened and after each change (no path is given)"
+        ),
+    )
     parser.add_argument(
         "-m",
         "--ignore-messages",
         help="comma-separated list of error codes to ignore",
     )
+    parser.add_argument(
+        "--manifest",
+        type=pathlib.Path,
+        help=(
+            "file with stat and results of scripts, read and updated: unchanged scripts "
+            "(same size, modification time and inode) are not read and checked again"
+        ),
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help=(
+            "paths are results files written with --results-file (for example one per shard): "
+            "merge them and display output and return code like a single run on all scripts"
+        ),
+    )
+    parser.add_argument(
+        "--metrics",
+        type=pathlib.Path,
+        help=(
+            "write metrics in OpenMetrics text format to this file at the end "
+            "(for example for the textfile collector of Prometheus node exporter)"
+        ),
+    )
     parser.add_argument(
         "-n",
         "--name-only",
         action="store_true",
         help=("display only name of script but not the list of messages, do not display report and return code"),
     )
+    parser.add_argument(
+        "-p",
+        "--prefetch",
+        type=int,
+        default=0,
+        help="number of files to read ahead in background threads (0 = disabled)",
+    )
+    parser.add_argument(
+        "--prefetch-bytes",
+        type=int,
+        default=PREFETCH_BYTES,
+        help=f"max number of bytes held by files read ahead (default: {PREFETCH_BYTES})",
+    )
     parser.add_argument(
         "-q",
         "--quiet",
@@ -99,6 +284,46 @@ def get_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="recursively find scripts in sub-directories",
     )
+    parser.add_argument(
+        "--results-file",
+        type=pathlib.Path,
+        help="write results of checked scripts in this file, to be merged later with --merge",
+    )
+    parser.add_argument(
+        "--rules",
+        type=pathlib.Path,
+        help="TOML file with custom rules to check in addition to built-in checks",
+    )
+    parser.add_argument(
+        "--sample",
+        type=parse_fraction,
+        metavar="FRACTION",
+        help=(
+            "check only a random sample of scripts (for example 0.1 for 10%%) and display estimates "
+            "of the results on all scripts, with a 95%% confidence interval"
+        ),
+    )
+    parser.add_argument(
+        "--sample-count",
+        type=int,
+        default=0,
+        metavar="N",
+        help="check only a random sample of N scripts and display estimates (like --sample)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="seed for the random selection of scripts with --sample and --sample-count (default: 0)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help=(
+            "check only the scripts of shard K among N shards (format: K/N), "
+            "scripts are distributed among shards with a hash of their path"
+        ),
+    )
     parser.add_argument(
         "-s",
         "--strict",
@@ -111,45 +336,98 @@ def get_parser() -> argparse.ArgumentParser:
         action="store_true",
         help=("display scores by script, grouped by score, do not display report and return code"),
     )
+    parser.add_argument(
+        "--score-summary",
+        action="store_true",
+        help=(
+            "display number of scripts by score and average score, without the list of scripts, "
+            "do not display report and return code"
+        ),
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write the baseline file (option --baseline) with all messages found, which are all reported",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
         action="store_true",
         help="verbose output",
     )
+    parser.add_argument(
+        "-w",
+        "--worst",
+        type=int,
+        default=0,
+        metavar="N",
+        help="display the N scripts with the lowest score, do not display report and return code",
+    )
     version = importlib.metadata.version("weechat_script_lint")
     parser.add_argument("--version", action="version", version=version)
     parser.add_argument(
         "path",
-        nargs="+",
+        nargs="*",
         type=pathlib.Path,
         help="path to a directory or a WeeChat script",
     )
     return parser
 
 
+def print_verbose(args: argparse.Namespace, message: str) -> None:
+    """Print a message in verbose mode, only with text output.
+
+    :param args: command-line arguments
+    :param message: message to print
+    """
+    if not args.quiet and args.verbose and args.format == "text":
+        print(message)
+
+
 def get_scripts(
     path: pathlib.Path,
     args: argparse.Namespace,
     ignored_files: list[str],
-) -> Generator[pathlib.Path, None, None]:
+    seen: set[tuple[int, int]] | None = None,
+) -> Generator[tuple[pathlib.Path, os.stat_result], None, None]:
     """Return the list of scripts in a path.
 
+    Each directory and file is returned only once, even if it is found
+    multiple times (overlapping paths, symbolic links); this also stops
+    cycles of symbolic links to directories.
+
     :param path: path (directory or file)
     :param args: command-line arguments
-    :return: list of scripts
+    :param ignored_files: names of files to ignore
+    :param seen: identifiers (device, inode) of directories and files
+        already found, updated by this function
+    :return: list of tuples (path, stat result)
     """
-    if path.is_dir():
-        for path2 in path.iterdir():
-            yield from get_scripts(path2, args, ignored_files)
-    elif not path.is_file():
+    if seen is None:
+        seen = set()
+    try:
+        path_stat = path.stat()
+    except OSError:
+        sys.exit(f"FATAL: not a directory/file: {path}")
+    file_id = (path_stat.st_dev, path_stat.st_ino)
+    if file_id in seen:
+        print_verbose(args, f"{path}: already found, skipped")
+        return
+    if stat.S_ISDIR(path_stat.st_mode):
+        seen.add(file_id)
+        # names sorted, so that indexes of scripts are the same on all machines
+        # (results files of shards are merged by index); names use less memory
+        # than paths with big directories
+        for name in sorted(os.listdir(path)):  # noqa: PTH208
+            yield from get_scripts(path / name, args, ignored_files, seen)
+    elif not stat.S_ISREG(path_stat.st_mode):
         sys.exit(f"FATAL: not a directory/file: {path}")
     elif not path.name.startswith(".") and path.suffix in SUPPORTED_SUFFIXES:
         if path.name in ignored_files:
-            if not args.quiet and args.verbose:
-                print(f"{path}: file ignored")
+            print_verbose(args, f"{path}: file ignored")
         else:
-            yield path
+            seen.add(file_id)
+            yield path, path_stat
 
 
 def print_report(
@@ -240,6 +518,383 @@ def print_scores(
         print(f"{path}: score = {str_score}")
 
 
+def print_messages_by_name(
+    store: ResultStore,
+    use_colors: bool = True,
+) -> None:
+    """Print messages grouped by name, errors first.
+
+    :param store: messages
+    :param use_colors: True to use colors in output
+    """
+    for level, messages in MESSAGES.items():
+        for msg_name in messages:
+            for msg in store.filter(level=level, msg_name=msg_name):
+                print(msg.as_str(use_colors=use_colors))
+
+
+def print_score_summary(
+    scores: ScoreAggregator,
+    use_colors: bool = True,
+) -> None:
+    """Print number of scripts by score and average score.
+
+    :param scores: aggregated scores
+    :param use_colors: True to use colors in output
+    """
+    for score, count_scripts in scores.scores():
+        print(f"{count_scripts} scripts with score {get_string_score(score, use_colors)}")
+    print(f"Average score: {scores.average:.1f} / 100 ({scores.num_scripts} scripts)")
+
+
+def print_worst_scripts(
+    scores: ScoreAggregator,
+    use_colors: bool = True,
+) -> None:
+    """Print scripts with the lowest score.
+
+    :param scores: aggregated scores
+    :param use_colors: True to use colors in output
+    """
+    worst = scores.worst()
+    print(f"{len(worst)} scripts with the lowest score:")
+    for path, score in worst:
+        print(f"  {path}: score = {get_string_score(score, use_colors)}")
+
+
+def find_scripts(
+    args: argparse.Namespace,
+    sampler: Sampler | None = None,
+) -> Generator[tuple[int, pathlib.Path, os.stat_result], None, None]:
+    """Find scripts to check (only scripts of the shard if option --shard is given).
+
+    :param args: command-line arguments
+    :param sampler: sampler selecting a random sample of scripts
+    :return: tuples (index, path, stat result); index is the position of
+        script in the list of all scripts found
+    """
+    if sampler is not None:
+        yield from sampler.select(find_scripts(args))
+        return
+    ignored_files = (args.ignore_files or "").split(",")
+    seen: set[tuple[int, int]] = set()
+    scripts = chain.from_iterable(
+        get_scripts(path, args, ignored_files, seen)  # ty: ignore[invalid-argument-type]
+        for path in args.path
+    )
+    for index, (path, path_stat) in enumerate(scripts):
+        if not args.shard or in_shard(path, *args.shard):
+            yield index, path, path_stat
+
+
+def get_check_mode(args: argparse.Namespace) -> str:
+    """Return the evaluation mode of checks: the fastest one giving the output displayed.
+
+    :param args: command-line arguments
+    :return: evaluation mode of checks: "full", "any" or "score"
+    """
+    # the return code is the number of errors (and warnings with --strict):
+    # errors are all counted in all modes, but warnings only in mode "full"
+    if (
+        args.quiet
+        or args.strict
+        or args.format != "text"
+        or args.results_file
+        or args.manifest
+        or args.baseline
+        or (get_sampler(args) and not args.name_only)
+    ):
+        return "full"
+    if args.score or args.score_summary or args.worst > 0:
+        return "score"
+    return "any" if args.name_only else "full"
+
+
+def get_checked_scripts(  # noqa: PLR0913
+    args: argparse.Namespace,
+    rules: CustomRules | None = None,
+    manifest: Manifest | None = None,
+    observer: Observer | None = None,
+    baseline: Baseline | None = None,
+    *,
+    sampler: Sampler | None = None,
+) -> Generator[tuple[int, pathlib.Path, WeechatScript], None, None]:
+    """Find, read and check scripts, or read results from results files.
+
+    :param args: command-line arguments
+    :param rules: custom rules
+    :param manifest: manifest with results of unchanged scripts
+    :param observer: observer called on events of checks
+    :param baseline: baseline with known messages, not reported
+    :param sampler: sampler selecting a random sample of scripts
+    :return: tuples (index, path, script), after check of script; index is
+        the position of script in the list of all scripts found
+    """
+    if args.merge:
+        try:
+            yield from merge_results_files(args.path, use_colors=not args.no_colors)
+        except ResultsError as exc:
+            sys.exit(f"FATAL: {exc}")
+        return
+    mode = get_check_mode(args)
+    scripts: Iterable[tuple[int, pathlib.Path, os.stat_result]] = find_scripts(args, sampler)
+    cached: Iterable[tuple[int, pathlib.Path, WeechatScript]] = ()
+    if manifest is not None:
+        # unchanged scripts are not read: results come from the manifest
+        found, found_cached = tee(
+            (index, path, path_stat, manifest.is_unchanged(path, path_stat)) for index, path, path_stat in scripts
+        )
+        scripts = ((index, path, path_stat) for index, path, path_stat, unchanged in found if not unchanged)
+        cached = ((index, path, manifest.get_script(path)) for index, path, _, unchanged in found_cached if unchanged)
+    keys: list[tuple[int, pathlib.Path]] = []
+    if args.jobs > 1:
+        # longest processing time first: the biggest scripts are sent first
+        # to the workers, so that a big script does not end the run alone
+        scripts = sorted(scripts, key=lambda script: script[2].st_size, reverse=True)
+        keys = sorted((index, path) for index, path, _ in scripts)
+    scripts, scripts_to_read = tee(scripts)
+    contents = read_scripts(
+        ((path, path_stat.st_size) for _, path, path_stat in scripts_to_read),
+        args.prefetch,
+        args.prefetch_bytes,
+    )
+    tasks = (
+        (
+            (index, path_script),
+            WeechatScript(
+                path=path_script,
+                ignore=args.ignore_messages or "",
+                use_colors=not args.no_colors,
+                msg_level=args.level,
+                content=content,
+                rules=rules,
+                mode=mode,
+                cached=manifest.get_cached_results(path_script, content) if manifest else None,
+                observer=observer,
+                baseline=baseline.get_script(path_script) if baseline else None,
+            ),
+        )
+        for (index, path_script, _), (_, content) in zip(scripts, contents)
+    )
+    if args.batch:
+        tasks = batch_scripts(tasks)
+    if args.jobs > 1 and get_executor(args.executor, args.file_timeout) == "thread":
+        checked = in_order(check_in_threads(tasks, jobs=args.jobs), keys)
+    elif args.jobs > 1:
+        checked = in_order(check_in_workers(tasks, jobs=args.jobs, timeout=args.file_timeout), keys)
+    elif args.file_timeout:
+        checked = check_in_workers(tasks, timeout=args.file_timeout)
+    else:
+        checked = check_in_process(tasks)
+    yield from heapq.merge(
+        cached,
+        ((index, path_script, script) for (index, path_script), script in checked),
+        key=lambda item: item[0],
+    )
+
+
+def format_estimate(estimate: tuple[float, float, float], fmt: str) -> str:
+    """Format an estimate with its confidence interval.
+
+    :param estimate: tuple (estimate, low, high)
+    :param fmt: format of values
+    :return: formatted estimate
+    """
+    value, low, high = estimate
+    if math.isnan(low):
+        return fmt.format(value)
+    return f"{fmt.format(value)} [{fmt.format(low)} - {fmt.format(high)}]"
+
+
+def print_estimates(sampler: Sampler) -> None:
+    """Print estimates of results on all scripts, from the sample.
+
+    :param sampler: sampler with results of scripts of the sample
+    """
+    sample = f"a sample of {sampler.size} scripts"
+    print(f"Estimates on {sampler.population} scripts from {sample} (95% confidence interval):")
+    for level, label in (("error", "errors"), ("warning", "warnings"), ("info", "info")):
+        print(f"  {label}: {format_estimate(sampler.estimate(level, scale=sampler.population), '{:.0f}')}")
+    print(f"  scripts with issues: {format_estimate(sampler.estimate_proportion('issues'), '{:.1f}%')}")
+    print(f"  average score: {format_estimate(sampler.estimate('score', maximum=MAX_SCORE), '{:.1f}')}")
+    for score_min, score_max in SCORE_RANGES:
+        scores = str(score_min) if score_min == score_max else f"{score_min}-{score_max}"
+        estimate = sampler.estimate_proportion(f"score_{score_min}_{score_max}")
+        print(f"  scripts with score {scores}: {format_estimate(estimate, '{:.1f}%')}")
+
+
+class TextOutput(Output):
+    """Display results as text."""
+
+    def __init__(self, args: argparse.Namespace, sampler: Sampler | None = None) -> None:
+        """Initialize the text output.
+
+        :param args: command-line arguments
+        :param sampler: sampler selecting a random sample of scripts, to
+            display estimates of results on all scripts
+        """
+        self.name_only: bool = args.name_only
+        self.score: bool = args.score
+        self.score_summary: bool = args.score_summary
+        self.worst: int = args.worst
+        self.use_colors: bool = not args.no_colors
+        self.scores: dict[pathlib.Path, int] = {}
+        self.aggregator: ScoreAggregator | None = (
+            ScoreAggregator(worst=self.worst) if self.score_summary or self.worst > 0 else None
+        )
+        self.store: ResultStore | None = (
+            ResultStore() if args.group_by == "message" and not self.name_only else None
+        )
+        self.sampler: Sampler | None = sampler if not self.name_only else None
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:
+        """Display report of a checked script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+        if self.sampler is not None:
+            self.sampler.add_script(script)
+        if self.aggregator:
+            self.aggregator.add(index, path, script.score)
+        elif self.score or not self.name_only:
+            self.scores[path] = script.score
+        if self.score or self.aggregator:
+            return
+        if self.store is not None:
+            self.store.add_script(script)
+        else:
+            report = script.get_report(self.name_only)
+            if report:
+                print(report)
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:
+        """Display scores and final report.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+        if self.aggregator:
+            if self.score_summary:
+                print_score_summary(self.aggregator, use_colors=self.use_colors)
+            if self.worst > 0:
+                print_worst_scripts(self.aggregator, use_colors=self.use_colors)
+        elif self.score:
+            print_scripts_by_score(self.scores, use_colors=self.use_colors)
+        elif not self.name_only:
+            if self.store is not None:
+                print_messages_by_name(self.store, use_colors=self.use_colors)
+            print_scores(self.scores, use_colors=self.use_colors)
+            print_report(
+                num_scripts,
+                num_scripts_with_issues,
+                count,
+                use_colors=self.use_colors,
+            )
+        if self.sampler is not None:
+            print_estimates(self.sampler)
+
+
+def get_outputs(args: argparse.Namespace, sampler: Sampler | None = None) -> list[Output]:
+    """Return outputs receiving results of checked scripts.
+
+    :param args: command-line arguments
+    :param sampler: sampler selecting a random sample of scripts
+    :return: list of outputs
+    """
+    outputs: list[Output] = []
+    if not args.quiet:
+        outputs.append(TextOutput(args, sampler) if args.format == "text" else OUTPUT_WRITERS[args.format]())
+    if args.results_file:
+        outputs.append(ResultsWriter(args.results_file))
+    if args.update_baseline:
+        outputs.append(BaselineWriter(args.baseline))
+    return outputs
+
+
+def get_sampler(args: argparse.Namespace) -> Sampler | None:
+    """Return the sampler selecting a random sample of scripts.
+
+    :param args: command-line arguments
+    :return: sampler, None if no sample is asked
+    """
+    if args.merge or not (args.sample or args.sample_count > 0):
+        return None
+    return Sampler(fraction=args.sample or 0, count=args.sample_count, seed=args.seed)
+
+
+def get_rules(args: argparse.Namespace) -> CustomRules | None:
+    """Load custom rules.
+
+    :param args: command-line arguments
+    :return: custom rules, None if no rules file is given
+    """
+    try:
+        return load_rules(args.rules) if args.rules else None
+    except RulesError as exc:
+        sys.exit(f"FATAL: {exc}")
+
+
+def get_baseline(args: argparse.Namespace) -> Baseline | None:
+    """Load the baseline.
+
+    :param args: command-line arguments
+    :return: baseline, None if no baseline file is given or if it is
+        updated (then all messages are reported)
+    """
+    if not args.baseline or args.update_baseline or args.merge:
+        return None
+    try:
+        return load_baseline(args.baseline)
+    except BaselineError as exc:
+        sys.exit(f"FATAL: {exc}")
+
+
+def run_language_server(args: argparse.Namespace) -> int:
+    """Run the language server on standard input/output.
+
+    :param args: command-line arguments
+    :return: exit code
+    """
+    server = LanguageServer(
+        sys.stdin.buffer,
+        sys.stdout.buffer,
+        ignore=args.ignore_messages or "",
+        msg_level=args.level,
+        rules=get_rules(args),
+    )
+    return server.run()
+
+
+def get_manifest(
+    args: argparse.Namespace,
+    rules: CustomRules | None = None,
+    observer: Observer | None = None,
+    baseline: Baseline | None = None,
+) -> Manifest | None:
+    """Open the manifest.
+
+    The manifest is not used when the baseline is updated: the baseline
+    needs the content of all scripts.
+
+    :param args: command-line arguments
+    :param rules: custom rules
+    :param observer: observer called on events of checks
+    :param baseline: baseline with known messages, not reported
+    :return: manifest, None if no manifest is given
+    """
+    if not args.manifest or args.merge or args.update_baseline:
+        return None
+    options = {
+        "ignore": sorted(code.strip() for code in (args.ignore_messages or "").split(",") if code),
+        "level": args.level,
+        "baseline": baseline.digest if baseline else None,
+    }
+    return Manifest(args.manifest, options, rules=rules, use_colors=not args.no_colors, observer=observer)
+
+
 def check_scripts(args: argparse.Namespace) -> tuple[int, int]:
     """Check scripts.
 
@@ -253,48 +908,70 @@ def check_scripts(args: argparse.Namespace) -> tuple[int, int]:
     }
     num_scripts = 0
     num_scripts_with_issues = 0
-    scores: dict[pathlib.Path, int] = {}
-    ignored_files = (args.ignore_files or "").split(",")
-    for path in args.path:
-        scripts = get_scripts(path, args, ignored_files)  # ty: ignore[invalid-argument-type]
-        for path_script in scripts:
-            # check script
-            num_scripts += 1
-            script = WeechatScript(
-                path=path_script,
-                ignore=args.ignore_messages or "",
-                use_colors=not args.no_colors,
-                msg_level=args.level,
-            )
-            script.check()
-            report = script.get_report(args.name_only)
-            scores[path_script] = script.score
-            if report:
-                num_scripts_with_issues += 1
-                if report and not args.quiet and not args.score:
-                    print(report)
-            # add errors/warnings/info found
-            for counter in script.count:
-                count[counter] += script.count[counter]
-    if not args.quiet and args.score:
-        print_scripts_by_score(scores, use_colors=not args.no_colors)
-    if not args.quiet and not args.name_only and not args.score:
-        print_scores(scores, use_colors=not args.no_colors)
-    if not args.quiet and not args.name_only and not args.score:
-        print_report(
-            num_scripts,
-            num_scripts_with_issues,
-            count,
-            use_colors=not args.no_colors,
-        )
+    rules = get_rules(args)
+    metrics = MetricsExporter() if args.metrics else None
+    baseline = get_baseline(args)
+    manifest = get_manifest(args, rules, metrics, baseline)
+    sampler = get_sampler(args)
+    outputs = get_outputs(args, sampler)
+    if manifest is not None:
+        outputs.append(manifest)
+    checked = get_checked_scripts(args, rules, manifest, metrics, baseline, sampler=sampler)
+    for index, path_script, script in checked:
+        num_scripts += 1
+        if script.messages:
+            num_scripts_with_issues += 1
+        for output in outputs:
+            output.add_script(index, path_script, script)
+        # add errors/warnings/info found
+        for counter in script.count:
+            count[counter] += script.count[counter]
+        if args.fail_fast and (script.count["error"] or (args.strict and script.count["warning"])):
+            # stop discovery and cancel checks in progress
+            checked.close()
+            break
+    for output in outputs:
+        output.close(num_scripts, num_scripts_with_issues, count)
+    if metrics is not None:
+        metrics.write(args.metrics)
     return (count["error"], count["warning"])
 
 
+def display_report(args: argparse.Namespace) -> bool:
+    """Check if the final report and return code are displayed.
+
+    :param args: command-line arguments
+    :return: True if the final report and return code are displayed
+    """
+    return (
+        not args.quiet
+        and args.format == "text"
+        and not args.name_only
+        and not args.score
+        and not args.score_summary
+        and args.worst <= 0
+    )
+
+
 def lint() -> None:
     """Check WeeChat scripts."""
-    args = get_parser().parse_args()
+    parser = get_parser()
+    args = parser.parse_args()
+    if args.lsp:
+        sys.exit(run_language_server(args))
+    if not args.path:
+        parser.error("the following arguments are required: path")
+    if args.update_baseline and (not args.baseline or args.merge):
+        parser.error("option --update-baseline requires option --baseline and is not allowed with --merge")
+    if args.update_baseline and (args.fail_fast or args.shard or args.sample or args.sample_count > 0):
+        # the baseline would be replaced by messages of a subset of scripts
+        parser.error("option --update-baseline is not allowed with --fail-fast, --shard, --sample and --sample-count")
+    if args.sample and args.sample_count:
+        parser.error("options --sample and --sample-count are mutually exclusive")
+    if args.executor == "thread" and args.file_timeout:
+        parser.error("option --file-timeout is not allowed with --executor thread")
     errors, warnings = check_scripts(args)
     ret_code = min(255, errors + warnings if args.strict else errors)
-    if not args.quiet and not args.name_only and not args.score:
+    if display_report(args):
         print(f"Exiting with code {ret_code}")
     sys.exit(ret_code)
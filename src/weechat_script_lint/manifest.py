@@ -0,0 +1,342 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Manifest of checked scripts, to skip unchanged scripts and checks."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import pathlib
+import re
+import time
+from typing import TYPE_CHECKING, Any
+
+from weechat_script_lint import python_facts
+from weechat_script_lint import script as script_module
+from weechat_script_lint.output import Output, to_json
+from weechat_script_lint.script import MESSAGES, TRANSIENT_MESSAGES, WeechatScript
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable
+
+    from weechat_script_lint.observer import Observer
+    from weechat_script_lint.rules import CustomRules
+    from weechat_script_lint.script import ScriptContent
+
+# version of the manifest format
+MANIFEST_VERSION = 2
+
+
+def get_stat_key(path_stat: os.stat_result) -> list[int]:
+    """Return the stat values used to detect a change in a script.
+
+    :param path_stat: stat result of the script
+    :return: list [size, modification time (ns), inode]
+    """
+    return [path_stat.st_size, path_stat.st_mtime_ns, path_stat.st_ino]
+
+
+def get_digest(*values: Any) -> str:  # noqa: ANN401
+    """Return a digest of values.
+
+    :param values: values (serializable in JSON)
+    :return: hexadecimal digest
+    """
+    return hashlib.sha256(to_json(values).encode("utf-8")).hexdigest()
+
+
+def get_source(function: Callable[..., Any]) -> str:
+    """Return the source code of a function.
+
+    :param function: function, method or class
+    :return: source code, version of weechat-script-lint if the source is
+        not available
+    """
+    try:
+        return inspect.getsource(inspect.unwrap(function))
+    except (OSError, TypeError):
+        return importlib.metadata.version("weechat_script_lint")
+
+
+def get_engine_fingerprint() -> str:
+    """Return the fingerprint of the code shared by all checks.
+
+    This is the code of functions of module script, methods of class
+    WeechatScript which are not checks and functions and classes of module
+    python_facts: if it changes, all checks must run again.
+
+    :return: fingerprint
+    """
+    functions = [
+        function
+        for _, function in sorted(vars(script_module).items())
+        if callable(function)
+        and not inspect.isclass(function)
+        and getattr(function, "__module__", "") == script_module.__name__
+    ]
+    functions += [
+        method
+        for name, method in sorted(vars(WeechatScript).items())
+        if inspect.isfunction(method) and not name.startswith("_check_")
+    ]
+    functions += [
+        function
+        for _, function in sorted(vars(python_facts).items())
+        if callable(function) and getattr(function, "__module__", "") == python_facts.__name__
+    ]
+    return get_digest(MANIFEST_VERSION, [get_source(function) for function in functions])
+
+
+def get_check_fingerprint(name: str) -> str:
+    """Return the fingerprint of a built-in check.
+
+    The fingerprint changes with the code of the check method, the
+    constants of module script it uses and the level of the messages it
+    adds; not with the score and text of messages (they are not stored in
+    the manifest).
+
+    :param name: name of check method
+    :return: fingerprint
+    """
+    source = get_source(getattr(WeechatScript, name))
+    words = set(re.findall(r"\w+", source))
+    constants = []
+    for word in sorted(words):
+        value = getattr(script_module, word, None)
+        if isinstance(value, re.Pattern):
+            constants.append([word, value.pattern.decode("utf-8", errors="replace"), value.flags])
+        elif isinstance(value, (str, int, tuple, frozenset)) and not isinstance(value, bool):
+            constants.append([word, repr(value)])
+    levels = sorted(
+        [msg_name, level] for level, messages in MESSAGES.items() for msg_name in messages if msg_name in words
+    )
+    return get_digest(source, constants, levels)
+
+
+def get_fingerprints(rules: CustomRules | None = None) -> dict[str, str]:
+    """Return the fingerprints of all checks.
+
+    Custom rules are all checked by a single check (all their messages are
+    in the results of this check), so they have a single fingerprint: all
+    rules are checked again if any rule changes. The score and message of
+    rules are not part of the fingerprint.
+
+    :param rules: custom rules
+    :return: dictionary with check name -> fingerprint
+    """
+    fingerprints = {
+        name: get_check_fingerprint(name)
+        for name in vars(WeechatScript)
+        if name.startswith("_check_") and name != "_check_custom_rules"
+    }
+    if rules:
+        fingerprints["_check_custom_rules"] = get_digest(
+            [
+                [rule.name, rule.level, rule.pattern, list(rule.suffixes), rule.unless, rule.ignore_case]
+                for rule in rules.rules
+            ],
+        )
+    return fingerprints
+
+
+class Manifest(Output):
+    """Manifest with stat and results of checked scripts (JSON Lines).
+
+    The first line is a header with the options changing the results and
+    the fingerprint of code shared by all checks: if they are not the same
+    in the current run, the manifest is ignored.
+
+    The header also has the fingerprint of each check: the results of a
+    check are used only if its fingerprint is the same in the current run,
+    so that after a change in a check or a new check, only this check runs
+    again.
+
+    Then each line is the record of a script, with its stat values, the
+    digest of its content and the messages added by each check (checks
+    without messages are omitted).
+
+    The manifest is read when created and written again with the results
+    of all scripts of the run (checked or not) when it is closed.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        options: dict[str, Any],
+        rules: CustomRules | None = None,
+        use_colors: bool = True,  # noqa: FBT001,FBT002
+        observer: Observer | None = None,
+    ) -> None:
+        """Read the manifest and open a new one, written on close.
+
+        :param path: path to the manifest
+        :param options: options changing the results
+        :param rules: custom rules
+        :param use_colors: True to use colors in output
+        :param observer: observer called on events of checks of unchanged
+            scripts (messages added from the manifest)
+        """
+        self.path: pathlib.Path = path
+        self.header: dict[str, Any] = {"options": options, "engine": get_engine_fingerprint()}
+        self.rules: CustomRules | None = rules
+        self.use_colors: bool = use_colors
+        self.observer: Observer | None = observer
+        self.fingerprints: dict[str, str] = get_fingerprints(rules)
+        self.start_time: int = 0
+        self.valid_checks: list[str] = []
+        self.records: dict[str, dict[str, Any]] = {}
+        self.read()
+        self.stats: dict[str, list[int]] = {}
+        self.digests: dict[str, str] = {}
+        self.new_path: pathlib.Path = path.with_name(f"{path.name}.new")
+        self.file = self.new_path.open("w", encoding="utf-8")
+        header = {**self.header, "checks": self.fingerprints, "time": time.time_ns()}
+        self.file.write(f"{to_json(header)}\n")
+
+    def read(self) -> None:
+        """Read records of the manifest, if it exists and has the same header."""
+        try:
+            with self.path.open(encoding="utf-8") as manifest_file:
+                header = json.loads(manifest_file.readline())
+                if any(header.get(key) != value for key, value in self.header.items()):
+                    return
+                self.start_time = header["time"]
+                self.valid_checks = [
+                    name for name, fingerprint in self.fingerprints.items() if header["checks"].get(name) == fingerprint
+                ]
+                for line in manifest_file:
+                    record = json.loads(line)
+                    self.records[record["key"]] = record
+        except (OSError, ValueError, KeyError, AttributeError):
+            # missing or invalid manifest: all scripts are checked
+            self.valid_checks = []
+            self.records = {}
+
+    def get_cached(self, record: dict[str, Any]) -> dict[str, list[list[Any]]]:
+        """Return the results of checks of a record which can be used.
+
+        :param record: record of a script
+        :return: dictionary with check name -> messages, for checks with
+            the same fingerprint
+        """
+        messages = record["messages"]
+        return {name: messages.get(name, []) for name in self.valid_checks}
+
+    def is_unchanged(self, path: pathlib.Path, path_stat: os.stat_result) -> bool:
+        """Check if a script and its checks are unchanged since the run which wrote the manifest.
+
+        A script modified after the start of this run is considered as
+        changed: it could have been modified again with the same stat values.
+
+        :param path: path to the script
+        :param path_stat: stat result of the script
+        :return: True if the script and all checks are unchanged: results
+            from the manifest can be used, without reading the script
+        """
+        key = str(path.absolute())
+        stat_key = get_stat_key(path_stat)
+        self.stats[key] = stat_key
+        record = self.records.get(key)
+        return (
+            record is not None
+            and record["stat"] == stat_key
+            and path_stat.st_mtime_ns < self.start_time
+            and len(self.valid_checks) == len(self.fingerprints)
+        )
+
+    def get_script(self, path: pathlib.Path) -> WeechatScript:
+        """Return an unchanged script with results from the manifest.
+
+        :param path: path to the script
+        :return: script with results
+        """
+        record = self.records[str(path.absolute())]
+        script = WeechatScript(
+            pathlib.Path(record["resolved"]),
+            use_colors=self.use_colors,
+            content=b"",
+            rules=self.rules,
+            resolved=True,
+            cached=self.get_cached(record),
+            observer=self.observer,
+        )
+        script.check()
+        return script
+
+    def get_cached_results(self, path: pathlib.Path, content: ScriptContent) -> dict[str, list[list[Any]]]:
+        """Return the results of checks which can be used for a script read.
+
+        The results are used if the script has the same content (even if
+        its stat values have changed), for the checks which are unchanged.
+
+        :param path: path to the script
+        :param content: content of the script
+        :return: dictionary with check name -> messages
+        """
+        key = str(path.absolute())
+        digest = hashlib.sha256(content).hexdigest()
+        self.digests[key] = digest
+        record = self.records.get(key)
+        if record is None or record["digest"] != digest:
+            return {}
+        return self.get_cached(record)
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:  # noqa: ARG002
+        """Write stat and results of a script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+        key = str(path.absolute())
+        stat_key = self.stats.pop(key, None)
+        digest = self.digests.pop(key, None) or self.records.get(key, {}).get("digest")
+        if stat_key is None or digest is None or any(msg.msg_name in TRANSIENT_MESSAGES for msg in script.messages):
+            return
+        if script.check_ranges.keys() != self.fingerprints.keys():
+            return
+        messages = {
+            name: [[msg.level, msg.msg_name, msg.line, msg.kwargs] for msg in script.messages[start:end]]
+            for name, (start, end) in script.check_ranges.items()
+            if end > start
+        }
+        record = {
+            "key": key,
+            "resolved": str(script.path),
+            "stat": stat_key,
+            "digest": digest,
+            "messages": messages,
+        }
+        self.file.write(f"{to_json(record)}\n")
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:  # noqa: ARG002
+        """Replace the manifest by the new one.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+        self.file.close()
+        self.new_path.replace(self.path)
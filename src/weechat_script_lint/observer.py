@@ -0,0 +1,185 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Observers of checks: hooks called on events, export of metrics."""
+
+from __future__ import annotations
+
+import bisect
+from typing import TYPE_CHECKING
+
+from weechat_script_lint.script import LEVEL_LABELS
+
+if TYPE_CHECKING:
+    import pathlib
+
+    from weechat_script_lint.script import ScriptMessage, WeechatScript
+
+METRICS_PREFIX = "weechat_script_lint"
+
+# upper bounds of buckets of histogram of check durations, in seconds
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Observer:
+    """An observer of checks of scripts: the methods are called on events.
+
+    An observer is given to a script (see WeechatScript); without observer,
+    events have no cost.
+    """
+
+    def file_started(self, script: WeechatScript) -> None:
+        """Receive the start of checks of a script.
+
+        :param script: the script
+        """
+
+    def rule_finished(self, script: WeechatScript, name: str, duration: float) -> None:
+        """Receive the end of a check (or messages of the check added from cached results).
+
+        :param script: the script
+        :param name: name of check method
+        :param duration: duration of check, in seconds
+        """
+
+    def message_emitted(self, script: WeechatScript, message: ScriptMessage) -> None:
+        """Receive a message added on a script.
+
+        :param script: the script
+        :param message: the message
+        """
+
+    def file_finished(self, script: WeechatScript, duration: float) -> None:
+        """Receive the end of checks of a script.
+
+        :param script: the script
+        :param duration: duration of checks, in seconds
+        """
+
+
+def format_float(value: float) -> str:
+    """Return a float formatted for OpenMetrics.
+
+    :param value: value
+    :return: formatted value
+    """
+    return repr(float(value))
+
+
+class MetricsExporter(Observer):
+    """Observer collecting metrics, written in OpenMetrics text format.
+
+    The file can be read by the textfile collector of Prometheus node
+    exporter, for example.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.files = 0
+        self.bytes_scanned = 0
+        self.messages: dict[str, int] = dict.fromkeys(LEVEL_LABELS, 0)
+        self.cache: dict[str, int] = {"hit": 0, "miss": 0}
+        # check name -> count of checks per bucket of duration (+Inf last)
+        self.duration_counts: dict[str, list[int]] = {}
+        # check name -> sum of durations
+        self.duration_sums: dict[str, float] = {}
+
+    def rule_finished(self, script: WeechatScript, name: str, duration: float) -> None:
+        """Count a check: duration if it has run, cache hit otherwise.
+
+        :param script: the script
+        :param name: name of check method
+        :param duration: duration of check, in seconds
+        """
+        if name in script.cached:
+            self.cache["hit"] += 1
+            return
+        self.cache["miss"] += 1
+        name = name.removeprefix("_check_")
+        counts = self.duration_counts.setdefault(name, [0] * (len(DURATION_BUCKETS) + 1))
+        counts[bisect.bisect_left(DURATION_BUCKETS, duration)] += 1
+        self.duration_sums[name] = self.duration_sums.get(name, 0.0) + duration
+
+    def message_emitted(self, script: WeechatScript, message: ScriptMessage) -> None:  # noqa: ARG002
+        """Count a message.
+
+        :param script: the script
+        :param message: the message
+        """
+        self.messages[message.level] += 1
+
+    def file_finished(self, script: WeechatScript, duration: float) -> None:  # noqa: ARG002
+        """Count a script and the bytes scanned by its checks.
+
+        :param script: the script
+        :param duration: duration of checks, in seconds
+        """
+        self.files += 1
+        if any(name not in script.cached for name in script.check_ranges):
+            self.bytes_scanned += len(script.script)
+
+    def get_lines(self) -> list[str]:
+        """Return the metrics in OpenMetrics text format.
+
+        :return: lines
+        """
+        prefix = METRICS_PREFIX
+        lines = [
+            f"# TYPE {prefix}_files counter",
+            f"# HELP {prefix}_files Scripts checked.",
+            f"{prefix}_files_total {self.files}",
+            f"# TYPE {prefix}_scanned_bytes counter",
+            f"# UNIT {prefix}_scanned_bytes bytes",
+            f"# HELP {prefix}_scanned_bytes Bytes of scripts scanned by checks.",
+            f"{prefix}_scanned_bytes_total {self.bytes_scanned}",
+            f"# TYPE {prefix}_messages counter",
+            f"# HELP {prefix}_messages Messages found, by level.",
+        ]
+        lines.extend(f'{prefix}_messages_total{{level="{level}"}} {count}' for level, count in self.messages.items())
+        lines += [
+            f"# TYPE {prefix}_check_cache counter",
+            f"# HELP {prefix}_check_cache Checks with results from the manifest (hit) or run (miss).",
+        ]
+        lines.extend(f'{prefix}_check_cache_total{{result="{result}"}} {count}' for result, count in self.cache.items())
+        lines += [
+            f"# TYPE {prefix}_check_duration_seconds histogram",
+            f"# UNIT {prefix}_check_duration_seconds seconds",
+            f"# HELP {prefix}_check_duration_seconds Duration of checks run.",
+        ]
+        for name, counts in sorted(self.duration_counts.items()):
+            cumulative = 0
+            for bound, count in zip([*map(format_float, DURATION_BUCKETS), "+Inf"], counts):
+                cumulative += count
+                lines.append(f'{prefix}_check_duration_seconds_bucket{{check="{name}",le="{bound}"}} {cumulative}')
+            total = format_float(self.duration_sums[name])
+            lines.append(f'{prefix}_check_duration_seconds_count{{check="{name}"}} {cumulative}')
+            lines.append(f'{prefix}_check_duration_seconds_sum{{check="{name}"}} {total}')
+        lines.append("# EOF")
+        return lines
+
+    def write(self, path: pathlib.Path) -> None:
+        """Write the metrics in a file (replaced atomically).
+
+        :param path: path to the file
+        """
+        new_path = path.with_name(f"{path.name}.new")
+        new_path.write_text("".join(f"{line}\n" for line in self.get_lines()), encoding="utf-8")
+        new_path.replace(path)
@@ -0,0 +1,206 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Outputs of results: JSON Lines and SARIF formats."""
+
+from __future__ import annotations
+
+import importlib.metadata
+import json
+import sys
+from typing import TYPE_CHECKING, Any, TextIO
+
+from weechat_script_lint.script import MESSAGES
+
+if TYPE_CHECKING:
+    import pathlib
+
+    from weechat_script_lint.script import WeechatScript
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS: dict[str, str] = {
+    "error": "error",
+    "warning": "warning",
+    "info": "note",
+}
+TOOL_URI = "https://github.com/weechat/weechat-script-lint"
+
+
+def to_json(obj: Any) -> str:  # noqa: ANN401
+    """Return compact JSON for an object.
+
+    :param obj: object to convert
+    :return: JSON string, on a single line
+    """
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class Output:
+    """An output receiving results of checked scripts."""
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:
+        """Receive a checked script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:
+        """Receive the final report, after all scripts are checked.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+
+
+class JsonlWriter(Output):
+    """Write results as JSON Lines: one object per message and per script."""
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        """Initialize the writer.
+
+        :param stream: output stream (default: standard output)
+        """
+        self.stream: TextIO = stream or sys.stdout
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:  # noqa: ARG002
+        """Write messages and score of a checked script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+        for msg in script.messages:
+            obj = {
+                "type": "message",
+                "path": str(path),
+                "line": msg.line,
+                "level": msg.level,
+                "name": msg.msg_name,
+                "text": msg.text,
+            }
+            self.stream.write(f"{to_json(obj)}\n")
+        obj = {
+            "type": "script",
+            "path": str(path),
+            "score": script.score,
+            "count": script.count,
+        }
+        self.stream.write(f"{to_json(obj)}\n")
+        self.stream.flush()
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:
+        """Write the final report.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+        obj = {
+            "type": "report",
+            "scripts": num_scripts,
+            "scripts_with_issues": num_scripts_with_issues,
+            "count": count,
+        }
+        self.stream.write(f"{to_json(obj)}\n")
+        self.stream.flush()
+
+
+class SarifWriter(Output):
+    """Write results as a SARIF log, without keeping results in memory.
+
+    The rules are known in advance, so the log header is written first,
+    then each result as soon as the script is checked, and the end of log
+    is written by the method close.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        """Initialize the writer and write the header of the SARIF log.
+
+        :param stream: output stream (default: standard output)
+        """
+        self.stream: TextIO = stream or sys.stdout
+        self.rule_index: dict[str, int] = {}
+        rules = []
+        for level, messages in MESSAGES.items():
+            for msg_name, (_, text) in messages.items():
+                self.rule_index[msg_name] = len(rules)
+                rules.append(
+                    {
+                        "id": msg_name,
+                        "shortDescription": {"text": text},
+                        "defaultConfiguration": {"level": SARIF_LEVELS[level]},
+                    },
+                )
+        driver = {
+            "name": "weechat-script-lint",
+            "version": importlib.metadata.version("weechat_script_lint"),
+            "informationUri": TOOL_URI,
+            "rules": rules,
+        }
+        header = to_json({"version": SARIF_VERSION, "$schema": SARIF_SCHEMA})[:-1]
+        self.stream.write(f'{header},"runs":[{{"tool":{{"driver":{to_json(driver)}}},"results":[')
+        self.first_result = True
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:  # noqa: ARG002
+        """Write results for a checked script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+        uri = path.as_uri() if path.is_absolute() else path.as_posix()
+        for msg in script.messages:
+            result = {
+                "ruleId": msg.msg_name,
+                "ruleIndex": self.rule_index[msg.msg_name],
+                "level": SARIF_LEVELS[msg.level],
+                "message": {"text": msg.text},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": {"uri": uri},
+                            "region": {"startLine": msg.line},
+                        },
+                    },
+                ],
+            }
+            self.stream.write(f"\n{to_json(result)}" if self.first_result else f",\n{to_json(result)}")
+            self.first_result = False
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:  # noqa: ARG002
+        """Write the end of the SARIF log.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+        self.stream.write("\n]}]}\n")
+        self.stream.flush()
+
+
+OUTPUT_WRITERS = {
+    "jsonl": JsonlWriter,
+    "sarif": SarifWriter,
+}
@@ -0,0 +1,641 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+"""Facts about Python scripts, extracted only around the names searched.
+
+The whole script is not tokenized (too slow on big scripts): the names are
+searched in the text, the line of each name found is read to skip comments
+and strings, import statements are read with a small lexer and tokenize is
+used only on calls.
+"""
+
+from __future__ import annotations
+
+import ast
+import bisect
+import contextlib
+import functools
+import heapq
+import re
+import tokenize
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from weechat_script_lint.script import ScriptContent
+
+# tokens which are not part of the code of a logical line
+IGNORED_TOKENS = frozenset(
+    {
+        tokenize.COMMENT,
+        tokenize.NL,
+        tokenize.INDENT,
+        tokenize.DEDENT,
+        tokenize.ENCODING,
+        tokenize.ENDMARKER,
+    },
+)
+
+# bytes of identifiers (non-ASCII bytes are parts of UTF-8 letters)
+IDENTIFIER_BYTES = frozenset(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_" + bytes(range(0x80, 0x100)),
+)
+
+# end of an identifier (a lookbehind for the start would make searches slow)
+IDENTIFIER_END = rb"(?![\w\x80-\xff])"
+
+# attribute after a name, for example ".name" in "weechat.name"
+ATTRIBUTE_REGEX = re.compile(rb"[ \t]*\.[ \t]*[A-Za-z_\x80-\xff]")
+
+# tokens of statements, to find import statements: words, dots, commas,
+# brackets and end of statement (comments, strings and other characters
+# are skipped)
+STATEMENT_TOKEN_REGEX = re.compile(
+    rb"(?P<word>[A-Za-z_\x80-\xff][\w\x80-\xff]*|[.,])"
+    rb"|(?P<open>[(\[{])|(?P<close>[)\]}])"
+    rb"|(?P<end>;|\r?\n|\r|\Z)"
+    rb"|#[^\r\n]*|\\\r?\n"
+    rb"|'[^'\\\r\n]*(?:\\.[^'\\\r\n]*)*'?"
+    rb'|"[^"\\\r\n]*(?:\\.[^"\\\r\n]*)*"?',
+)
+
+# word "as" of an import with an alias
+AS_REGEX = re.compile(rb"as[ \t\\]")
+
+# start of a plain import statement on a line
+PLAIN_IMPORT_REGEX = re.compile(rb"[ \t]*import" + IDENTIFIER_END)
+
+# comment or string on a single line (the string may not be terminated)
+COMMENT_STRING_REGEX = re.compile(
+    rb"#[^\r\n]*"
+    rb"|'[^'\\\r\n]*(?:\\.[^'\\\r\n]*)*'?"
+    rb'|"[^"\\\r\n]*(?:\\.[^"\\\r\n]*)*"?',
+)
+
+# indentation of lines with code, by kind (the first line can not be indented)
+INDENT_REGEX = {
+    "tabs": re.compile(rb"\n\t+(?=[^ \t\r\n#\f])"),
+    "spaces": re.compile(rb"\n +(?=[^ \t\r\n#\f])"),
+    "mixed": re.compile(rb"\n(?:\t+ | +\t)[ \t]*(?=[^ \t\r\n#\f])"),
+}
+
+NEWLINE_REGEX = re.compile(rb"\n")
+
+# quotes of triple-quoted strings (searched separately: a regex with both
+# is much slower on big scripts)
+TRIPLE_QUOTES_REGEXES = (re.compile(rb"'''"), re.compile(rb'"""'))
+
+# max number of lines tokenized for a call, so that a parenthesis never
+# closed does not make each call read the whole script
+MAX_STATEMENT_LINES = 100
+
+
+class PythonCall:
+    """A call to a function in a Python script."""
+
+    def __init__(self, line: int, name: str, args: list[str | None]) -> None:
+        """Initialize a call.
+
+        :param line: line number of the function name
+        :param name: dotted name of function, as written in the script
+        :param args: arguments: value of literal strings, None for other
+            arguments
+        """
+        self.line: int = line
+        self.name: str = name
+        self.args: list[str | None] = args
+
+
+class PythonFacts:
+    """Facts about a Python script: imports, names used, calls and indentation.
+
+    Only the code is used: names in comments and strings are ignored. The facts
+    are extracted on demand, only around the names searched.
+    """
+
+    def __init__(self, content: ScriptContent) -> None:
+        """Initialize facts.
+
+        :param content: content of the script
+        """
+        self.content: ScriptContent = content
+        # imported names: local name -> qualified name (found on first use)
+        self._imports: dict[str, str] | None = None
+        # True if the script has only plain imports (not read)
+        self._plain_imports: bool = False
+        # import statements: offsets of start and end
+        self._import_starts: list[int] = []
+        self._import_ends: list[int] = []
+        # triple-quoted strings: offsets of start and end (found on first use)
+        self._string_starts: list[int] | None = None
+        self._string_ends: list[int] = []
+        # caches for the last line read (many names can be found on a line):
+        # last offset converted to a line number, with its line number
+        self._last_line: tuple[int, int] = (0, 1)
+        # bounds of the last line: offsets of start and end
+        self._line_bounds: tuple[int, int] = (0, 0)
+        # comments and strings of the last code read: code start, offsets
+        # of start and end of comments and strings
+        self._comments_strings: tuple[int, list[int], list[int]] = (-1, [], [])
+        # last logical line tokenized: offsets of start and end, tokens, lines
+        self._statement: tuple[int, int, list[tokenize.TokenInfo], list[tuple[int, str, bool]]] = (0, 0, [], [])
+
+    @property
+    def imports(self) -> dict[str, str]:
+        """Return the imported names (found on first call).
+
+        :return: dict with local name -> qualified name
+        """
+        if self._imports is None:
+            self._imports = {}
+            if self.content.find(b"from") < 0 and not AS_REGEX.search(self.content):
+                # only plain imports ("import a.b"), which do not change the
+                # names: the statements are not read (see method iter_names)
+                self._plain_imports = True
+                return self._imports
+            end = 0
+            for start, _ in self.iter_words(["import"]):
+                if start >= end and self.is_code(start):
+                    end = self.add_imports(self.get_code_start(start))
+        return self._imports
+
+    @property
+    def indents(self) -> set[str]:
+        """Return the indentation of lines with code.
+
+        :return: kinds of indentation found: "tabs", "spaces" and/or "mixed"
+        """
+        # the last blank of indentation is checked: a line can start with
+        # a string, but not in a triple-quoted string started before
+        return {
+            kind
+            for kind, regex in INDENT_REGEX.items()
+            if any(self.is_code(match.end() - 1) for match in regex.finditer(self.content))
+        }
+
+    def get_strings(self) -> tuple[list[int], list[int]]:
+        """Return the triple-quoted strings (found on first call).
+
+        :return: tuple (starts, ends): offsets of start and end of strings
+        """
+        if self._string_starts is None:
+            starts: list[int] = []
+            self._string_starts = starts
+            end = 0
+            matches = [match for regex in TRIPLE_QUOTES_REGEXES for match in regex.finditer(self.content)]
+            matches.sort(key=lambda match: match.start())
+            for match in matches:
+                # strings found so far are used to check if the quotes are in code
+                if match.start() < end or not self.is_code(match.start()):
+                    continue
+                end = find_string_end(self.content, match.end(), match.group())
+                starts.append(match.start())
+                self._string_ends.append(end)
+        return self._string_starts, self._string_ends
+
+    def get_code_start(self, offset: int) -> int:
+        """Return the offset where the code starts on the line of an offset.
+
+        :param offset: offset in the script content
+        :return: offset of the line start, or of the end of a triple-quoted
+            string ending on the line before the offset; -1 if the offset
+            is in a triple-quoted string
+        """
+        starts, ends = self.get_strings()
+        line_start, line_end = self._line_bounds
+        if not line_start <= offset < line_end:
+            line_start = self.content.rfind(b"\n", 0, offset) + 1
+            line_end = self.content.find(b"\n", offset)
+            line_end = len(self.content) if line_end < 0 else line_end + 1
+            self._line_bounds = (line_start, line_end)
+        index = bisect.bisect_right(starts, offset) - 1
+        if index < 0:
+            return line_start
+        if offset < ends[index]:
+            return -1
+        return max(line_start, ends[index])
+
+    def is_code(self, offset: int) -> bool:
+        """Check if an offset is in the code (not in a comment or a string).
+
+        :param offset: offset in the script content
+        :return: True if the offset is in the code
+        """
+        start = self.get_code_start(offset)
+        if start < 0:
+            return False
+        code_start, starts, ends = self._comments_strings
+        if start != code_start:
+            # comments and strings until the end of line (after a triple-quoted
+            # string starting on the line, they are not used)
+            matches = list(COMMENT_STRING_REGEX.finditer(self.content, start, self._line_bounds[1]))
+            starts = [match.start() for match in matches]
+            ends = [match.end() for match in matches]
+            self._comments_strings = (start, starts, ends)
+        index = bisect.bisect_left(starts, offset) - 1
+        return index < 0 or offset >= ends[index]
+
+    def get_statement(self, offset: int) -> tuple[list[tokenize.TokenInfo], list[tuple[int, str, bool]]]:
+        """Return the tokens of the logical line with an offset.
+
+        The line is tokenized from the start of the code on the physical line
+        of the offset (it can be in parentheses opened on a previous line).
+
+        :param offset: offset in the code
+        :return: tuple (tokens, lines): code tokens of the logical line, lines
+            read by the tokenizer (see function get_tokens)
+        """
+        start, end, tokens, lines = self._statement
+        if not start <= offset < end:
+            start = self.get_code_start(offset)
+            tokens, lines = get_tokens(self.content, start)
+            end = lines[-1][0] + len(lines[-1][1].encode("utf-8", errors="surrogateescape")) if lines else offset + 1
+            self._statement = (start, end, tokens, lines)
+        return tokens, lines
+
+    def get_line(self, offset: int) -> int:
+        """Return the line number of an offset.
+
+        Newlines are counted from the last offset converted, so offsets in
+        ascending order are converted with a single pass on the script.
+
+        :param offset: offset in the script content
+        :return: line number (first line is 1)
+        """
+        last_offset, line = self._last_line
+        if offset < last_offset:
+            last_offset, line = 0, 1
+        if isinstance(self.content, bytes):
+            line += self.content.count(b"\n", last_offset, offset)
+        else:
+            # memory-mapped file: count without a copy of the content
+            line += sum(1 for _ in NEWLINE_REGEX.finditer(self.content, last_offset, offset))
+        self._last_line = (offset, line)
+        return line
+
+    def iter_words(self, words: Iterable[str]) -> Iterator[tuple[int, int]]:
+        """Yield the offsets of words in the script (in code or not).
+
+        :param words: words to search (identifiers)
+        :return: tuples (start, end), in ascending order
+        """
+        searches = [get_word_regex(word).finditer(self.content) for word in words]
+        matches = searches[0] if len(searches) == 1 else heapq.merge(*searches, key=lambda match: match.start())
+        for match in matches:
+            start = match.start()
+            if start == 0 or self.content[start - 1] not in IDENTIFIER_BYTES:
+                yield match.span()
+
+    def get_name(self, start: int, end: int) -> tuple[int, str] | None:
+        """Return the dotted name ending with an identifier.
+
+        :param start: offset of the identifier
+        :param end: offset after the identifier
+        :return: tuple (offset, name): offset and dotted name as written in
+            the script (starting with "." for an attribute of an expression,
+            for example "obj().name"), None if the identifier is followed by
+            an attribute or is the name of a function or class defined
+        """
+        content = self.content
+        if ATTRIBUTE_REGEX.match(content, end):
+            return None
+        while True:
+            offset = skip_blanks_backward(content, start)
+            if offset == 0 or content[offset - 1] != ord("."):
+                break
+            word_end = skip_blanks_backward(content, offset - 1)
+            word_start = find_word_start(content, word_end)
+            if word_start == word_end or content[word_start] in b"0123456789":
+                # attribute of an expression, for example "obj().name"
+                start = offset - 1
+                break
+            start = word_start
+        if content[find_word_start(content, offset) : offset] in {b"def", b"class"}:
+            return None
+        name = re.sub(rb"[ \t]+", b"", content[start:end]).decode("utf-8", errors="replace")
+        return start, name
+
+    def resolve(self, name: str) -> str:
+        """Return the qualified name of a dotted name, with imports.
+
+        :param name: dotted name, as written in the script
+        :return: qualified name (for example "sys.exit" for "exit" after
+            "from sys import exit")
+        """
+        first, dot, rest = name.partition(".")
+        return f"{self.imports.get(first, first)}{dot}{rest}"
+
+    @staticmethod
+    def match(name: str, qualified_name: str) -> bool:
+        """Check if a qualified name is a name, qualified or not.
+
+        :param name: name to find, for example "infolist_get"
+        :param qualified_name: qualified name, for example "weechat.infolist_get"
+        :return: True if the name matches
+        """
+        return qualified_name == name or qualified_name.endswith(f".{name}")
+
+    def iter_names(self, name: str) -> Iterator[tuple[int, str]]:
+        """Yield the uses of a name in the code.
+
+        :param name: name, qualified or not (for example "sys.exit" or
+            "infolist_get")
+        :return: tuples (offset, name as written in the script), in
+            ascending order
+        """
+        # the last part of the name is searched, and the local names imported
+        # with an alias (for example "quit_now" after "from sys import exit as quit_now")
+        words = {name.rpartition(".")[2]}
+        words.update(local for local, qualified in self.imports.items() if self.match(name, qualified))
+        for start, end in self.iter_words(words):
+            index = bisect.bisect_right(self._import_starts, start) - 1
+            if index >= 0 and start < self._import_ends[index]:
+                continue
+            found = self.get_name(start, end)
+            if not found or not self.match(name, self.resolve(found[1])) or not self.is_code(found[0]):
+                continue
+            if self._plain_imports and PLAIN_IMPORT_REGEX.match(self.content, self.get_code_start(found[0])):
+                continue
+            yield found
+
+    def has_name(self, name: str) -> bool:
+        """Check if a name is used (search stops at first use).
+
+        :param name: name, qualified or not (for example "sys.exit" or
+            "infolist_get")
+        :return: True if the name is used
+        """
+        return next(self.iter_names(name), None) is not None
+
+    def find_names(self, name: str) -> list[int]:
+        """Return line numbers where a name is used.
+
+        :param name: name, qualified or not (for example "sys.exit" or
+            "infolist_get")
+        :return: line numbers
+        """
+        return [self.get_line(offset) for offset, _ in self.iter_names(name)]
+
+    def find_calls(self, name: str) -> list[PythonCall]:
+        """Return calls to a function.
+
+        :param name: name of function, qualified or not (for example
+            "info_get" or "weechat.info_get")
+        :return: calls
+        """
+        calls = []
+        tokens: list[tokenize.TokenInfo] = []
+        starts: list[tuple[int, int]] = []
+        for offset, used_name in self.iter_names(name):
+            statement_tokens, lines = self.get_statement(offset)
+            if statement_tokens is not tokens:
+                tokens = statement_tokens
+                starts = [token.start for token in tokens]
+            # index of token after the name (words and dots)
+            index = bisect.bisect_left(starts, get_position(lines, offset))
+            index += 2 * used_name.count(".") + (0 if used_name.startswith(".") else 1)
+            if index < len(tokens) and tokens[index].string == "(":
+                calls.append(PythonCall(self.get_line(offset), used_name, get_arguments(tokens, index)))
+        return calls
+
+    def add_imports(self, start: int) -> int:
+        """Add names imported by the statements of a logical line.
+
+        :param start: offset of the code on the line
+        :return: offset of the end of the logical line
+        """
+        words: list[str] = []
+        statement_start = start
+        depth = 0
+        for match in STATEMENT_TOKEN_REGEX.finditer(self.content, start):
+            kind = match.lastgroup
+            if kind == "word":
+                if not words:
+                    statement_start = match.start()
+                words.append(match.group().decode("utf-8", errors="replace"))
+            elif kind == "open":
+                depth += 1
+            elif kind == "close":
+                depth = max(depth - 1, 0)
+            elif kind == "end" and (depth == 0 or match.group() in {b";", b""}):
+                if words and words[0] in {"import", "from"}:
+                    self.add_import(words)
+                    self._import_starts.append(statement_start)
+                    self._import_ends.append(match.start())
+                words = []
+                if match.group() != b";":
+                    return match.end()
+        return len(self.content)
+
+    def add_import(self, words: list[str]) -> None:
+        """Add names imported by an import statement.
+
+        :param words: words of statement "import ..." or "from ... import ...":
+            names, dots and commas
+        """
+        module = ""
+        if words[0] == "from":
+            if "import" not in words:
+                return
+            index = words.index("import")
+            module = "".join(words[1:index])
+            words = words[index + 1 :]
+        else:
+            words = words[1:]
+        for item in " ".join(words).replace(" . ", ".").split(","):
+            parts = item.split()
+            if not parts:
+                continue
+            qualified = f"{module}.{parts[0]}" if module else parts[0]
+            if len(parts) == 3 and parts[1] == "as":  # noqa: PLR2004
+                self.imports[parts[2]] = qualified
+            elif module:
+                self.imports[parts[0]] = qualified
+            else:
+                first = parts[0].split(".")[0]
+                self.imports[first] = first
+
+
+@functools.lru_cache(maxsize=256)
+def get_word_regex(word: str) -> re.Pattern[bytes]:
+    """Compile a regular expression to search a word.
+
+    :param word: word (identifier)
+    :return: compiled regular expression (the start of word is not checked)
+    """
+    return re.compile(re.escape(word.encode("utf-8")) + IDENTIFIER_END)
+
+
+def skip_blanks_backward(content: ScriptContent, offset: int) -> int:
+    """Return the offset before spaces and tabs ending at an offset.
+
+    :param content: content of the script
+    :param offset: offset in the script content
+    :return: offset of the first space or tab before the offset (the offset
+        itself if there are none)
+    """
+    while offset > 0 and content[offset - 1] in b" \t":
+        offset -= 1
+    return offset
+
+
+def find_word_start(content: ScriptContent, offset: int) -> int:
+    """Return the start of an identifier ending at an offset.
+
+    :param content: content of the script
+    :param offset: offset after the identifier
+    :return: offset of the identifier (the offset itself if there is no
+        identifier before)
+    """
+    while offset > 0 and content[offset - 1] in IDENTIFIER_BYTES:
+        offset -= 1
+    return offset
+
+
+def find_string_end(content: ScriptContent, start: int, quotes: bytes) -> int:
+    """Return the end of a triple-quoted string.
+
+    :param content: content of the script
+    :param start: offset after the opening quotes
+    :param quotes: quotes of the string (three single or double quotes)
+    :return: offset after the closing quotes, length of content if the string
+        is not terminated
+    """
+    offset = start
+    while True:
+        end = content.find(quotes, offset)
+        if end < 0:
+            return len(content)
+        escape = end
+        while escape > start and content[escape - 1] == ord("\\"):
+            escape -= 1
+        if (end - escape) % 2 == 0:
+            return end + len(quotes)
+        offset = end + 1
+
+
+def get_tokens(content: ScriptContent, start: int) -> tuple[list[tokenize.TokenInfo], list[tuple[int, str, bool]]]:
+    """Tokenize the code of a logical line, from an offset.
+
+    :param content: content of the script
+    :param start: offset of the first token, in the code
+    :return: tuple (tokens, lines): code tokens until the end of the logical
+        line (partial if it can not be tokenized), lines read: tuples (offset,
+        text, True if the text is ASCII)
+    """
+    lines: list[tuple[int, str, bool]] = []
+    offset = start
+
+    def readline() -> str:
+        nonlocal offset
+        if offset >= len(content) or len(lines) >= MAX_STATEMENT_LINES:
+            return ""
+        end = content.find(b"\n", offset)
+        end = len(content) if end < 0 else end + 1
+        # bytes not UTF-8 are kept, so that offsets of tokens can be computed
+        line = content[offset:end]
+        lines.append((offset, line.decode("utf-8", errors="surrogateescape"), line.isascii()))
+        offset = end
+        return lines[-1][1]
+
+    tokens = []
+    with contextlib.suppress(SyntaxError, tokenize.TokenError):
+        for token in tokenize.generate_tokens(readline):
+            if token.type in {tokenize.NEWLINE, tokenize.ENDMARKER}:
+                break
+            if token.type not in IGNORED_TOKENS:
+                tokens.append(token)
+    return tokens, lines
+
+
+def get_position(lines: list[tuple[int, str, bool]], offset: int) -> tuple[int, int]:
+    """Return the token position of an offset.
+
+    :param lines: lines read by the tokenizer (see function get_tokens)
+    :param offset: offset in the script content
+    :return: position: (row, column)
+    """
+    row = bisect.bisect_right([line[0] for line in lines], offset)
+    line_offset, line, ascii_line = lines[row - 1]
+    if ascii_line:
+        return row, offset - line_offset
+    prefix = line.encode("utf-8", errors="surrogateescape")[: offset - line_offset]
+    return row, len(prefix.decode("utf-8", errors="surrogateescape"))
+
+
+def get_literal(tokens: list[tokenize.TokenInfo]) -> str | None:
+    """Return the value of an argument if it is a literal string.
+
+    :param tokens: tokens of argument
+    :return: value of string (bytes are decoded), None if the argument
+        is not a literal string
+    """
+    if not tokens or any(token.type != tokenize.STRING for token in tokens):
+        return None
+    try:
+        value = ast.literal_eval(" ".join(token.string for token in tokens))
+    except (ValueError, SyntaxError):
+        return None
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value if isinstance(value, str) else None
+
+
+def get_arguments(tokens: list[tokenize.TokenInfo], start: int) -> list[str | None]:
+    """Return the arguments of a call.
+
+    :param tokens: tokens of the logical line
+    :param start: index of the opening parenthesis of the call
+    :return: arguments: value of literal strings, None for other arguments
+    """
+    args = []
+    arg: list[tokenize.TokenInfo] = []
+    depth = 0
+    for token in tokens[start + 1 :]:
+        if token.string in {"(", "[", "{"}:
+            depth += 1
+        elif token.string in {")", "]", "}"}:
+            if depth == 0:
+                break
+            depth -= 1
+        elif token.string == "," and depth == 0:
+            args.append(get_literal(arg))
+            arg = []
+            continue
+        arg.append(token)
+    if arg:
+        args.append(get_literal(arg))
+    return args
+
+
+def get_python_facts(content: ScriptContent) -> PythonFacts:
+    """Return the facts of the content of a Python script.
+
+    The facts are extracted on demand, when they are read: the script can
+    have errors (for example Python 2 syntax or invalid UTF-8), only the
+    statements around the names searched are read.
+
+    :param content: content of the script
+    :return: facts
+    """
+    return PythonFacts(content)
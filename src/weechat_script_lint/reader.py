@@ -0,0 +1,84 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Read scripts ahead of the analysis."""
+
+import pathlib
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from weechat_script_lint.script import ScriptContent, read_script
+
+# max number of threads used to read files ahead
+READ_THREADS = 4
+
+# default max number of bytes held by files read ahead
+PREFETCH_BYTES = 64 * 1024 * 1024
+
+
+def read_scripts(
+    scripts: Iterable[tuple[pathlib.Path, int]],
+    prefetch: int = 0,
+    max_bytes: int = PREFETCH_BYTES,
+) -> Generator[tuple[pathlib.Path, ScriptContent], None, None]:
+    """Read scripts, with optional read-ahead in a thread pool.
+
+    Scripts are returned in the same order as the paths received, whatever
+    the order in which they are read.
+
+    Without read-ahead, big scripts are memory-mapped; with read-ahead,
+    scripts are always read, so that the data is in memory when the script
+    is checked.
+
+    The size of a script is reserved when its read is started, so that
+    slow reads (for example on a network file system) can not hold more
+    than the max number of bytes.
+
+    :param scripts: tuples (path, size), the size is the one returned by stat
+    :param prefetch: max number of files to read ahead (0 = no read-ahead)
+    :param max_bytes: max number of bytes held by files read ahead and not
+        yet returned; at least one file is always read, even if bigger
+    :return: tuples (path, content)
+    """
+    if prefetch <= 0:
+        for path, _ in scripts:
+            yield path, read_script(path)
+        return
+
+    it_scripts = iter(scripts)
+    next_script = next(it_scripts, None)
+    pending: deque[tuple[pathlib.Path, int, Future[bytes]]] = deque()
+    held_bytes = 0
+    with ThreadPoolExecutor(max_workers=min(prefetch, READ_THREADS)) as executor:
+        while True:
+            while next_script is not None and len(pending) < prefetch:
+                path, size = next_script
+                if pending and held_bytes + size > max_bytes:
+                    break
+                pending.append((path, size, executor.submit(path.read_bytes)))
+                held_bytes += size
+                next_script = next(it_scripts, None)
+            if not pending:
+                break
+            path, size, future = pending.popleft()
+            held_bytes -= size
+            yield path, future.result()
@@ -0,0 +1,159 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Sharding of scripts and results files, used to merge results of shards."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import pathlib
+from typing import TYPE_CHECKING, Any
+
+from weechat_script_lint.output import Output, to_json
+from weechat_script_lint.script import MESSAGES, WeechatScript
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+
+class ResultsError(Exception):
+    """Invalid results file."""
+
+
+def in_shard(path: pathlib.Path, shard: int, num_shards: int) -> bool:
+    """Check if a script belongs to a shard.
+
+    The shard is computed with a hash of the path, so it is the same
+    on all machines, whatever the order in which files are found.
+
+    :param path: path to the script
+    :param shard: shard number (from 1 to num_shards)
+    :param num_shards: number of shards
+    :return: True if the script belongs to the shard
+    """
+    digest = hashlib.sha1(path.as_posix().encode("utf-8"), usedforsecurity=False).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards == shard - 1
+
+
+def script_to_record(index: int, path: pathlib.Path, script: WeechatScript) -> dict[str, Any]:
+    """Return a record with the results of a checked script.
+
+    Score and counters are not stored: they are computed again from
+    messages when the record is read.
+
+    :param index: index of script in the list of all scripts found
+    :param path: path to the script
+    :param script: the checked script
+    :return: record
+    """
+    return {
+        "index": index,
+        "path": str(path),
+        "resolved": str(script.path),
+        "messages": [[msg.level, msg.msg_name, msg.line, msg.kwargs] for msg in script.messages],
+    }
+
+
+def record_to_script(
+    record: dict[str, Any],
+    use_colors: bool = True,  # noqa: FBT001,FBT002
+) -> tuple[int, pathlib.Path, WeechatScript]:
+    """Return a script with results from a record.
+
+    :param record: record
+    :param use_colors: True to use colors in output
+    :return: tuple (index, path, script)
+    :raise ResultsError: if a message is unknown (for example a custom rule
+        not loaded)
+    """
+    script = WeechatScript(pathlib.Path(record["resolved"]), use_colors=use_colors, content=b"", resolved=True)
+    for level, msg_name, line, kwargs in record["messages"]:
+        if msg_name not in MESSAGES.get(level, {}):
+            msg = f"unknown message {msg_name} (option --rules missing?)"
+            raise ResultsError(msg)
+        script.message(level, msg_name, line=line, **kwargs)
+    return record["index"], pathlib.Path(record["path"]), script
+
+
+class ResultsWriter(Output):
+    """Write results of checked scripts in a file (JSON Lines)."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """Open the results file.
+
+        :param path: path to the results file
+        """
+        self.file = path.open("w", encoding="utf-8")
+
+    def add_script(self, index: int, path: pathlib.Path, script: WeechatScript) -> None:
+        """Write results of a checked script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param script: the checked script
+        """
+        self.file.write(f"{to_json(script_to_record(index, path, script))}\n")
+
+    def close(self, num_scripts: int, num_scripts_with_issues: int, count: dict[str, int]) -> None:  # noqa: ARG002
+        """Close the results file.
+
+        :param num_scripts: number of script analyzed
+        :param num_scripts_with_issues: number of scripts with issues
+        :param count: counters (errors/warnings/info)
+        """
+        self.file.close()
+
+
+def read_results_file(
+    path: pathlib.Path,
+    use_colors: bool = True,  # noqa: FBT001,FBT002
+) -> Generator[tuple[int, pathlib.Path, WeechatScript], None, None]:
+    """Read a results file.
+
+    :param path: path to the results file
+    :param use_colors: True to use colors in output
+    :return: tuples (index, path, script)
+    """
+    with path.open(encoding="utf-8") as results_file:
+        for line in results_file:
+            if line.strip():
+                yield record_to_script(json.loads(line), use_colors=use_colors)
+
+
+def merge_results_files(
+    paths: Iterable[pathlib.Path],
+    use_colors: bool = True,  # noqa: FBT001,FBT002
+) -> Generator[tuple[int, pathlib.Path, WeechatScript], None, None]:
+    """Merge results files, in the order of scripts found by a single run.
+
+    Each results file is sorted by index, so the files are merged without
+    loading them entirely in memory.
+
+    :param paths: paths to results files
+    :param use_colors: True to use colors in output
+    :return: tuples (index, path, script)
+    """
+    yield from heapq.merge(
+        *[read_results_file(path, use_colors=use_colors) for path in paths],
+        key=lambda item: item[0],
+    )
@@ -0,0 +1,304 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Custom rules, loaded from a TOML file."""
+
+from __future__ import annotations
+
+import bisect
+import re
+import string
+import sys
+from typing import TYPE_CHECKING, Any
+
+from weechat_script_lint.script import LEVEL_LABELS, MESSAGES, decode
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    try:
+        import tomli as tomllib  # ty: ignore[unresolved-import]
+    except ImportError:
+        tomllib = None
+
+if TYPE_CHECKING:
+    import pathlib
+
+    from weechat_script_lint.script import ScriptContent, WeechatScript
+
+RULE_NAME_REGEX = re.compile(r"[a-z][a-z0-9_]*")
+
+BUILTIN_MESSAGES = {msg_name for messages in MESSAGES.values() for msg_name in messages}
+
+
+class RulesError(Exception):
+    """Invalid custom rules."""
+
+
+class CustomRule:
+    """A custom rule: a regular expression to search in scripts."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        name: str,
+        level: str,
+        *,
+        score: int,
+        message: str,
+        pattern: str,
+        suffixes: tuple[str, ...] = (),
+        unless: str = "",
+        ignore_case: bool = False,
+    ) -> None:
+        """Initialize a custom rule.
+
+        :param name: name of message
+        :param level: level of message: "error", "warning", "info"
+        :param score: score (negative number or zero)
+        :param message: message, with optional arguments: "{match}" (text
+            found) and named groups of the pattern
+        :param pattern: regular expression to search
+        :param suffixes: suffixes of scripts checked (empty = all scripts)
+        :param unless: regular expression: if found (outside the text matched
+            by the pattern), the rule is not reported
+        :param ignore_case: True to ignore case in pattern and unless
+        :raise RulesError: if the score, message or a regular expression is
+            invalid
+        """
+        self.name: str = name
+        self.level: str = level
+        self.score: int = score
+        self.message: str = message
+        self.pattern: str = pattern
+        self.suffixes: tuple[str, ...] = suffixes
+        self.unless: str = unless
+        self.ignore_case: bool = ignore_case
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            self.regex: re.Pattern[bytes] = re.compile(pattern.encode("utf-8"), flags=flags)
+            self.unless_regex: re.Pattern[bytes] | None = (
+                re.compile(unless.encode("utf-8"), flags=flags) if unless else None
+            )
+        except re.error as exc:
+            msg = f"rule {name}: invalid regular expression: {exc}"
+            raise RulesError(msg) from exc
+        self.group_names: list[str] = list(self.regex.groupindex)
+        if score > 0:
+            msg = f"rule {name}: invalid score: {score} (must be negative or zero)"
+            raise RulesError(msg)
+        self.check_message()
+
+    def check_message(self) -> None:
+        """Check that the message can be formatted with the texts found.
+
+        :raise RulesError: if the message has an argument which is not
+            "match" or a named group of the pattern, or an invalid format
+        """
+        fields = {"match", *self.group_names}
+        try:
+            names = [field for _, field, _, _ in string.Formatter().parse(self.message) if field is not None]
+            unknown = [field for field in names if field not in fields]
+            if unknown:
+                msg = f"rule {self.name}: unknown argument in message: {{{unknown[0]}}}"
+                raise RulesError(msg)
+            self.message.format(**dict.fromkeys(fields, ""))
+        except ValueError as exc:
+            msg = f"rule {self.name}: invalid message: {exc}"
+            raise RulesError(msg) from exc
+
+    def applies_to(self, suffix: str) -> bool:
+        """Check if the rule applies to scripts with a suffix.
+
+        :param suffix: suffix of script (eg: ".py")
+        :return: True if the rule applies to the script
+        """
+        return not self.suffixes or suffix in self.suffixes
+
+    def find(self, content: ScriptContent) -> list[tuple[int, dict[str, str]]]:
+        """Find the texts matched by the rule in the content of a script.
+
+        :param content: content of script
+        :return: list of tuples (offset, arguments of message), empty if
+            "unless" is found outside the texts matched
+        """
+        found: list[tuple[int, dict[str, str]]] = []
+        starts: list[int] = []
+        ends: list[int] = []
+        for m in self.regex.finditer(content):
+            kwargs = {"match": decode(m.group())}
+            for name in self.group_names:
+                kwargs[name] = decode(m.group(name) or b"")
+            found.append((m.start(), kwargs))
+            starts.append(m.start())
+            ends.append(m.end())
+        if found and self.is_excluded(content, starts, ends):
+            return []
+        return found
+
+    def is_excluded(self, content: ScriptContent, starts: list[int], ends: list[int]) -> bool:
+        """Check if "unless" is found outside the texts matched by the pattern.
+
+        :param content: content of script
+        :param starts: start offsets of texts matched by the pattern (sorted)
+        :param ends: end offsets of texts matched by the pattern
+        :return: True if the rule must not be reported
+        """
+        if self.unless_regex is None:
+            return False
+        m = self.unless_regex.search(content)
+        while m:
+            index = bisect.bisect_right(starts, m.start()) - 1
+            if index < 0 or m.start() >= ends[index]:
+                return True
+            # found in a text matched by the pattern: search after this text
+            m = self.unless_regex.search(content, ends[index])
+        return False
+
+
+class CustomRules:
+    """A set of custom rules.
+
+    Each rule is searched with its own regular expression (one pass on the
+    script per rule), so that a rule never changes what another rule finds:
+    a same text can be reported by multiple rules. The rules are not combined
+    in a single regular expression, which would report only one rule at a
+    given position.
+    """
+
+    def __init__(self, rules: list[CustomRule]) -> None:
+        """Initialize the set of rules.
+
+        :param rules: rules
+        """
+        self.rules: list[CustomRule] = rules
+
+    def register(self) -> None:
+        """Register messages of rules, so that they can be displayed (can be called multiple times).
+
+        This must be done before the checks, which do not change the messages
+        (they can run in parallel threads): messages already registered are
+        not written again.
+        """
+        for rule in self.rules:
+            if MESSAGES[rule.level].get(rule.name) != (rule.score, rule.message):
+                MESSAGES[rule.level][rule.name] = (rule.score, rule.message)
+
+    def check(self, script: WeechatScript) -> None:
+        """Check custom rules on a script.
+
+        :param script: script to check
+        """
+        # messages are added by decreasing level (errors first), like built-in checks
+        levels = list(LEVEL_LABELS)
+        for rule in sorted(self.rules, key=lambda rule: levels.index(rule.level)):
+            # after the stop of checks, only errors are added
+            if not rule.applies_to(script.path.suffix) or (script.stopped and rule.level != "error"):
+                continue
+            for offset, kwargs in rule.find(script.script):
+                script.message(rule.level, rule.name, line=script.line_number(offset), **kwargs)
+
+
+def get_value(name: str, values: dict[str, Any], key: str, value_type: type, default: Any = None) -> Any:  # noqa: ANN401
+    """Return a value of a rule read in a rules file, with its type checked.
+
+    :param name: name of rule
+    :param values: values of rule
+    :param key: key of value
+    :param value_type: expected type of value
+    :param default: default value (None if the key is required)
+    :return: value
+    :raise RulesError: if the key is missing or if the value has not the
+        expected type
+    """
+    if key not in values:
+        if default is None:
+            msg = f"rule {name}: missing key '{key}'"
+            raise RulesError(msg)
+        return default
+    value = values[key]
+    # bool is a subclass of int, but a boolean is not a valid number
+    if not isinstance(value, value_type) or (value_type is int and isinstance(value, bool)):
+        msg = f"rule {name}: invalid value for {key}: {value!r}"
+        raise RulesError(msg)
+    return value
+
+
+def get_rule(name: str, values: dict[str, Any]) -> CustomRule:
+    """Return a custom rule built with values read in a rules file.
+
+    :param name: name of rule
+    :param values: values of rule
+    :return: rule
+    """
+    if not RULE_NAME_REGEX.fullmatch(name):
+        msg = f"rule {name}: invalid name"
+        raise RulesError(msg)
+    if name in BUILTIN_MESSAGES:
+        msg = f"rule {name}: name already used by a built-in message"
+        raise RulesError(msg)
+    level = get_value(name, values, "level", str, "warning")
+    if level not in LEVEL_LABELS:
+        msg = f"rule {name}: invalid level: {level}"
+        raise RulesError(msg)
+    suffixes = get_value(name, values, "suffixes", list, [])
+    if not all(isinstance(suffix, str) for suffix in suffixes):
+        msg = f"rule {name}: invalid value for suffixes: {suffixes!r}"
+        raise RulesError(msg)
+    return CustomRule(
+        name,
+        level,
+        score=get_value(name, values, "score", int, -1),
+        message=get_value(name, values, "message", str),
+        pattern=get_value(name, values, "pattern", str),
+        suffixes=tuple(suffixes),
+        unless=get_value(name, values, "unless", str, ""),
+        ignore_case=get_value(name, values, "ignore_case", bool, False),  # noqa: FBT003
+    )
+
+
+def load_rules(path: pathlib.Path) -> CustomRules:
+    r"""Load custom rules from a TOML file.
+
+    Each rule is a table "rules.<name>", for example:
+
+        [rules.hook_fd]
+        level = "warning"
+        score = -5
+        message = "function hook_fd is not allowed"
+        pattern = 'hook_fd\\s*\\('
+        suffixes = [".py", ".pl"]
+
+    :param path: path to the TOML file
+    :return: rules
+    """
+    if tomllib is None:
+        msg = "module tomli is required to load rules with Python < 3.11"
+        raise RulesError(msg)
+    try:
+        with path.open("rb") as rules_file:
+            data = tomllib.load(rules_file)
+    except (OSError, tomllib.TOMLDecodeError) as exc:
+        msg = f"unable to read rules file {path}: {exc}"
+        raise RulesError(msg) from exc
+    rules = [get_rule(name, values) for name, values in data.get("rules", {}).items()]
+    custom_rules = CustomRules(rules)
+    custom_rules.register()
+    return custom_rules
@@ -0,0 +1,191 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Sampling of scripts, to estimate results on all scripts from a subset."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+from typing import TYPE_CHECKING
+
+from weechat_script_lint.scores import MAX_SCORE
+
+if TYPE_CHECKING:
+    import os
+    import pathlib
+    from collections.abc import Generator, Iterable
+
+    from weechat_script_lint.script import WeechatScript
+
+# quantile of the normal distribution for a 95% confidence interval
+CONFIDENCE_Z = 1.96
+
+# ranges of scores in the estimated distribution: (min, max)
+SCORE_RANGES = ((MAX_SCORE, MAX_SCORE), (80, 99), (50, 79), (0, 49))
+
+
+def get_sample_key(path: pathlib.Path, seed: int) -> float:
+    """Return the random key of a script, used to select it in a sample.
+
+    The key is computed with a hash of the seed and the path, so the sample
+    is the same on all runs with the same seed, whatever the order in which
+    files are found.
+
+    :param path: path to the script
+    :param seed: seed
+    :return: key, between 0 and 1 (excluded)
+    """
+    data = f"{seed}:{path.as_posix()}".encode()
+    digest = hashlib.sha1(data, usedforsecurity=False).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+class Sampler:
+    """Select a random sample of scripts and estimate results on all scripts.
+
+    The estimates use the mean of each value in the sample (number of
+    messages of each level, score, ...) and its confidence interval, with
+    the correction for a finite population (the interval is empty if all
+    scripts are in the sample).
+    """
+
+    def __init__(self, fraction: float = 0, count: int = 0, seed: int = 0) -> None:
+        """Initialize the sampler.
+
+        :param fraction: fraction of scripts to select, between 0 and 1
+            (used if count is 0)
+        :param count: number of scripts to select
+        :param seed: seed for the random selection
+        """
+        self.fraction: float = fraction
+        self.count: int = count
+        self.seed: int = seed
+        self.population: int = 0
+        self.size: int = 0
+        # value -> [sum, sum of squares] of values in the sample
+        self.sums: dict[str, list[float]] = {}
+
+    def select(
+        self,
+        scripts: Iterable[tuple[int, pathlib.Path, os.stat_result]],
+    ) -> Generator[tuple[int, pathlib.Path, os.stat_result], None, None]:
+        """Select the scripts of the sample, and count all scripts.
+
+        With a number of scripts, the scripts with the lowest keys are
+        selected: all scripts must be found before the first one is returned.
+
+        :param scripts: tuples (index, path, stat result)
+        :return: selected tuples, in the same order
+        """
+        if not self.count:
+            for script in scripts:
+                self.population += 1
+                if get_sample_key(script[1], self.seed) < self.fraction:
+                    yield script
+            return
+        # heap with the selected scripts: the highest key is the first item
+        heap: list[tuple[float, int, pathlib.Path, os.stat_result]] = []
+        for index, path, path_stat in scripts:
+            self.population += 1
+            item = (-get_sample_key(path, self.seed), index, path, path_stat)
+            if len(heap) < self.count:
+                heapq.heappush(heap, item)
+            elif item[0] > heap[0][0]:
+                heapq.heapreplace(heap, item)
+        for _, index, path, path_stat in sorted(heap, key=lambda item: item[1]):
+            yield index, path, path_stat
+
+    def add_value(self, name: str, value: float) -> None:
+        """Add a value of a script of the sample.
+
+        :param name: name of value
+        :param value: value
+        """
+        sums = self.sums.setdefault(name, [0.0, 0.0])
+        sums[0] += value
+        sums[1] += value * value
+
+    def add_script(self, script: WeechatScript) -> None:
+        """Add results of a checked script of the sample.
+
+        :param script: the checked script
+        """
+        self.size += 1
+        for level, count in script.count.items():
+            self.add_value(level, count)
+        self.add_value("issues", 1 if script.messages else 0)
+        self.add_value("score", script.score)
+        for score_min, score_max in SCORE_RANGES:
+            self.add_value(f"score_{score_min}_{score_max}", 1 if score_min <= script.score <= score_max else 0)
+
+    def get_correction(self) -> float:
+        """Return the correction of variance for a finite population.
+
+        :return: correction, between 0 (all scripts are in the sample) and 1
+        """
+        return max(0.0, 1 - self.size / max(self.population, self.size, 1))
+
+    def estimate(self, name: str, scale: float = 1, maximum: float = math.inf) -> tuple[float, float, float]:
+        """Return the estimate of a value with its confidence interval.
+
+        The interval is computed with a normal approximation of the mean.
+
+        :param name: name of value
+        :param scale: factor applied to the mean (for example the number of
+            scripts to estimate a total)
+        :param maximum: max value of the estimate
+        :return: tuple (estimate, low, high), low and high are NaN if there
+            are less than 2 scripts in the sample
+        """
+        total, total_squares = self.sums.get(name, [0.0, 0.0])
+        if self.size < 2:  # noqa: PLR2004
+            return (total / self.size if self.size else 0.0) * scale, math.nan, math.nan
+        mean = total / self.size
+        variance = max(0.0, (total_squares - self.size * mean * mean) / (self.size - 1))
+        margin = CONFIDENCE_Z * math.sqrt(variance * self.get_correction() / self.size)
+        return mean * scale, max(0.0, (mean - margin) * scale), min(maximum, (mean + margin) * scale)
+
+    def estimate_proportion(self, name: str) -> tuple[float, float, float]:
+        """Return the estimate of a proportion of scripts with its confidence interval (percentages).
+
+        The interval is a Wilson score interval, which is valid even if the
+        proportion in the sample is 0 or 1 (then a normal approximation
+        gives an empty interval).
+
+        :param name: name of value (1 if the script is counted, otherwise 0)
+        :return: tuple (estimate, low, high) in percent, low and high are
+            NaN if the sample is empty
+        """
+        if self.size == 0:
+            return 0.0, math.nan, math.nan
+        proportion = self.sums.get(name, [0.0, 0.0])[0] / self.size
+        correction = self.get_correction()
+        if correction == 0:
+            return proportion * 100, proportion * 100, proportion * 100
+        # effective size of sample, with the correction for a finite population
+        size = self.size / correction
+        z2 = CONFIDENCE_Z * CONFIDENCE_Z
+        center = (proportion + z2 / (2 * size)) / (1 + z2 / size)
+        deviation = math.sqrt(proportion * (1 - proportion) / size + z2 / (4 * size * size))
+        margin = CONFIDENCE_Z / (1 + z2 / size) * deviation
+        return proportion * 100, max(0.0, center - margin) * 100, min(1.0, center + margin) * 100
@@ -0,0 +1,92 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Aggregation of scores in constant memory."""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pathlib
+
+MAX_SCORE = 100
+
+
+class ScoreAggregator:
+    """Aggregate scores of scripts without keeping every path.
+
+    Only the number of scripts by score and the N scripts with the lowest
+    score are kept, so memory does not grow with the number of scripts.
+    """
+
+    def __init__(self, worst: int = 0) -> None:
+        """Initialize the aggregator.
+
+        :param worst: number of scripts with the lowest score to keep
+        """
+        self.max_worst: int = worst
+        self.histogram: list[int] = [0] * (MAX_SCORE + 1)
+        self.num_scripts: int = 0
+        self.total: int = 0
+        # heap with the worst scripts: the script with the highest score
+        # (and found last for a same score) is the first item of the heap
+        self._worst: list[tuple[int, int, pathlib.Path]] = []
+
+    def add(self, index: int, path: pathlib.Path, score: int) -> None:
+        """Add score of a script.
+
+        :param index: index of script in the list of all scripts found
+        :param path: path to the script
+        :param score: script score (between 0 and 100)
+        """
+        self.histogram[score] += 1
+        self.num_scripts += 1
+        self.total += score
+        if self.max_worst <= 0:
+            return
+        item = (-score, -index, path)
+        if len(self._worst) < self.max_worst:
+            heapq.heappush(self._worst, item)
+        elif item[:2] > self._worst[0][:2]:
+            heapq.heapreplace(self._worst, item)
+
+    @property
+    def average(self) -> float:
+        """Return the average score (100 if there are no scripts)."""
+        return self.total / self.num_scripts if self.num_scripts else float(MAX_SCORE)
+
+    def scores(self) -> list[tuple[int, int]]:
+        """Return number of scripts by score, highest score first.
+
+        :return: list of tuples (score, number of scripts)
+        """
+        return [(score, count) for score, count in reversed(list(enumerate(self.histogram))) if count]
+
+    def worst(self) -> list[tuple[pathlib.Path, int]]:
+        """Return the scripts with the lowest score, lowest first.
+
+        Scripts with the same score are sorted in the order they were found.
+
+        :return: list of tuples (path, score)
+        """
+        return [(path, -neg_score) for neg_score, _, path in sorted(self._worst, reverse=True)]
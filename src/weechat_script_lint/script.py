@@ -23,12 +23,49 @@
 
 # ruff: noqa: FBT001,FBT002
 
+from __future__ import annotations
+
+import bisect
+import codecs
+import functools
+import hashlib
 import inspect
-import pathlib
+import json
+import mmap
+import os
 import re
+import time
+from array import array
+from typing import TYPE_CHECKING, Any, Union
 
+from weechat_script_lint.python_facts import PythonFacts, get_python_facts
 from weechat_script_lint.utils import color
 
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Callable, Generator
+
+    from weechat_script_lint.observer import Observer
+    from weechat_script_lint.rules import CustomRules
+
+# content of a script: bytes, or a memory-mapped file for big scripts
+ScriptContent = Union[bytes, mmap.mmap]
+
+# scripts with at least this size are memory-mapped instead of read
+MMAP_MIN_SIZE = 1024 * 1024
+
+# size of chunks used to validate UTF-8 data
+UTF8_CHUNK_SIZE = 1024 * 1024
+
+# evaluation modes of checks:
+#   "full": run all checks, with line numbers of messages
+#   "any": stop after the first message reported
+#   "score": stop when the score reaches 0
+# in modes "any" and "score", line numbers are not computed (always 0) and
+# after the stop, only the checks which can add errors run (and only errors
+# are added), so that errors are all counted, like in mode "full"
+CHECK_MODES = ("full", "any", "score")
+
 LEVEL_LABELS: dict[str, str] = {
     "error": "bold,red",
     "warning": "bold,yellow",
@@ -54,6 +91,14 @@ MESSAGES: dict[str, dict[str, tuple[int, str]]] = {
             -25,
             "mixed tabs and spaces for indentation",
         ),
+        "file_timeout": (
+            -100,
+            "analysis of the script timed out after {timeout} seconds",
+        ),
+        "invalid_utf8": (
+            -20,
+            "invalid UTF-8 data, the script must be encoded in UTF-8",
+        ),
     },
     "warning": {
         "sys_exit": (
@@ -113,6 +158,26 @@ MESSAGES: dict[str, dict[str, tuple[int, str]]] = {
     },
 }
 
+# messages about the whole script: their line number is always 1, so the text
+# of the line is not used in their fingerprint
+FILE_MESSAGES = frozenset(
+    {
+        "missing_email",
+        "mixed_tabs_spaces",
+        "file_timeout",
+        "unneeded_shebang",
+        # REUSE-IgnoreStart
+        "missing_spdx_copyright",
+        "missing_spdx_license",
+        # REUSE-IgnoreEnd
+    },
+)
+
+# messages depending on the run, not on the content of the script: they are
+# not stored in the manifest (the script is checked again next time) nor in
+# the baseline (they are always reported)
+TRANSIENT_MESSAGES = frozenset({"file_timeout"})
+
 # note: this is not a valid e-mail regex; it is very permissive to detect
 # only scripts that have no e-mail, even in an obfuscated form
 EMAIL_REGEX = re.compile(
@@ -120,18 +185,188 @@ EMAIL_REGEX = re.compile(
     #   some.name@domain.org
     #   some.name AT domain.org
     #   some.name [at] domain [dot] org
-    r"("
-    r"[*#a-z0-9_.+-]+ ?"  # some.name
-    r"(@|[\[({ ] *at[\])} ] *) ?"  # "@", "[at]", " AT "
-    r"[*#a-z0-9-]+ ?"  # domain
-    r"(\.|[\[({ ] *dot[\])} ] *) ?"  # ".", "[dot]", " DOT "
-    r"[a-z0-9-.]+)"  # org
-    r"|"
+    rb"("
+    # a name starts only at the beginning of a sequence of chars allowed in
+    # name, otherwise the search is quadratic on long sequences of these chars
+    rb"(?<![*#a-z0-9_.+-])"
+    rb"[*#a-z0-9_.+-]+ ?"  # some.name
+    rb"(@|[\[({ ] *at[\])} ] *) ?"  # "@", "[at]", " AT "
+    rb"[*#a-z0-9-]+ ?"  # domain
+    rb"(\.|[\[({ ] *dot[\])} ] *) ?"  # ".", "[dot]", " DOT "
+    rb"[a-z0-9-.]+)"  # org
+    rb"|"
     # <some.email>
-    r"(<[a-z0-9_.+-]+>)",
+    rb"(<[a-z0-9_.+-]+>)",
     flags=re.IGNORECASE,
 )
 
+# checks of texts found on at most 2 lines: messages depend only on these
+# lines, so after a change in a script, these checks can be done only on the
+# changed lines (with one line before and after)
+LINE_CHECKS = frozenset(
+    {
+        "_check_python2_bin",
+        "_check_exit",
+        "_check_modifier_irc_in",
+        "_check_signals_irc_out",
+        "_check_weechat_site",
+    },
+)
+
+# checks of Python scripts using the facts of the script (see module
+# python_facts), to ignore comments and strings: the text is searched first,
+# the facts are extracted only if the text is found; with facts, the checks of
+# Python scripts depend on the whole script (a change can start a string)
+PYTHON_CHECKS = frozenset(
+    {
+        "_check_infolist",
+        "_check_python2_bin",
+        "_check_mixed_tabs_spaces",
+        "_check_exit",
+    },
+)
+
+# checks which can add errors: in modes "any" and "score", they run even
+# after the checks are stopped (custom rules can have errors)
+ERROR_CHECKS = frozenset(
+    {
+        "_check_email",
+        "_check_infolist",
+        "_check_python2_bin",
+        "_check_mixed_tabs_spaces",
+        "_check_utf8",
+        "_check_custom_rules",
+    },
+)
+
+# other checks depend on the whole script; after a change in a script, they are
+# done again only if this regex is found in the changed lines, before or after
+# the change (checks not listed here are always done again)
+CHECK_TRIGGERS: dict[str, re.Pattern[bytes]] = {
+    "_check_email": EMAIL_REGEX,
+    "_check_infolist": re.compile(rb"infolist_(?:get|free)"),
+    "_check_mixed_tabs_spaces": re.compile(rb"(?:\A|[\r\n])[\t ]"),
+    "_check_utf8": re.compile(rb"[\x80-\xff]"),
+    "_check_deprecated_functions": re.compile(rb"completion_(?:get_string|list_add)"),
+    "_check_hook_process_url": re.compile(rb"hook_(?:url|process)"),
+    "_check_shebang": re.compile(rb"\A#!"),
+    # REUSE-IgnoreStart
+    "_check_spdx_tags": re.compile(rb"SPDX-(?:FileCopyrightText|License-Identifier):"),
+    # REUSE-IgnoreEnd
+}
+
+# checks adding messages only if this regex is found in the script: when
+# scripts are checked in batch (see module batch), the regex is searched once
+# in all scripts of the batch and the check is skipped in scripts where it is
+# not found; the regex is searched in the script preceded by a newline, so
+# "\n" matches the beginning of the script (custom rules are never skipped)
+CHECK_REQUIRES: dict[str, re.Pattern[bytes]] = {
+    "_check_infolist": re.compile(rb"infolist_get"),
+    "_check_python2_bin": re.compile(rb"python2_bin"),
+    "_check_mixed_tabs_spaces": re.compile(rb"[\r\n][\t ]"),
+    "_check_utf8": re.compile(rb"[\x80-\xff]"),
+    "_check_exit": re.compile(rb"sys(?:\s*\.\s*exit|\s+(?:import|as)\b)"),
+    "_check_deprecated_functions": re.compile(rb"hook_completion_(?:get_string|list_add)"),
+    "_check_modifier_irc_in": re.compile(rb"irc_in_"),
+    "_check_signals_irc_out": re.compile(rb"irc_out"),
+    "_check_hook_process_url": re.compile(rb"hook_process"),
+    "_check_shebang": re.compile(rb"\n#!"),
+    "_check_weechat_site": re.compile(rb"://[w.]", flags=re.IGNORECASE),
+}
+
+# checks adding messages only if one of these regexes is not found in the
+# script: in batch, the check is skipped in scripts where all are found
+CHECK_EXCLUDES: dict[str, tuple[re.Pattern[bytes], ...]] = {
+    "_check_email": (EMAIL_REGEX,),
+    # REUSE-IgnoreStart
+    "_check_spdx_tags": (re.compile(rb"SPDX-FileCopyrightText:"), re.compile(rb"SPDX-License-Identifier:")),
+    # REUSE-IgnoreEnd
+}
+
+
+@functools.lru_cache(maxsize=256)
+def compile_regex(regex: str, flags: int = 0) -> re.Pattern[bytes]:
+    """Compile a regular expression used to search in the content of a script.
+
+    :param regex: regular expression
+    :param flags: flags for call to re.compile()
+    :return: compiled regular expression, operating on bytes
+    """
+    return re.compile(regex.encode("utf-8"), flags=flags)
+
+
+@functools.cache
+def get_check_methods(cls: type) -> tuple[str, ...]:
+    """Return the names of check methods of a class, in the order they are defined.
+
+    :param cls: class of script
+    :return: names of check methods
+    """
+    methods = inspect.getmembers(cls, predicate=inspect.isfunction)
+    methods.sort(key=lambda m: m[1].__code__.co_firstlineno)
+    return tuple(name for name, _ in methods if name.startswith("_check_"))
+
+
+def get_fingerprint(msg_name: str, kwargs: dict[str, str], text: bytes) -> str:
+    """Return the fingerprint of a message, used to find it again after changes in the script.
+
+    The line number is not used and spaces in the text are normalized, so
+    that the fingerprint does not change when lines are added or removed
+    before the message or when the indentation changes.
+
+    :param msg_name: name of message
+    :param kwargs: arguments of message
+    :param text: text of the line of message (empty for a message about
+        the whole script)
+    :return: fingerprint
+    """
+    data = [msg_name, sorted(kwargs.items()), decode(b" ".join(text.split()))]
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def decode(data: bytes) -> str:
+    """Decode bytes from a script, for display.
+
+    :param data: bytes
+    :return: string, with invalid UTF-8 data replaced
+    """
+    return data.decode("utf-8", errors="replace")
+
+
+def read_script(path: pathlib.Path) -> ScriptContent:
+    """Read content of a script; a big script is memory-mapped.
+
+    :param path: path to the script
+    :return: content of the script
+    """
+    with path.open("rb") as script_file:
+        if os.fstat(script_file.fileno()).st_size >= MMAP_MIN_SIZE:
+            return mmap.mmap(script_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return script_file.read()
+
+
+def find_invalid_utf8(data: ScriptContent) -> int:
+    """Find the first invalid UTF-8 byte in data.
+
+    Data is validated by chunks, so that the whole content is never decoded
+    at once; chunks with only ASCII chars are not decoded at all.
+
+    :param data: data to validate
+    :return: offset of first invalid byte, -1 if data is valid UTF-8
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = len(data)
+    for pos in range(0, max(size, 1), UTF8_CHUNK_SIZE):
+        chunk = data[pos : pos + UTF8_CHUNK_SIZE]
+        pending = len(decoder.getstate()[0])
+        if not pending and chunk.isascii():
+            continue
+        try:
+            decoder.decode(chunk, final=pos + UTF8_CHUNK_SIZE >= size)
+        except UnicodeDecodeError as exc:
+            return pos - pending + exc.start
+    return -1
+
 
 class ScriptMessage:
     """A script message (error/warning/info)."""
@@ -149,8 +384,13 @@ class ScriptMessage:
         self.level: str = level
         self.msg_name: str = msg_name
         self.line: int = line
+        self.kwargs: dict[str, str] = kwargs
         self.score = MESSAGES[level][msg_name][0]
-        self.text: str = MESSAGES[level][msg_name][1].format(**kwargs)
+
+    @property
+    def text(self) -> str:
+        """Return text of message."""
+        return MESSAGES[self.level][self.msg_name][1].format(**self.kwargs)
 
     def as_str(self, use_colors: bool = True) -> str:
         """Return formatted message."""
@@ -161,22 +401,74 @@ class ScriptMessage:
 class WeechatScript:
     """A WeeChat script."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         path: pathlib.Path,
         ignore: str = "",
         msg_level: str = "info",
         use_colors: bool = True,
+        *,
+        content: ScriptContent | None = None,
+        rules: CustomRules | None = None,
+        mode: str = "full",
+        resolved: bool = False,
+        cached: dict[str, list[list[Any]]] | None = None,
+        observer: Observer | None = None,
+        baseline: dict[str, int] | None = None,
     ) -> None:
-        """Initialize a WeeChat script."""
-        self.path: pathlib.Path = path.resolve()
+        """Initialize a WeeChat script.
+
+        :param path: path to the script
+        :param ignore: comma-separated list of messages to ignore
+        :param msg_level: min level of messages to report
+        :param use_colors: True to use colors in output
+        :param content: content of the script (read from path if not given)
+        :param rules: custom rules to check in addition to built-in checks
+        :param mode: evaluation mode of checks: "full", "any" or "score"
+        :param resolved: True if the path is already resolved (absolute,
+            without symbolic links)
+        :param cached: results of checks from a previous run, added instead
+            of running the checks: check name -> list of messages
+            [level, name, line, arguments]
+        :param observer: observer called on events of checks (not sent to
+            worker processes: the events of checks done in another process
+            are sent with the method notify_observer)
+        :param baseline: fingerprints of known messages in this script, not
+            reported: fingerprint -> number of messages (updated when
+            messages are found)
+        """
+        self.path: pathlib.Path = path if resolved else path.resolve()
         self.ignored_msg = [code.strip() for code in ignore.split(",") if code]
         self.msg_level: int = list(LEVEL_LABELS.keys()).index(msg_level)
         self.use_colors: bool = use_colors
         self.messages: list[ScriptMessage] = []
         self.count: dict[str, int] = dict.fromkeys(LEVEL_LABELS, 0)
-        self.script: str = self.path.read_text()
+        self.script: ScriptContent = read_script(self.path) if content is None else content
         self.score = 100
+        self.rules: CustomRules | None = rules
+        self.mode: str = mode
+        self.stopped: bool = False
+        self.cached: dict[str, list[list[Any]]] = cached or {}
+        self.check_ranges: dict[str, tuple[int, int]] = {}
+        self.observer: Observer | None = observer
+        # duration of each check, measured only if there is an observer
+        self.check_times: dict[str, float] | None = {} if observer is not None else None
+        self.baseline: dict[str, int] | None = baseline
+        self._newlines: array[int] | None = None
+        # checks known to add no message (found with a check in batch)
+        self.skipped_checks: frozenset[str] = frozenset()
+        self._python_facts: PythonFacts | None = None
+        self._python_facts_done: bool = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return state of script for pickle (a memory-mapped content is copied)."""
+        state = self.__dict__.copy()
+        state["script"] = bytes(self.script)
+        state["_newlines"] = None
+        state["_python_facts"] = None
+        state["_python_facts_done"] = False
+        state["observer"] = None
+        return state
 
     def __str__(self) -> str:
         """Return string with warnings/errors found."""
@@ -195,19 +487,113 @@ class WeechatScript:
         :param msg_name: short name of message to display
         :param line: line number
         """
-        if msg_name in self.ignored_msg or self.msg_level < list(LEVEL_LABELS.keys()).index(level):
+        if (
+            (self.stopped and level != "error")
+            or msg_name in self.ignored_msg
+            or self.msg_level < list(LEVEL_LABELS.keys()).index(level)
+        ):
+            return
+        if self.baseline and self.is_known(msg_name, line, kwargs):
             return
         msg = ScriptMessage(self.path, level, msg_name, line, **kwargs)
         self.messages.append(msg)
         self.count[level] += 1
         self.score = max(0, self.score + msg.score)
+        if self.mode == "any" or (self.mode == "score" and self.score == 0):
+            self.stopped = True
+
+    def is_known(self, msg_name: str, line: int, kwargs: dict[str, str]) -> bool:
+        """Check if a message is in the baseline (each known message hides one message).
+
+        :param msg_name: name of message
+        :param line: line number
+        :param kwargs: arguments of message
+        :return: True if the message is known
+        """
+        if self.baseline is None:
+            return False
+        fingerprint = self.get_fingerprint(msg_name, line, kwargs)
+        count = self.baseline.get(fingerprint, 0)
+        if count <= 0:
+            return False
+        self.baseline[fingerprint] = count - 1
+        return True
+
+    def get_fingerprint(self, msg_name: str, line: int, kwargs: dict[str, str]) -> str:
+        """Return the fingerprint of a message in this script.
+
+        :param msg_name: name of message
+        :param line: line number
+        :param kwargs: arguments of message
+        :return: fingerprint
+        """
+        text = b"" if msg_name in FILE_MESSAGES else self.get_line(line)
+        return get_fingerprint(msg_name, kwargs, text)
+
+    def get_newlines(self) -> array[int]:
+        """Return the offsets of all newlines in the script (computed on first call)."""
+        if self._newlines is None:
+            self._newlines = array("q", (m.start() for m in re.finditer(rb"\n", self.script)))
+        return self._newlines
+
+    def get_line(self, line: int) -> bytes:
+        """Return the content of a line, without the end of line.
+
+        :param line: line number (first line is 1)
+        :return: content of line, empty if the line does not exist
+        """
+        newlines = self.get_newlines()
+        if not 1 <= line <= len(newlines) + 1:
+            return b""
+        start = newlines[line - 2] + 1 if line > 1 else 0
+        end = newlines[line - 1] if line <= len(newlines) else len(self.script)
+        return bytes(self.script[start:end]).rstrip(b"\r")
+
+    def line_number(self, offset: int) -> int:
+        """Return the line number of an offset in the script.
+
+        :param offset: offset in the script content
+        :return: line number (first line is 1), 0 if lines are not computed
+            in this evaluation mode
+        """
+        if self.mode != "full":
+            return 0
+        return bisect.bisect_left(self.get_newlines(), offset) + 1
+
+    def fact_line(self, line: int) -> int:
+        """Return the line number of a fact of a Python script.
+
+        :param line: line number of the fact
+        :return: line number, 0 if lines are not computed in this evaluation
+            mode (like method line_number)
+        """
+        return line if self.mode == "full" else 0
+
+    def get_python_facts(self) -> PythonFacts | None:
+        """Return the facts of a Python script (extracted on first call).
+
+        :return: facts, None if the script is not a Python script
+        """
+        if not self._python_facts_done:
+            self._python_facts = get_python_facts(self.script) if self.path.suffix == ".py" else None
+            self._python_facts_done = True
+        return self._python_facts
+
+    def release_python_facts(self) -> None:
+        """Release the facts of a Python script (extracted again if needed).
+
+        The facts are used only during the checks, and the scripts can be kept
+        until the end of the lint (for example for the summary).
+        """
+        self._python_facts = None
+        self._python_facts_done = False
 
     def search_regex(
         self,
         regex: str,
         flags: int = 0,
         max_lines: int = 1,
-    ) -> list[tuple[int, re.Match[str]]]:
+    ) -> list[tuple[int, re.Match[bytes]]]:
         """Search a regular expression in each line of the script.
 
         A same line can be returned multiple times, if the string appears
@@ -218,13 +604,19 @@ class WeechatScript:
         :param max_lines: max number of lines in each string found
         :return: list of tuples: (line_number, match)
         """
-        pattern = re.compile(regex, flags=flags)
+        pattern = compile_regex(regex, flags=flags)
         occur = []
-        for m in pattern.finditer(self.script):
-            match_lines = m.group().count("\n") + 1
+        m = pattern.search(self.script)
+        while m:
+            match_lines = m.group().count(b"\n") + 1
             if match_lines <= max_lines:
-                line = m.string[: m.start()].count("\n") + 1
-                occur.append((line, m))
+                occur.append((self.line_number(m.start()), m))
+                pos = max(m.end(), m.start() + 1)
+            else:
+                # a match on too many lines is ignored, but must not hide
+                # strings found in its lines: search again from the next byte
+                pos = m.start() + 1
+            m = pattern.search(self.script, pos)
         return occur
 
     def search_func(
@@ -233,7 +625,7 @@ class WeechatScript:
         argument: str = "",
         flags: int = 0,
         max_lines: int = 2,
-    ) -> list[tuple[int, re.Match[str]]]:
+    ) -> list[tuple[int, re.Match[bytes]]]:
         """Search a call to a function with the given argument.
 
         :param function: function (regex)
@@ -245,39 +637,76 @@ class WeechatScript:
         regex = rf"{function}[\s,(]*{argument}"
         return self.search_regex(regex, flags=flags, max_lines=max_lines)
 
+    def search_line_start(self, regex: str) -> bool:
+        """Check if a regular expression is found at the beginning of a line.
+
+        :param regex: regular expression to search
+        :return: True if found
+        """
+        # the beginning of script is checked separately: with a single regex
+        # "(?:\A|[\r\n])...", the search is much slower
+        return bool(
+            compile_regex(rf"\A{regex}").match(self.script) or compile_regex(rf"[\r\n]{regex}").search(self.script),
+        )
+
     # === errors ===
 
     def _check_email(self) -> None:
         """Check if an e-mail is present."""
-        if not re.search(EMAIL_REGEX, self.script):
+        if not EMAIL_REGEX.search(self.script):
             self.message("error", "missing_email")
 
     def _check_infolist(self) -> None:
         """Check if infolist_free is called."""
         # if infolist_get is called, infolist_free must be called
         list_infolist_get = self.search_regex("infolist_get")
-        count_infolist_free = self.script.count("infolist_free")
-        if list_infolist_get and not count_infolist_free:
-            for line_no, _ in list_infolist_get:
-                self.message("error", "missing_infolist_free", line=line_no)
+        if not list_infolist_get:
+            return
+        facts = self.get_python_facts()
+        if facts:
+            infolist_get = [] if facts.has_name("infolist_free") else facts.find_names("infolist_get")
+            lines = [self.fact_line(line_no) for line_no in infolist_get]
+        elif self.script.find(b"infolist_free") < 0:
+            lines = [line_no for line_no, _ in list_infolist_get]
+        else:
+            lines = []
+        for line_no in lines:
+            self.message("error", "missing_infolist_free", line=line_no)
 
     def _check_python2_bin(self) -> None:
         """Check if the info "python2_bin" is used."""
         if self.path.suffix == ".py":
             python2_bin = self.search_func("info_get", r"[\"']python2_bin[\"']")
-            for line_no, _ in python2_bin:
+            facts = self.get_python_facts() if python2_bin else None
+            if facts:
+                lines = [
+                    self.fact_line(call.line)
+                    for call in facts.find_calls("info_get")
+                    if call.args[:1] == ["python2_bin"]
+                ]
+            else:
+                lines = [line_no for line_no, _ in python2_bin]
+            for line_no in lines:
                 self.message("error", "python2_bin", line=line_no)
 
     def _check_mixed_tabs_spaces(self) -> None:
         """Check if mixed tabs and spaces are used for indentation."""
         if self.path.suffix == ".py":
-            content = "\n" + self.script.replace("\r", "\n")
-            tabs = re.search(r"\n\t+[^ \n]", content)
-            spaces = re.search(r"\n +[^\t\n]", content)
-            mixed = re.search(r"\n(\t+ | +\t)", content)
-            if mixed or (tabs and spaces):
+            tabs = self.search_line_start(r"\t+[^ \r\n]")
+            spaces = self.search_line_start(r" +[^\t\r\n]")
+            mixed = self.search_line_start(r"(\t+ | +\t)")
+            if not mixed and not (tabs and spaces):
+                return
+            facts = self.get_python_facts()
+            if not facts or "mixed" in facts.indents or {"tabs", "spaces"} <= facts.indents:
                 self.message("error", "mixed_tabs_spaces")
 
+    def _check_utf8(self) -> None:
+        """Check if the script is valid UTF-8."""
+        offset = find_invalid_utf8(self.script)
+        if offset >= 0:
+            self.message("error", "invalid_utf8", line=self.line_number(offset))
+
     # === warnings ===
 
     def _check_exit(self) -> None:
@@ -286,8 +715,15 @@ class WeechatScript:
             # Python sys.exit() function must never be called; it is only
             # a warning because it can be allowed when the import of weechat
             # module fails, which means the script is not running in WeeChat
-            sys_exits = self.search_regex(r"sys\.exit")
-            for line_no, _ in sys_exits:
+            # (the regex starts with "sys" for a fast search of this literal)
+            found = compile_regex(r"sys(?:\s*\.\s*exit|\s+(?:import|as)\b)").search(self.script)
+            facts = self.get_python_facts() if found else None
+            if facts:
+                # also with an alias: "from sys import exit", "import sys as system"
+                lines = [self.fact_line(line_no) for line_no in facts.find_names("sys.exit")]
+            else:
+                lines = [line_no for line_no, _ in self.search_regex(r"sys\.exit")]
+            for line_no in lines:
                 self.message("warning", "sys_exit", line=line_no)
 
     def _check_deprecated_functions(self) -> None:
@@ -321,7 +757,7 @@ class WeechatScript:
                 "warning",
                 "modifier_irc_in",
                 line=line_no,
-                message=m.group(1),
+                message=decode(m.group(1)),
             )
 
     def _check_signals_irc_out(self) -> None:
@@ -332,7 +768,7 @@ class WeechatScript:
                 "warning",
                 "signal_irc_out",
                 line=line_no,
-                message=m.group(1),
+                message=decode(m.group(1)),
             )
         func = self.search_func("hook_signal", r"[\"'][^\"']+,irc_outtags_([^\"']+)[\"']")
         for line_no, m in func:
@@ -340,7 +776,7 @@ class WeechatScript:
                 "warning",
                 "signal_irc_outtags",
                 line=line_no,
-                message=m.group(1),
+                message=decode(m.group(1)),
             )
 
     def _check_hook_process_url(self) -> None:
@@ -369,7 +805,7 @@ class WeechatScript:
 
     def _check_shebang(self) -> None:
         """Check if a shebang is present."""
-        if self.script.startswith("#!"):
+        if self.script[:2] == b"#!":
             self.message("info", "unneeded_shebang")
 
     def _check_weechat_site(self) -> None:
@@ -380,7 +816,7 @@ class WeechatScript:
             flags=re.IGNORECASE,
         )
         for line_no, m in links:
-            self.message("info", "url_weechat", line=line_no, link=m.group())
+            self.message("info", "url_weechat", line=line_no, link=decode(m.group()))
 
     def _check_spdx_tags(self) -> None:
         """Check if SPDX tags are present."""
@@ -391,15 +827,239 @@ class WeechatScript:
             self.message("info", "missing_spdx_license")
         # REUSE-IgnoreEnd
 
+    # === custom rules ===
+
+    def _check_custom_rules(self) -> None:
+        """Check custom rules."""
+        if self.rules:
+            self.rules.check(self)
+
     # run all checks, display report
 
+    def get_check_names(self) -> list[str]:
+        """Return the names of check methods, in the order they are defined.
+
+        The custom rules are checked only if there are rules.
+        """
+        return [name for name in get_check_methods(type(self)) if name != "_check_custom_rules" or self.rules]
+
+    def get_checks(self) -> list[Callable[[], None]]:
+        """Return the check methods, in the order they are defined."""
+        return [getattr(self, name) for name in self.get_check_names()]
+
+    def is_skipped(self, name: str) -> bool:
+        """Check if a check is skipped because the checks are stopped.
+
+        After the stop, only the checks which can add errors run, so that
+        errors are all counted.
+
+        :param name: name of check method
+        :return: True if the check must not run
+        """
+        return self.stopped and name not in ERROR_CHECKS
+
+    def run_check(self, name: str) -> None:
+        """Run a check, or add its messages from the cached results.
+
+        :param name: name of check method
+        """
+        for _ in self.iter_check(name):
+            pass
+
+    def iter_check(self, name: str, max_bytes: int = 0) -> Generator[int, None, None]:
+        """Run a check in parts, or add its messages from the cached results.
+
+        A line check (see LINE_CHECKS) is done in windows of lines with at
+        most max_bytes bytes (at least one line), the other checks are done
+        in a single part. Before each part, the number of bytes it scans is
+        returned, so that the caller can pause between parts.
+
+        :param name: name of check method
+        :param max_bytes: max number of bytes in a window of lines (0 = the
+            whole script in a single part)
+        :return: number of bytes scanned by the next part
+        """
+        start = len(self.messages)
+        elapsed = 0.0
+        if name in self.cached:
+            yield 0
+            # cached messages were not in the baseline when they were found
+            baseline, self.baseline = self.baseline, None
+            for level, msg_name, line, kwargs in self.cached[name]:
+                self.message(level, msg_name, line=line, **kwargs)
+            self.baseline = baseline
+        elif name in self.skipped_checks:
+            yield 0
+        else:
+            windows = self.get_line_windows(max_bytes) if max_bytes and self.is_line_check(name) else []
+            if len(windows) > 1:
+                for first, last in windows:
+                    yield self.get_line_offset(last + 1) - self.get_line_offset(first)
+                    start_time = time.perf_counter()
+                    self.run_line_check(name, first, last)
+                    elapsed += time.perf_counter() - start_time
+                # same order as the check on the whole script: by message
+                # (in the order of MESSAGES), then by line
+                self.messages[start:] = sorted(
+                    self.messages[start:],
+                    key=lambda msg: list(MESSAGES[msg.level]).index(msg.msg_name),
+                )
+            else:
+                yield max(1, len(self.script))
+                start_time = time.perf_counter()
+                getattr(self, name)()
+                elapsed = time.perf_counter() - start_time
+        self.check_ranges[name] = (start, len(self.messages))
+        if self.check_times is not None:
+            self.check_times[name] = elapsed
+        if self.observer is not None:
+            self.notify_check(self.observer, name)
+
+    def is_line_check(self, name: str) -> bool:
+        """Check if a check can be done separately on some lines of the script.
+
+        :param name: name of check method
+        :return: True if the check is a line check (see LINE_CHECKS), which
+            does not use the facts of a Python script
+        """
+        return name in LINE_CHECKS and not (self.path.suffix == ".py" and name in PYTHON_CHECKS)
+
+    def get_line_offset(self, line: int) -> int:
+        """Return the offset of the beginning of a line.
+
+        :param line: line number (first line is 1)
+        :return: offset of line, size of script if the line does not exist
+        """
+        newlines = self.get_newlines()
+        if line <= 1:
+            return 0
+        return newlines[line - 2] + 1 if line - 2 < len(newlines) else len(self.script)
+
+    def get_line_windows(self, max_bytes: int) -> list[tuple[int, int]]:
+        """Return windows of lines of the script, each one with at most max_bytes bytes.
+
+        A window has at least one line, so it can be bigger than max_bytes.
+
+        :param max_bytes: max number of bytes in a window
+        :return: list of tuples (first line, last line)
+        """
+        newlines = self.get_newlines()
+        num_lines = len(newlines) + 1
+        windows = []
+        first = 1
+        while first <= num_lines:
+            # lines ending before the limit
+            last = bisect.bisect_left(newlines, self.get_line_offset(first) + max_bytes)
+            last = min(max(first, last), num_lines)
+            windows.append((first, last))
+            first = last + 1
+        return windows
+
+    def run_line_check(self, name: str, first: int, last: int) -> None:
+        """Run a line check (see LINE_CHECKS) on some lines of the script.
+
+        The check is done with one line before and after the lines, like
+        after a change in the language server, and only the messages on the
+        lines are added.
+
+        :param name: name of check method
+        :param first: first line
+        :param last: last line
+        """
+        context_first = max(1, first - 1)
+        content = self.script[self.get_line_offset(context_first) : self.get_line_offset(last + 2)]
+        window = WeechatScript(self.path, use_colors=self.use_colors, content=bytes(content), resolved=True)
+        getattr(window, name)()
+        for msg in window.messages:
+            line = msg.line + context_first - 1
+            if first <= line <= last:
+                self.message(msg.level, msg.msg_name, line=line if self.mode == "full" else 0, **msg.kwargs)
+
+    def notify_check(self, observer: Observer, name: str) -> None:
+        """Call the observer with the messages added by a check, then the end of check.
+
+        :param observer: observer
+        :param name: name of check method
+        """
+        start, end = self.check_ranges[name]
+        for msg in self.messages[start:end]:
+            observer.message_emitted(self, msg)
+        observer.rule_finished(self, name, (self.check_times or {}).get(name, 0.0))
+
+    def notify_observer(self) -> None:
+        """Call the observer with all events of checks done in another process."""
+        if self.observer is None:
+            return
+        self.observer.file_started(self)
+        end = 0
+        for name in self.check_ranges:
+            self.notify_check(self.observer, name)
+            end = self.check_ranges[name][1]
+        # messages added after the checks (for example a timeout)
+        for msg in self.messages[end:]:
+            self.observer.message_emitted(self, msg)
+        self.observer.file_finished(self, sum((self.check_times or {}).values()))
+
     def check(self) -> None:
-        """Perform checks on the script."""
-        methods = inspect.getmembers(self, predicate=inspect.ismethod)
-        methods.sort(key=lambda m: m[1].__func__.__code__.co_firstlineno)
-        for name, method in methods:
-            if name.startswith("_check_"):
-                method()
+        """Perform checks on the script (stop when the result is known)."""
+        if self.observer is not None:
+            self.observer.file_started(self)
+        for name in self.get_check_names():
+            if self.is_skipped(name):
+                continue
+            self.run_check(name)
+        self.release_python_facts()
+        if self.observer is not None:
+            self.observer.file_finished(self, sum((self.check_times or {}).values()))
+
+    def check_steps(
+        self,
+        max_time: float = 0,
+        max_bytes: int = 0,
+    ) -> Generator[list[ScriptMessage], None, None]:
+        """Perform checks on the script, in steps.
+
+        Each iteration of the generator runs checks until one of the limits
+        is reached and returns the messages added during this step, so that
+        the caller can do something else between steps (for example in
+        WeeChat, a timer calling next() on the generator).
+        A step always runs at least one part of check; at the end, messages,
+        counters and score are the same as with the method check.
+
+        The line checks (see LINE_CHECKS) are done in windows of lines with at
+        most max_bytes bytes, so they are split in multiple steps; the other
+        checks scan the whole script in a single part, which can exceed the
+        limits: with a big script, such a step can take longer than max_time
+        or scan more than max_bytes. The messages of a line check done in
+        multiple windows can be returned in a different order than in the
+        messages of the script.
+
+        :param max_time: max time per step, in seconds (0 = no limit); the
+            time is checked only before starting a part of check
+        :param max_bytes: max number of bytes scanned per step (0 = no limit)
+        :return: messages added during each step
+        """
+        first_msg = len(self.messages)
+        start = time.perf_counter()
+        scanned = 0
+        if self.observer is not None:
+            self.observer.file_started(self)
+        for name in self.get_check_names():
+            if self.is_skipped(name):
+                continue
+            for size in self.iter_check(name, max_bytes):
+                if scanned and (
+                    (max_time and time.perf_counter() - start >= max_time) or (max_bytes and scanned + size > max_bytes)
+                ):
+                    yield self.messages[first_msg:]
+                    first_msg = len(self.messages)
+                    start = time.perf_counter()
+                    scanned = 0
+                scanned += max(1, size)
+        self.release_python_facts()
+        if self.observer is not None:
+            self.observer.file_finished(self, sum((self.check_times or {}).values()))
+        yield self.messages[first_msg:]
 
     def get_report(self, name_only: bool = False) -> str:
         """Print report, if any.
@@ -0,0 +1,480 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Language server (LSP), checking scripts opened in an editor."""
+
+from __future__ import annotations
+
+import importlib.metadata
+import json
+import pathlib
+import re
+from typing import TYPE_CHECKING, Any, BinaryIO
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from weechat_script_lint.script import CHECK_TRIGGERS, LINE_CHECKS, PYTHON_CHECKS, WeechatScript
+
+if TYPE_CHECKING:
+    from weechat_script_lint.rules import CustomRules
+    from weechat_script_lint.script import ScriptMessage
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+# LSP: incremental synchronization of documents
+TEXT_DOCUMENT_SYNC_INCREMENTAL = 2
+
+DIAGNOSTIC_SEVERITY = {
+    "error": 1,
+    "warning": 2,
+    "info": 3,
+}
+
+# line ends in LSP: "\r\n", "\r" and "\n"
+LINES_REGEX = re.compile(r"(?<=\n)|(?<=\r)(?!\n)")
+
+
+def split_lines(text: str) -> list[str]:
+    """Split text in lines, keeping line ends.
+
+    The last line is empty if text ends with a line end.
+
+    :param text: text
+    :return: lines
+    """
+    return LINES_REGEX.split(text)
+
+
+def uri_to_path(uri: str) -> pathlib.Path:
+    """Return path of a document URI.
+
+    :param uri: URI (eg: "file:///path/to/script.py")
+    :return: path
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        return pathlib.Path(url2pathname(unquote(parsed.path)))
+    return pathlib.Path(unquote(parsed.path))
+
+
+def char_index(line: str, character: int, encoding: str) -> int:
+    """Return index in a line of a LSP character offset.
+
+    :param line: line, with line end
+    :param character: character offset, in units of the encoding
+    :param encoding: position encoding: "utf-8", "utf-16" or "utf-32"
+    :return: index in the line, limited to the line length (without line end)
+    """
+    line = line.rstrip("\r\n")
+    if encoding == "utf-32" or line.isascii():
+        return min(character, len(line))
+    if encoding == "utf-8":
+        return len(line.encode("utf-8")[:character].decode("utf-8", errors="ignore"))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1  # noqa: PLR2004
+    return len(line)
+
+
+def line_length(line: str, encoding: str) -> int:
+    """Return length of a line in units of a position encoding.
+
+    :param line: line, with line end
+    :param encoding: position encoding: "utf-8", "utf-16" or "utf-32"
+    :return: length of line, without line end
+    """
+    line = line.rstrip("\r\n")
+    if encoding == "utf-32" or line.isascii():
+        return len(line)
+    if encoding == "utf-8":
+        return len(line.encode("utf-8"))
+    return len(line.encode("utf-16-le")) // 2
+
+
+class Document:
+    """A document opened in the editor, checked incrementally.
+
+    Messages are kept by check. After a change, the line checks (see
+    LINE_CHECKS) are done only on the changed lines and the other checks
+    are done on the whole document only if needed (see CHECK_TRIGGERS);
+    other messages are kept, moved if lines were added or removed.
+    In a Python document, the checks using facts of the script (see
+    PYTHON_CHECKS) are always done on the whole document.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        text: str,
+        ignore: str = "",
+        msg_level: str = "info",
+        rules: CustomRules | None = None,
+    ) -> None:
+        """Initialize a document and check it.
+
+        :param uri: URI of document
+        :param text: content of document
+        :param ignore: comma-separated list of messages to ignore
+        :param msg_level: min level of messages to report
+        :param rules: custom rules
+        """
+        self.uri: str = uri
+        self.path: pathlib.Path = uri_to_path(uri)
+        self.ignore: str = ignore
+        self.msg_level: str = msg_level
+        self.rules: CustomRules | None = rules
+        self.lines: list[str] = []
+        self.checks: list[str] = self.get_script(b"").get_check_names()
+        self.messages: dict[str, list[ScriptMessage]] = {}
+        self._pending: set[str] = set()
+        self.set_text(text)
+
+    @property
+    def content(self) -> bytes:
+        """Return content of document, as bytes."""
+        return "".join(self.lines).encode("utf-8", errors="replace")
+
+    def get_script(self, content: bytes) -> WeechatScript:
+        """Return a script to check some content of the document.
+
+        :param content: content to check
+        :return: script
+        """
+        return WeechatScript(
+            self.path,
+            ignore=self.ignore,
+            msg_level=self.msg_level,
+            use_colors=False,
+            content=content,
+            rules=self.rules,
+        )
+
+    def run_checks(self, checks: list[str], content: bytes, first_line: int = 1) -> dict[str, list[ScriptMessage]]:
+        """Run checks on some content of the document.
+
+        :param checks: names of check methods
+        :param content: content to check
+        :param first_line: line number of the first line of content
+        :return: dictionary with messages found by each check
+        """
+        script = self.get_script(content)
+        messages = {}
+        for name in checks:
+            first_msg = len(script.messages)
+            getattr(script, name)()
+            messages[name] = script.messages[first_msg:]
+            for msg in messages[name]:
+                msg.line += first_line - 1
+        return messages
+
+    def set_text(self, text: str) -> None:
+        """Set content of document and check it.
+
+        :param text: content of document
+        """
+        self.lines = split_lines(text)
+        self.messages = self.run_checks(self.checks, self.content)
+        self._pending.clear()
+
+    def apply_change(self, start: dict[str, int], end: dict[str, int], text: str, encoding: str = "utf-16") -> None:
+        """Apply an incremental change on the document.
+
+        Line checks are done immediately on the changed lines, other checks
+        are done by the method update.
+
+        :param start: start position of changed range: {"line": x, "character": y}
+        :param end: end position of changed range: {"line": x, "character": y}
+        :param text: new text for the range
+        :param encoding: position encoding
+        """
+        last_index = len(self.lines) - 1
+        start_line, end_line = min(start["line"], last_index), min(end["line"], last_index)
+        start_char = char_index(self.lines[start_line], start["character"], encoding)
+        end_char = char_index(self.lines[end_line], end["character"], encoding)
+        # line numbers of changed lines (first line is 1), with one line of context before and after
+        first, old_last = start_line + 1, end_line + 1
+        context_first = max(1, first - 1)
+        old_text = "".join(self.lines[context_first - 1 : old_last + 1]).encode("utf-8", errors="replace")
+        new_lines = split_lines(self.lines[start_line][:start_char] + text + self.lines[end_line][end_char:])
+        if end_line < last_index:
+            # the empty line after the line end is the start of the next line
+            new_lines.pop()
+        self.lines[start_line : end_line + 1] = new_lines
+        new_last = start_line + len(new_lines)
+        delta = new_last - old_last
+        new_text = "".join(self.lines[context_first - 1 : new_last + 1]).encode("utf-8", errors="replace")
+        python = self.path.suffix == ".py"
+        for name, messages in self.messages.items():
+            if python and name in PYTHON_CHECKS:
+                self._pending.add(name)
+            elif name in LINE_CHECKS:
+                # messages on changed lines (and on the line before) are found again below
+                messages[:] = [msg for msg in messages if not context_first <= msg.line <= old_last]
+            else:
+                trigger = CHECK_TRIGGERS.get(name)
+                if not trigger or trigger.search(old_text) or trigger.search(new_text):
+                    self._pending.add(name)
+            for msg in messages:
+                if msg.line > old_last:
+                    msg.line += delta
+                elif msg.line > new_last:
+                    msg.line = new_last
+        line_checks = [name for name in self.checks if name in LINE_CHECKS and not (python and name in PYTHON_CHECKS)]
+        results = self.run_checks(line_checks, new_text, first_line=context_first)
+        for name, messages in results.items():
+            self.messages[name].extend(msg for msg in messages if msg.line <= new_last)
+            self.messages[name].sort(key=lambda msg: msg.line)
+
+    def update(self) -> None:
+        """Do the checks on the whole document needed after changes."""
+        if self._pending:
+            checks = [name for name in self.checks if name in self._pending]
+            self.messages.update(self.run_checks(checks, self.content))
+            self._pending.clear()
+
+    def get_diagnostics(self, encoding: str = "utf-16") -> list[dict[str, Any]]:
+        """Return LSP diagnostics with the messages of the document.
+
+        :param encoding: position encoding
+        :return: diagnostics
+        """
+        diagnostics = []
+        messages = [msg for name in self.checks for msg in self.messages.get(name, [])]
+        for msg in sorted(messages, key=lambda msg: msg.line):
+            line = min(msg.line, len(self.lines)) - 1
+            diagnostics.append(
+                {
+                    "range": {
+                        "start": {"line": line, "character": 0},
+                        "end": {"line": line, "character": line_length(self.lines[line], encoding)},
+                    },
+                    "severity": DIAGNOSTIC_SEVERITY[msg.level],
+                    "code": msg.msg_name,
+                    "source": "weechat-script-lint",
+                    "message": msg.text,
+                },
+            )
+        return diagnostics
+
+
+def read_message(reader: BinaryIO) -> dict[str, Any] | None:
+    """Read a JSON-RPC message (with a header "Content-Length").
+
+    :param reader: input stream
+    :return: message, None at end of input
+    """
+    length = -1
+    while True:
+        line = reader.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length < 0:
+        msg = "missing header Content-Length"
+        raise ValueError(msg)
+    message = json.loads(reader.read(length))
+    if not isinstance(message, dict):
+        msg = "message is not an object"
+        raise ValueError(msg)  # noqa: TRY004
+    return message
+
+
+def write_message(writer: BinaryIO, message: dict[str, Any]) -> None:
+    """Write a JSON-RPC message (with a header "Content-Length").
+
+    :param writer: output stream
+    :param message: message
+    """
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    writer.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+    writer.flush()
+
+
+class LanguageServer:
+    """Language server, on a JSON-RPC connection."""
+
+    def __init__(
+        self,
+        reader: BinaryIO,
+        writer: BinaryIO,
+        ignore: str = "",
+        msg_level: str = "info",
+        rules: CustomRules | None = None,
+    ) -> None:
+        """Initialize the server.
+
+        :param reader: input stream
+        :param writer: output stream
+        :param ignore: comma-separated list of messages to ignore
+        :param msg_level: min level of messages to report
+        :param rules: custom rules
+        """
+        self.reader: BinaryIO = reader
+        self.writer: BinaryIO = writer
+        self.ignore: str = ignore
+        self.msg_level: str = msg_level
+        self.rules: CustomRules | None = rules
+        self.encoding: str = "utf-16"
+        self.documents: dict[str, Document] = {}
+        self.shutdown: bool = False
+        self.requests = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown_server,
+        }
+        self.notifications = {
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+        }
+
+    def run(self) -> int:
+        """Run the server until the notification "exit" or end of input.
+
+        :return: exit code: 0 if the request "shutdown" was received, otherwise 1
+        """
+        while True:
+            try:
+                message = read_message(self.reader)
+            except ValueError as exc:
+                self.send_error(None, PARSE_ERROR, str(exc))
+                continue
+            if message is None or message.get("method") == "exit":
+                return 0 if self.shutdown else 1
+            self.handle(message)
+
+    def handle(self, message: dict[str, Any]) -> None:
+        """Handle a request or a notification.
+
+        :param message: message received
+        """
+        method, params = message.get("method", ""), message.get("params") or {}
+        if "id" not in message:
+            if method in self.notifications:
+                self.notifications[method](params)
+            return
+        if self.shutdown:
+            self.send_error(message["id"], INVALID_REQUEST, "server is shut down")
+        elif method not in self.requests:
+            self.send_error(message["id"], METHOD_NOT_FOUND, f"method not found: {method}")
+        else:
+            try:
+                result = self.requests[method](params)
+            except Exception as exc:  # noqa: BLE001
+                self.send_error(message["id"], INTERNAL_ERROR, str(exc))
+            else:
+                write_message(self.writer, {"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def send_error(self, msg_id: int | str | None, code: int, text: str) -> None:
+        """Send an error in response to a request.
+
+        :param msg_id: id of request
+        :param code: error code
+        :param text: error message
+        """
+        write_message(self.writer, {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": text}})
+
+    def publish_diagnostics(self, uri: str, diagnostics: list[dict[str, Any]]) -> None:
+        """Send diagnostics of a document.
+
+        :param uri: URI of document
+        :param diagnostics: diagnostics
+        """
+        write_message(
+            self.writer,
+            {
+                "jsonrpc": "2.0",
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": uri, "diagnostics": diagnostics},
+            },
+        )
+
+    def initialize(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Initialize the server (request "initialize").
+
+        :param params: parameters, with capabilities of the client
+        :return: capabilities of the server
+        """
+        encodings = params.get("capabilities", {}).get("general", {}).get("positionEncodings", [])
+        self.encoding = next((enc for enc in ("utf-32", "utf-8") if enc in encodings), "utf-16")
+        return {
+            "capabilities": {
+                "positionEncoding": self.encoding,
+                "textDocumentSync": {"openClose": True, "change": TEXT_DOCUMENT_SYNC_INCREMENTAL},
+            },
+            "serverInfo": {
+                "name": "weechat-script-lint",
+                "version": importlib.metadata.version("weechat_script_lint"),
+            },
+        }
+
+    def shutdown_server(self, params: dict[str, Any]) -> None:  # noqa: ARG002
+        """Shut down the server (request "shutdown").
+
+        :param params: parameters (not used)
+        """
+        self.shutdown = True
+
+    def did_open(self, params: dict[str, Any]) -> None:
+        """Check a document opened (notification "textDocument/didOpen").
+
+        :param params: parameters, with the document
+        """
+        uri = params["textDocument"]["uri"]
+        document = Document(uri, params["textDocument"]["text"], self.ignore, self.msg_level, self.rules)
+        self.documents[uri] = document
+        self.publish_diagnostics(uri, document.get_diagnostics(self.encoding))
+
+    def did_change(self, params: dict[str, Any]) -> None:
+        """Check a document changed (notification "textDocument/didChange").
+
+        :param params: parameters, with the changes
+        """
+        uri = params["textDocument"]["uri"]
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        for change in params["contentChanges"]:
+            if "range" in change:
+                document.apply_change(change["range"]["start"], change["range"]["end"], change["text"], self.encoding)
+            else:
+                document.set_text(change["text"])
+        document.update()
+        self.publish_diagnostics(uri, document.get_diagnostics(self.encoding))
+
+    def did_close(self, params: dict[str, Any]) -> None:
+        """Forget a document closed (notification "textDocument/didClose").
+
+        :param params: parameters, with the document
+        """
+        uri = params["textDocument"]["uri"]
+        if self.documents.pop(uri, None) is not None:
+            self.publish_diagnostics(uri, [])
@@ -0,0 +1,159 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Columnar store of messages, for runs with many messages."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, TypeVar
+
+from weechat_script_lint.script import LEVEL_LABELS, ScriptMessage
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Generator, Iterator
+
+    from weechat_script_lint.script import WeechatScript
+
+K = TypeVar("K", bound=Hashable)
+
+MessageArgs = tuple[tuple[str, str], ...]
+
+
+def intern(ids: dict[K, int], values: list[K], value: K) -> int:
+    """Return id of a value, add it if not yet known.
+
+    :param ids: ids of known values
+    :param values: known values (the id is the index in this list)
+    :param value: value
+    :return: id of value
+    """
+    value_id = ids.get(value)
+    if value_id is None:
+        value_id = len(values)
+        ids[value] = value_id
+        values.append(value)
+    return value_id
+
+
+class ResultStore:
+    """Store of messages, with one array per column.
+
+    Paths, messages (level and name) and message arguments are interned:
+    each message takes only a few integers in arrays, instead of a
+    ScriptMessage object.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.paths: list[pathlib.Path] = []
+        self.msg_keys: list[tuple[str, str]] = []
+        self.msg_args: list[MessageArgs] = []
+        self._path_ids: dict[pathlib.Path, int] = {}
+        self._msg_ids: dict[tuple[str, str], int] = {}
+        self._args_ids: dict[MessageArgs, int] = {}
+        self.path_id = array("I")
+        self.msg_id = array("I")
+        self.line = array("I")
+        self.args_id = array("I")
+
+    def __len__(self) -> int:
+        """Return number of messages in the store."""
+        return len(self.msg_id)
+
+    def __iter__(self) -> Iterator[ScriptMessage]:
+        """Return all messages, in the order they were added."""
+        return self._messages(range(len(self)))
+
+    def add_script(self, script: WeechatScript) -> None:
+        """Add messages of a checked script.
+
+        :param script: the checked script
+        """
+        if not script.messages:
+            return
+        path_id = intern(self._path_ids, self.paths, script.path)
+        for msg in script.messages:
+            self.path_id.append(path_id)
+            self.msg_id.append(intern(self._msg_ids, self.msg_keys, (msg.level, msg.msg_name)))
+            self.line.append(msg.line)
+            self.args_id.append(intern(self._args_ids, self.msg_args, tuple(sorted(msg.kwargs.items()))))
+
+    def _messages(self, indexes: Iterator[int] | range) -> Generator[ScriptMessage, None, None]:
+        """Return messages at the given indexes.
+
+        :param indexes: indexes of messages in the store
+        :return: messages
+        """
+        for index in indexes:
+            level, msg_name = self.msg_keys[self.msg_id[index]]
+            yield ScriptMessage(
+                self.paths[self.path_id[index]],
+                level,
+                msg_name,
+                self.line[index],
+                **dict(self.msg_args[self.args_id[index]]),
+            )
+
+    def filter(self, level: str | None = None, msg_name: str | None = None) -> Generator[ScriptMessage, None, None]:
+        """Return messages with a level and/or a name.
+
+        :param level: level of messages ("error", "warning", "info"),
+            None for all levels
+        :param msg_name: name of messages, None for all names
+        :return: messages, in the order they were added
+        """
+        msg_ids = {
+            msg_id
+            for msg_id, (msg_level, name) in enumerate(self.msg_keys)
+            if level in (None, msg_level) and msg_name in (None, name)
+        }
+        yield from self._messages(index for index, msg_id in enumerate(self.msg_id) if msg_id in msg_ids)
+
+    def count(self) -> dict[str, int]:
+        """Return number of messages by level.
+
+        :return: counters (errors/warnings/info)
+        """
+        count_by_id = [0] * len(self.msg_keys)
+        for msg_id in self.msg_id:
+            count_by_id[msg_id] += 1
+        count = dict.fromkeys(LEVEL_LABELS, 0)
+        for (level, _), num in zip(self.msg_keys, count_by_id):
+            count[level] += num
+        return count
+
+    def by_path(self) -> Generator[tuple[pathlib.Path, list[ScriptMessage]], None, None]:
+        """Return messages grouped by script.
+
+        :return: tuples (path, messages), in the order scripts were added
+        """
+        start = 0
+        size = len(self)
+        while start < size:
+            path_id = self.path_id[start]
+            end = start
+            while end < size and self.path_id[end] == path_id:
+                end += 1
+            yield self.paths[path_id], list(self._messages(range(start, end)))
+            start = end
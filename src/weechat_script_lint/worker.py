@@ -0,0 +1,338 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Check scripts in worker processes or threads."""
+
+from __future__ import annotations
+
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING, Generic, TypeVar, Union
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+    from concurrent.futures import Future
+    from multiprocessing.connection import Connection
+
+    from weechat_script_lint.script import ScriptMessage, WeechatScript
+
+T = TypeVar("T")
+
+EXECUTORS = ("auto", "process", "thread")
+
+CheckResult = tuple[
+    list["ScriptMessage"],
+    dict[str, int],
+    int,
+    dict[str, tuple[int, int]],
+    Union[dict[str, float], None],
+]
+
+
+def check_script(script: WeechatScript) -> CheckResult:
+    """Check a script and return the results of the check.
+
+    :param script: script to check
+    :return: tuple (messages, count, score, check_ranges, check_times)
+    """
+    script.check()
+    return script.messages, script.count, script.score, script.check_ranges, script.check_times
+
+
+def check_script_in_thread(script: WeechatScript) -> WeechatScript:
+    """Check a script in a worker thread, without calling its observer.
+
+    The observer is called later by the thread collecting the results (with
+    the method notify_observer), so that an observer does not have to be
+    thread-safe.
+
+    :param script: script to check
+    :return: checked script
+    """
+    observer, script.observer = script.observer, None
+    try:
+        script.check()
+    finally:
+        script.observer = observer
+    return script
+
+
+def set_results(script: WeechatScript, results: CheckResult) -> None:
+    """Set results of a check done in another process on a script, and notify the observer.
+
+    :param script: script
+    :param results: tuple (messages, count, score, check_ranges, check_times)
+    """
+    script.messages, script.count, script.score, script.check_ranges, script.check_times = results
+    script.notify_observer()
+
+
+def worker_loop(conn: Connection) -> None:
+    """Check scripts received on a connection, until None is received.
+
+    :param conn: connection to the parent process
+    """
+    registered = False
+    while True:
+        script = conn.recv()
+        if script is None:
+            break
+        if script.rules is not None and not registered:
+            # messages of custom rules are registered by the parent process, but
+            # not inherited if the process is not forked (start method "spawn"),
+            # and all scripts of a worker are checked with the same rules
+            script.rules.register()
+            registered = True
+        try:
+            conn.send((True, check_script(script)))
+        except Exception as exc:  # noqa: BLE001
+            conn.send((False, exc))
+
+
+class Worker:
+    """A worker process checking scripts."""
+
+    def __init__(self) -> None:
+        """Start a worker process."""
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        """Stop the worker process gracefully."""
+        self.conn.send(None)
+        self.process.join()
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Kill the worker process."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def check_in_process(
+    tasks: Iterable[tuple[T, WeechatScript]],
+) -> Generator[tuple[T, WeechatScript], None, None]:
+    """Check scripts in the current process.
+
+    :param tasks: tuples (key, script), the key is returned with the script
+    :return: tuples (key, script)
+    """
+    for key, script in tasks:
+        script.check()
+        yield key, script
+
+
+class WorkerPool(Generic[T]):
+    """A pool of worker processes checking scripts, with a timeout per script."""
+
+    def __init__(self, jobs: int = 1, timeout: float | None = None) -> None:
+        """Start the worker processes.
+
+        :param jobs: number of worker processes
+        :param timeout: max time in seconds to check a single script
+            (None = no limit)
+        """
+        self.timeout = timeout
+        self.idle: list[Worker] = [Worker() for _ in range(max(1, jobs))]
+        self.busy: dict[Connection, tuple[Worker, T, WeechatScript, float]] = {}
+
+    def submit(self, key: T, script: WeechatScript) -> None:
+        """Send a script to an idle worker.
+
+        :param key: key returned with the script
+        :param script: script to check
+        """
+        worker = self.idle.pop()
+        worker.conn.send(script)
+        deadline = time.monotonic() + self.timeout if self.timeout else float("inf")
+        self.busy[worker.conn] = (worker, key, script, deadline)
+
+    def collect(self) -> Generator[tuple[T, WeechatScript], None, None]:
+        """Wait for at least one script to be checked or to time out.
+
+        :return: tuples (key, script)
+        """
+        next_deadline = min(item[3] for item in self.busy.values())
+        wait_time = None if next_deadline == float("inf") else max(0, next_deadline - time.monotonic())
+        ready = wait(list(self.busy), timeout=wait_time)
+        for conn, (worker, key, script, _) in list(self.busy.items()):
+            if conn not in ready:
+                continue
+            del self.busy[conn]
+            success, results = conn.recv()
+            self.idle.append(worker)
+            if not success:
+                raise results
+            set_results(script, results)
+            yield key, script
+        now = time.monotonic()
+        for conn, (worker, key, script, deadline) in list(self.busy.items()):
+            if deadline <= now:
+                del self.busy[conn]
+                worker.kill()
+                self.idle.append(Worker())
+                script.message("error", "file_timeout", timeout=f"{self.timeout:g}")
+                script.notify_observer()
+                yield key, script
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        for worker in self.idle:
+            worker.stop()
+        for worker, *_ in self.busy.values():
+            worker.kill()
+        self.idle.clear()
+        self.busy.clear()
+
+
+def check_in_workers(
+    tasks: Iterable[tuple[T, WeechatScript]],
+    jobs: int = 1,
+    timeout: float | None = None,
+) -> Generator[tuple[T, WeechatScript], None, None]:
+    """Check scripts in worker processes.
+
+    Scripts are returned as soon as they are checked, so the order can be
+    different from the order of tasks if there are multiple workers.
+
+    A worker taking more than the timeout to check a script is killed
+    and replaced by a new one; the error "file_timeout" is then added
+    on the script.
+
+    :param tasks: tuples (key, script), the key is returned with the script
+    :param jobs: number of worker processes
+    :param timeout: max time in seconds to check a single script
+        (None = no limit)
+    :return: tuples (key, script)
+    """
+    it_tasks = iter(tasks)
+    pool: WorkerPool[T] = WorkerPool(jobs, timeout)
+    try:
+        while True:
+            while pool.idle:
+                task = next(it_tasks, None)
+                if task is None:
+                    break
+                pool.submit(*task)
+            if not pool.busy:
+                break
+            yield from pool.collect()
+    finally:
+        pool.close()
+
+
+def check_in_threads(
+    tasks: Iterable[tuple[T, WeechatScript]],
+    jobs: int = 1,
+) -> Generator[tuple[T, WeechatScript], None, None]:
+    """Check scripts in worker threads.
+
+    Scripts are returned as soon as they are checked, so the order can be
+    different from the order of tasks if there are multiple threads.
+
+    Scripts are not copied between processes, but checks run in parallel
+    only if the GIL is disabled (free-threaded build of CPython). The
+    state shared by threads is read-only during checks: the messages
+    (including the ones of custom rules, registered before the checks),
+    the compiled regular expressions and the caches of compile_regex and
+    get_check_methods, which are thread-safe. A check with a timeout can
+    not be interrupted in a thread, so worker processes must be used.
+
+    :param tasks: tuples (key, script), the key is returned with the script
+    :param jobs: number of worker threads
+    :return: tuples (key, script)
+    """
+    jobs = max(1, jobs)
+    it_tasks = iter(tasks)
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    pending: dict[Future[WeechatScript], T] = {}
+    try:
+        while True:
+            # two scripts per thread, so that a thread does not wait for
+            # the next script while results are collected
+            while len(pending) < 2 * jobs:
+                task = next(it_tasks, None)
+                if task is None:
+                    break
+                key, script = task
+                pending[executor.submit(check_script_in_thread, script)] = key
+            if not pending:
+                break
+            done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                script = future.result()
+                script.notify_observer()
+                yield key, script
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def is_gil_disabled() -> bool:
+    """Return True if the GIL is disabled (free-threaded build of CPython 3.13+).
+
+    :return: True if the GIL is disabled
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def get_executor(executor: str, timeout: float | None = None) -> str:
+    """Return the executor used to check scripts in parallel.
+
+    With "auto", threads are used if the GIL is disabled and there is no
+    timeout, otherwise processes.
+
+    :param executor: "auto", "process" or "thread"
+    :param timeout: max time in seconds to check a single script
+        (None = no limit)
+    :return: "process" or "thread"
+    """
+    if executor == "auto":
+        return "thread" if is_gil_disabled() and not timeout else "process"
+    return executor
+
+
+def in_order(
+    results: Iterable[tuple[T, WeechatScript]],
+    keys: Iterable[T],
+) -> Generator[tuple[T, WeechatScript], None, None]:
+    """Return results in the order of keys, as soon as possible.
+
+    :param results: tuples (key, script), in any order
+    :param keys: keys in the expected order
+    :return: tuples (key, script)
+    """
+    pending: dict[T, WeechatScript] = {}
+    it_keys = iter(keys)
+    next_key = next(it_keys, None)
+    for key, script in results:
+        pending[key] = script
+        while next_key is not None and next_key in pending:
+            yield next_key, pending.pop(next_key)
+            next_key = next(it_keys, None)
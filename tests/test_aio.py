@@ -0,0 +1,135 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on asyncio API."""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import weechat_script_lint.aio
+from weechat_script_lint.aio import lint_path, lint_paths
+from weechat_script_lint.rules import CustomRule, CustomRules
+from weechat_script_lint.script import WeechatScript
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def get_messages(script: WeechatScript) -> list[tuple[str, int, str]]:
+    """Return the messages of a script."""
+    return [(msg.level, msg.line, msg.msg_name) for msg in script.messages]
+
+
+def check(path: Path) -> WeechatScript:
+    """Check a script."""
+    script = WeechatScript(path)
+    script.check()
+    return script
+
+
+async def collect(*args, **kwargs) -> dict[Path, WeechatScript]:  # noqa: ANN002,ANN003
+    """Return all scripts checked by lint_paths."""
+    return {path: script async for path, script in lint_paths(*args, **kwargs)}
+
+
+def test_lint_path() -> None:
+    """Test check of a single script."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+    script = asyncio.run(lint_path(path))
+    assert get_messages(script) == get_messages(check(path))
+    assert script.score == check(path).score
+
+    # content given, level and custom rules
+    rules = CustomRules([CustomRule("custom_test", "error", score=-5, message="test", pattern="test")])
+    script = asyncio.run(lint_path(path, content=b"test\n", msg_level="error", rules=rules))
+    assert get_messages(script) == [("error", 1, "missing_email"), ("error", 1, "custom_test")]
+    assert script.messages[1].text == "test"
+
+    # script not found
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(lint_path(SCRIPTS_DIR / "unknown.py"))
+
+
+def test_lint_path_spawn() -> None:
+    """Test check with custom rules in a worker process which is not forked."""
+    rules = CustomRules([CustomRule("custom_spawn", "error", score=-5, message="spawn", pattern="hook_process")])
+    path = SCRIPTS_DIR / "script_hook_process.py"
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        script = asyncio.run(lint_path(path, rules=rules, executor=executor))
+    assert (script.messages[-1].msg_name, script.messages[-1].text) == ("custom_spawn", "spawn")
+
+
+def test_lint_paths() -> None:
+    """Test check of multiple scripts."""
+    paths = sorted(SCRIPTS_DIR.glob("*.py"))
+    expected = {path: get_messages(check(path)) for path in paths}
+
+    scripts = asyncio.run(collect(paths, max_in_flight=3))
+    assert {path: get_messages(script) for path, script in scripts.items()} == expected
+
+    # asynchronous iterable and thread pool executor
+    async def generate_paths():  # noqa: ANN202
+        for path in paths:
+            await asyncio.sleep(0)
+            yield path
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scripts = asyncio.run(collect(generate_paths(), executor=executor))
+    assert {path: get_messages(script) for path, script in scripts.items()} == expected
+
+    # process pool executor
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        scripts = asyncio.run(collect(paths[:4], executor=executor))
+    assert {path: get_messages(script) for path, script in scripts.items()} == {
+        path: expected[path] for path in paths[:4]
+    }
+
+    # error: exception raised
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(collect([*paths[:4], SCRIPTS_DIR / "unknown.py"]))
+
+
+def test_lint_paths_max_in_flight(monkeypatch) -> None:
+    """Test max number of scripts checked at the same time."""
+    lock = threading.Lock()
+    in_flight = [0, 0]
+    check_script = weechat_script_lint.aio.check_script
+
+    def slow_check_script(*args, **kwargs) -> WeechatScript:  # noqa: ANN002,ANN003
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return check_script(*args, **kwargs)
+
+    monkeypatch.setattr(weechat_script_lint.aio, "check_script", slow_check_script)
+    paths = sorted(SCRIPTS_DIR.glob("*.py"))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        scripts = asyncio.run(collect(paths, max_in_flight=3, executor=executor))
+    assert len(scripts) == len(paths)
+    assert 1 <= in_flight[1] <= 3
@@ -0,0 +1,115 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on baseline."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from weechat_script_lint.baseline import BaselineError, BaselineWriter, get_key, load_baseline
+from weechat_script_lint.script import WeechatScript
+
+SCRIPT = b"""# missing e-mail
+import sys
+if True:
+    sys.exit(1)
+sys.exit(2)
+"""
+
+
+def check(path: Path, content: bytes, baseline: dict[str, int] | None = None) -> WeechatScript:
+    """Check a script."""
+    script = WeechatScript(path, content=content, msg_level="warning", baseline=baseline)
+    script.check()
+    return script
+
+
+def test_get_line() -> None:
+    """Test method get_line of script."""
+    script = WeechatScript(Path("script.py"), content=b"first\r\nsecond\n\nlast")
+    assert script.get_line(1) == b"first"
+    assert script.get_line(2) == b"second"
+    assert script.get_line(3) == b""
+    assert script.get_line(4) == b"last"
+    assert script.get_line(0) == b""
+    assert script.get_line(5) == b""
+
+
+def test_get_key(tmp_path) -> None:
+    """Test function get_key."""
+    assert get_key(tmp_path / "dir" / "script.py", tmp_path) == "dir/script.py"
+    assert get_key(Path("/other/script.py"), tmp_path) == "/other/script.py"
+
+
+def test_baseline(tmp_path) -> None:
+    """Test baseline: known messages are not reported, even after lines are moved."""
+    path = tmp_path / "script.py"
+    baseline_path = tmp_path / "baseline.json"
+    script = check(path, SCRIPT)
+    assert [(msg.line, msg.msg_name) for msg in script.messages] == [
+        (1, "missing_email"),
+        (4, "sys_exit"),
+        (5, "sys_exit"),
+    ]
+    writer = BaselineWriter(baseline_path)
+    writer.add_script(0, path, script)
+    writer.close(1, 1, {})
+    data = json.loads(baseline_path.read_text())
+    assert list(data["scripts"]) == ["script.py"]
+    assert len(data["scripts"]["script.py"]) == 3
+    assert not list(tmp_path.glob("*.new"))
+
+    baseline = load_baseline(baseline_path)
+    assert baseline.get_script(tmp_path / "other.py") is None
+    known = baseline.get_script(path)
+    assert known is not None
+    script = check(path, SCRIPT, known)
+    assert script.messages == []
+    assert script.score == 100
+    # known messages found are consumed in a copy of the baseline
+    assert known == dict.fromkeys(known, 0)
+    assert baseline.get_script(path) == dict.fromkeys(known, 1)
+
+    # lines added and indentation changed: only the new message is reported
+    content = b"# header\n" + SCRIPT.replace(b"    sys", b"\tsys") + b"sys.exit(3)\n"
+    script = check(path, content, baseline.get_script(path))
+    assert [(msg.line, msg.msg_name) for msg in script.messages] == [(7, "sys_exit")]
+
+    # a same message on 2 lines: only one is known
+    script = check(path, SCRIPT + b"sys.exit(2)\n", baseline.get_script(path))
+    assert [(msg.line, msg.msg_name) for msg in script.messages] == [(6, "sys_exit")]
+
+
+def test_load_baseline_error(tmp_path) -> None:
+    """Test load of an invalid baseline."""
+    path = tmp_path / "baseline.json"
+    with pytest.raises(BaselineError, match="unable to read"):
+        load_baseline(path)
+    path.write_text("invalid")
+    with pytest.raises(BaselineError, match="unable to read"):
+        load_baseline(path)
+    path.write_text('{"version": 0}')
+    with pytest.raises(BaselineError, match="unsupported version"):
+        load_baseline(path)
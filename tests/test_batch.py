@@ -0,0 +1,102 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on check of scripts in batch."""
+
+import re
+from pathlib import Path
+
+from weechat_script_lint.batch import ScriptBatch, batch_scripts
+from weechat_script_lint.script import CHECK_EXCLUDES, CHECK_REQUIRES, WeechatScript, get_check_methods
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+# scripts with texts that could be found across the end of a script in a batch
+EDGE_SCRIPTS = [
+    b"import sys\nsys ",
+    b".exit(0)\n",
+    b"#!/usr/bin/env python3\n",
+    b"weechat.hook_modifier(",
+    b"'irc_in_privmsg', 'cb', '')\n",
+    b"x = '\xc3",
+    b"\xa9'\n",
+    b"\tif True:\n        pass\n",
+    b"https://www.",
+    b"weechat.org\n",
+    b"some.name@",
+    b"domain.org\n",
+    b"",
+    b"SPDX-FileCopyrightText: me\nSPDX-License-Identifier: GPL-3.0-or-later\n",
+]
+
+
+def get_results(script: WeechatScript) -> tuple[object, ...]:
+    """Return results of a checked script."""
+    return (
+        [(msg.level, msg.msg_name, msg.line, msg.kwargs) for msg in script.messages],
+        script.count,
+        script.score,
+        script.check_ranges,
+    )
+
+
+def test_batch_checks() -> None:
+    """Test that all built-in checks can be skipped in batch."""
+    names = set(get_check_methods(WeechatScript)) - {"_check_custom_rules"}
+    assert names == CHECK_REQUIRES.keys() | CHECK_EXCLUDES.keys()
+
+
+def test_script_batch_search() -> None:
+    """Test search of a regex in a batch of scripts."""
+    paths = [Path(f"script{i}.py") for i in range(4)]
+    contents = [b"a", b"b", b"#!ab", b"xyz"]
+    batch = ScriptBatch([WeechatScript(path, content=content) for path, content in zip(paths, contents)])
+    assert batch.buffer == b"\na\nb\n#!ab\nxyz"
+    assert batch.search(re.compile(rb"xyz")) == {3: True}
+    assert batch.search(re.compile(rb"ab")) == {2: True}
+    assert batch.search(re.compile(rb"\n#!")) == {2: True}
+    # match across the end of a script: uncertain
+    assert batch.search(re.compile(rb"a\s*b")) == {0: False, 2: True}
+    assert batch.search(re.compile(rb"nothing")) == {}
+
+
+def test_batch_scripts() -> None:
+    """Test check of scripts in batch: results must be the same as a check of each script alone."""
+    contents = [path.read_bytes() for path in sorted(SCRIPTS_DIR.glob("*.py"))] + EDGE_SCRIPTS
+    contents += [contents[(index * 7) % len(contents)] for index in range(100)]
+    paths = [Path(f"script{i}{'.pl' if i % 5 == 0 else '.py'}") for i in range(len(contents))]
+    expected = []
+    for path, content in zip(paths, contents):
+        script = WeechatScript(path, content=content)
+        script.check()
+        expected.append(get_results(script))
+    for max_bytes, max_script_size in ((1024 * 1024, 64 * 1024), (4096, 1024), (1, 64 * 1024)):
+        tasks = [
+            (index, WeechatScript(path, content=content)) for index, (path, content) in enumerate(zip(paths, contents))
+        ]
+        batched = list(batch_scripts(tasks, max_bytes=max_bytes, max_script_size=max_script_size))
+        assert [index for index, _ in batched] == list(range(len(contents)))
+        assert any(script.skipped_checks for _, script in batched)
+        results = []
+        for _, script in batched:
+            script.check()
+            results.append(get_results(script))
+        assert results == expected
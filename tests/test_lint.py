@@ -21,13 +21,20 @@
 
 """Tests on main/init functions."""
 
+import argparse
+import importlib
+import io
+import os
+import shutil
 import sys
 from pathlib import Path
 
 import pytest
 
 import weechat_script_lint
-from weechat_script_lint.lint import get_status_color
+from weechat_script_lint.lint import get_status_color, parse_fraction, parse_shard
+from weechat_script_lint.rules import tomllib
+from weechat_script_lint.server import write_message
 
 SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
 
@@ -120,6 +127,20 @@ def test_main_dir(monkeypatch) -> None:
         weechat_script_lint.main()
     assert exc.value.code == 9
 
+    # check directory with scripts, display summary of scores and worst scripts
+    args = [
+        "weechat-script-lint",
+        "--score-summary",
+        "--worst",
+        "3",
+        "--recursive",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+
     # check a script returning only a warning
     filename = str(SCRIPTS_DIR / "script_modifier_irc_in.py")
     args = [
@@ -153,6 +174,497 @@ def test_main_dir(monkeypatch) -> None:
     assert exc.value.code == 0
 
 
+def test_main_dir_options(monkeypatch) -> None:
+    """Test main function with a directory and options changing the way scripts are checked."""
+    # check directory with scripts read ahead
+    args = [
+        "weechat-script-lint",
+        "--prefetch",
+        "4",
+        "--recursive",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+
+    # check directory with scripts, with a timeout on each script
+    args = [
+        "weechat-script-lint",
+        "--file-timeout",
+        "30",
+        "--recursive",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+
+    # check directory with scripts in parallel
+    args = [
+        "weechat-script-lint",
+        "--jobs",
+        "3",
+        "--file-timeout",
+        "30",
+        "--recursive",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+
+    # check directory with scripts, messages grouped by name
+    args = [
+        "weechat-script-lint",
+        "--group-by",
+        "message",
+        "--recursive",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+
+    # check directory with scripts, with machine-readable output
+    for output_format in ("jsonl", "sarif"):
+        args = [
+            "weechat-script-lint",
+            "--format",
+            output_format,
+            "--verbose",
+            "--recursive",
+            str(SCRIPTS_DIR),
+        ]
+        monkeypatch.setattr(sys, "argv", args)
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        assert exc.value.code == 10
+
+
+def test_main_fail_fast(monkeypatch, capsys) -> None:
+    """Test main function with option --fail-fast."""
+    num_scripts = len(list(SCRIPTS_DIR.rglob("*.py")))
+
+    # check directory with scripts, stop at first error: the following
+    # scripts are not checked
+    for jobs in ("1", "3"):
+        args = [
+            "weechat-script-lint",
+            "--no-colors",
+            "--fail-fast",
+            "--jobs",
+            jobs,
+            "--recursive",
+            str(SCRIPTS_DIR),
+        ]
+        monkeypatch.setattr(sys, "argv", args)
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        assert exc.value.code == 4
+        summary = capsys.readouterr().out.splitlines()[-2]
+        assert summary.startswith("FAILED: ")
+        num_checked = int(summary.split()[1])
+        assert 0 < num_checked < num_scripts
+        assert " 4 errors," in summary
+
+    # check a script with all errors, stop at first error
+    args = [
+        "weechat-script-lint",
+        "--fail-fast",
+        str(SCRIPTS_DIR / "script_all_errors.py"),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 4
+
+    # check a script with only a warning, stop at first warning with --strict
+    args = [
+        "weechat-script-lint",
+        "--fail-fast",
+        "--strict",
+        str(SCRIPTS_DIR / "script_modifier_irc_in.py"),
+        str(SCRIPTS_DIR / "script_all_errors.py"),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 1
+
+
+def test_main_return_code(monkeypatch, tmp_path, capsys) -> None:
+    """Test return code: number of errors, whatever the options displaying the results."""
+    options_list = [
+        [],
+        ["--name-only"],
+        ["--name-only", "--manifest", str(tmp_path / "manifest.jsonl")],
+        ["--name-only", "--format", "jsonl"],
+        ["--score"],
+        ["--score-summary"],
+        ["--worst", "2"],
+    ]
+    for strict, expected in (([], 10), (["--strict"], 26)):
+        for options in options_list:
+            args = ["weechat-script-lint", *strict, *options, "--recursive", str(SCRIPTS_DIR)]
+            monkeypatch.setattr(sys, "argv", args)
+            with pytest.raises(SystemExit) as exc:
+                weechat_script_lint.main()
+            assert exc.value.code == expected, options
+    capsys.readouterr()
+
+
+def test_main_executor(monkeypatch) -> None:
+    """Test main function with option --executor."""
+    # check directory with scripts in parallel, in threads
+    args = [
+        "weechat-script-lint",
+        "--jobs",
+        "3",
+        "--executor",
+        "thread",
+        "--recursive",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+
+    # no timeout with threads
+    args = [
+        "weechat-script-lint",
+        "--executor",
+        "thread",
+        "--file-timeout",
+        "30",
+        str(SCRIPTS_DIR),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 2
+
+
+def test_main_shards(monkeypatch, tmp_path, capsys) -> None:
+    """Test main function with shards and merge of results."""
+    # single run on all scripts
+    args = ["weechat-script-lint", "--recursive", str(SCRIPTS_DIR)]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+    output = capsys.readouterr().out
+
+    # run on 3 shards, files of directories found in a different order
+    # on each machine
+    results_files = []
+    listdir = os.listdir
+    for shard in range(1, 4):
+        monkeypatch.setattr(os, "listdir", lambda path, reverse=(shard == 2): sorted(listdir(path), reverse=reverse))
+        results_file = str(tmp_path / f"shard{shard}.jsonl")
+        args = [
+            "weechat-script-lint",
+            "--quiet",
+            "--shard",
+            f"{shard}/3",
+            "--results-file",
+            results_file,
+            "--recursive",
+            str(SCRIPTS_DIR),
+        ]
+        monkeypatch.setattr(sys, "argv", args)
+        with pytest.raises(SystemExit):
+            weechat_script_lint.main()
+        results_files.append(results_file)
+    assert capsys.readouterr().out == ""
+
+    # merge results of shards: same output and return code as a single run
+    args = ["weechat-script-lint", "--merge", *results_files]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+    assert capsys.readouterr().out == output
+
+    # merge of results with an unknown message (custom rule)
+    results_file = tmp_path / "custom.jsonl"
+    results_file.write_text(
+        '{"index": 0, "path": "s.py", "resolved": "s.py", "messages": [["error", "custom_not_loaded", 1, {}]]}\n',
+    )
+    monkeypatch.setattr(sys, "argv", ["weechat-script-lint", "--merge", str(results_file)])
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == "FATAL: unknown message custom_not_loaded (option --rules missing?)"
+
+
+def test_main_duplicates(monkeypatch, tmp_path, capsys) -> None:
+    """Test main function with overlapping paths and symbolic links."""
+    scripts_dir = tmp_path / "scripts"
+    sub_dir = scripts_dir / "subdir"
+    sub_dir.mkdir(parents=True)
+    (sub_dir / "script.py").write_bytes((SCRIPTS_DIR / "script_missing_email.py").read_bytes())
+    (sub_dir / "link.py").symlink_to(sub_dir / "script.py")
+    # cycle: link to parent directory
+    (sub_dir / "parent").symlink_to(scripts_dir, target_is_directory=True)
+    args = [
+        "weechat-script-lint",
+        "--no-colors",
+        "--verbose",
+        "--recursive",
+        str(scripts_dir),
+        str(sub_dir),
+        str(sub_dir / "script.py"),
+    ]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 1
+    output = capsys.readouterr().out
+    assert "FAILED: 1 scripts analyzed, 1 with issues: 1 errors, 0 warnings, 0 info" in output
+    assert output.count("already found, skipped") == 4
+
+
+@pytest.mark.skipif(tomllib is None, reason="tomllib or tomli is required")
+def test_main_rules(monkeypatch, tmp_path, capsys) -> None:
+    """Test main function with custom rules."""
+    rules_file = tmp_path / "rules.toml"
+    rules_file.write_text(
+        "[rules.custom_hook_process]\n"
+        'level = "error"\n'
+        'message = "hook_process is not allowed"\n'
+        "pattern = 'hook_process\\('\n",
+    )
+    args = ["weechat-script-lint", "--rules", str(rules_file), str(SCRIPTS_DIR / "script_hook_process.py")]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 1
+    output = capsys.readouterr().out
+    assert "[custom_hook_process]: hook_process is not allowed" in output
+
+    # custom error after a built-in warning: checks do not stop at the warning
+    rules_file.write_text(
+        '[rules.custom_sys_exit]\nlevel = "error"\nmessage = "sys.exit is not allowed"\npattern = \'sys\\.exit\\(\'\n',
+    )
+    script_sys_exit = str(SCRIPTS_DIR / "script_sys_exit.py")
+    for options in (["--name-only"], ["--name-only", "--fail-fast"], ["--score"]):
+        args = ["weechat-script-lint", *options, "--rules", str(rules_file), script_sys_exit]
+        monkeypatch.setattr(sys, "argv", args)
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        assert exc.value.code == 1
+        capsys.readouterr()
+
+    # invalid rules file
+    rules_file.write_text("[rules.custom\n")
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert str(exc.value.code).startswith("FATAL: unable to read rules file")
+
+
+def test_main_manifest(monkeypatch, tmp_path, capsys) -> None:
+    """Test main function with a manifest."""
+    scripts_dir = tmp_path / "scripts"
+    shutil.copytree(SCRIPTS_DIR, scripts_dir, ignore=shutil.ignore_patterns("subdir"))
+    for path in scripts_dir.iterdir():
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    manifest = tmp_path / "manifest.jsonl"
+    read_paths = []
+    lint_module = importlib.import_module("weechat_script_lint.lint")
+    read_scripts = lint_module.read_scripts
+
+    def spy_read_scripts(scripts, *args):  # noqa: ANN002,ANN202
+        return read_scripts((read_paths.append(script[0].name) or script for script in scripts), *args)
+
+    monkeypatch.setattr(lint_module, "read_scripts", spy_read_scripts)
+
+    def run(*options: str) -> tuple[object, str]:
+        read_paths.clear()
+        monkeypatch.setattr(sys, "argv", ["weechat-script-lint", *options, str(scripts_dir)])
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        return exc.value.code, capsys.readouterr().out
+
+    # first run: all scripts are read and checked
+    result = run("--manifest", str(manifest))
+    assert result == run()
+    assert len(read_paths) == len(list(scripts_dir.glob("*.py")))
+    assert not list(tmp_path.glob("*.new"))
+
+    # unchanged scripts: no script is read
+    assert run("--manifest", str(manifest)) == result
+    assert read_paths == []
+
+    # scripts checked in worker processes
+    manifest.unlink()
+    assert run("--manifest", str(manifest), "--jobs", "2") == result
+    assert run("--manifest", str(manifest)) == result
+    assert read_paths == []
+
+    # a script is changed: only this script is read
+    with (scripts_dir / "script_valid.py").open("a") as script_file:
+        script_file.write("import sys\nsys.exit(1)\n")
+    result = run("--manifest", str(manifest))
+    assert read_paths == ["script_valid.py"]
+    assert result == run()
+    assert "script_valid.py:" in result[1]
+
+    # other options: the manifest is ignored
+    result = run("--manifest", str(manifest), "-m", "sys_exit")
+    assert len(read_paths) == len(list(scripts_dir.glob("*.py")))
+    assert result == run("-m", "sys_exit")
+
+    # invalid manifest: all scripts are read
+    manifest.write_text("invalid\n")
+    result = run("--manifest", str(manifest))
+    assert len(read_paths) == len(list(scripts_dir.glob("*.py")))
+    assert result == run()
+
+
+def test_main_metrics(monkeypatch, tmp_path) -> None:
+    """Test main function with export of metrics."""
+    metrics = tmp_path / "metrics.txt"
+    args = ["weechat-script-lint", "--metrics", str(metrics), "--quiet", str(SCRIPTS_DIR)]
+    monkeypatch.setattr(sys, "argv", args)
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 10
+    lines = metrics.read_text().splitlines()
+    assert f"weechat_script_lint_files_total {len(list(SCRIPTS_DIR.rglob('*.py')))}" in lines
+    assert 'weechat_script_lint_messages_total{level="error"} 10' in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_main_batch(monkeypatch, capsys) -> None:
+    """Test main function with check of scripts in batch."""
+    outputs = []
+    for options in ((), ("--batch",), ("--batch", "--jobs", "2")):
+        monkeypatch.setattr(sys, "argv", ["weechat-script-lint", "-c", "-r", *options, str(SCRIPTS_DIR)])
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        assert exc.value.code == 10
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1] == outputs[2]
+
+
+def test_main_baseline(monkeypatch, tmp_path, capsys) -> None:
+    """Test main function with a baseline."""
+    scripts_dir = tmp_path / "scripts"
+    shutil.copytree(SCRIPTS_DIR, scripts_dir)
+    baseline = tmp_path / "baseline.json"
+    manifest = tmp_path / "manifest.jsonl"
+
+    def run(*options: str) -> tuple[object, str]:
+        monkeypatch.setattr(sys, "argv", ["weechat-script-lint", "-c", "-r", *options, str(scripts_dir)])
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        return exc.value.code, capsys.readouterr().out
+
+    # update of baseline: all messages are reported
+    result = run("--baseline", str(baseline), "--update-baseline")
+    assert result == run()
+    assert result[0] == 10
+
+    # all messages are known
+    for options in ((), ("--jobs", "2"), ("--manifest", str(manifest)), ("--manifest", str(manifest))):
+        code, output = run("--baseline", str(baseline), *options)
+        assert code == 0
+        assert "0 errors, 0 warnings, 0 info" in output
+        assert "[sys_exit]" not in output
+
+    # lines added before a known message and a new message: only the new one is reported
+    path = scripts_dir / "script_sys_exit.py"
+    path.write_text(f"# new line\n{path.read_text()}sys.exit(2)\n")
+    lines = len(path.read_text().splitlines())
+    for _ in range(2):
+        code, output = run("--baseline", str(baseline), "--manifest", str(manifest))
+        assert code == 0
+        assert f"script_sys_exit.py:{lines}: warning [sys_exit]" in output
+        assert "0 errors, 1 warnings, 0 info" in output
+
+    # invalid usage and invalid baseline
+    assert run("--update-baseline")[0] == 2
+    content = baseline.read_text()
+    for options in (("--fail-fast",), ("--shard", "1/2"), ("--sample", "0.5"), ("--sample-count", "2")):
+        assert run("--baseline", str(baseline), "--update-baseline", *options)[0] == 2
+        assert baseline.read_text() == content
+    baseline.write_text("invalid")
+    code, _ = run("--baseline", str(baseline))
+    assert "unable to read baseline file" in str(code)
+
+
+def test_main_sample(monkeypatch, capsys) -> None:
+    """Test main function with a sample of scripts."""
+
+    def run(*options: str) -> tuple[object, str]:
+        monkeypatch.setattr(sys, "argv", ["weechat-script-lint", "-c", "-r", *options, str(SCRIPTS_DIR)])
+        with pytest.raises(SystemExit) as exc:
+            weechat_script_lint.main()
+        return exc.value.code, capsys.readouterr().out
+
+    num_scripts = len(list(SCRIPTS_DIR.rglob("*.py")))
+    code, output = run("--sample-count", "5", "--seed", "3")
+    assert f"Estimates on {num_scripts} scripts from a sample of 5 scripts" in output
+    assert "5 scripts analyzed" in output
+    assert "  average score: " in output
+    assert run("--sample-count", "5", "--seed", "3") == (code, output)
+    assert run("--sample-count", "5", "--seed", "4") != (code, output)
+
+    # whole sample: estimates are the results
+    code, output = run("--sample", "1")
+    assert (code, output.replace(output[output.index("Estimates") : output.index("Exiting")], "")) == run()
+    assert f"  errors: {code} [{code} - {code}]" in output
+
+    # name only: no estimates
+    assert "Estimates" not in run("--sample", "0.5", "-n")[1]
+    assert run("--sample", "0.5", "--sample-count", "2")[0] == 2
+
+
+def test_main_lsp(monkeypatch, capsys) -> None:
+    """Test main function with the language server."""
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]
+    stdin = io.BytesIO()
+    for message in messages:
+        write_message(stdin, message)
+    stdin.seek(0)
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(stdin))
+    monkeypatch.setattr(sys, "argv", ["weechat-script-lint", "--lsp"])
+    with pytest.raises(SystemExit) as exc:
+        weechat_script_lint.main()
+    assert exc.value.code == 0
+    output = capsys.readouterr().out
+    assert output.count("Content-Length:") == 2
+    assert '"positionEncoding":"utf-16"' in output
+
+
+def test_parse_shard() -> None:
+    """Test function parse_shard."""
+    assert parse_shard("1/1") == (1, 1)
+    assert parse_shard("2/5") == (2, 5)
+    for value in ("", "1", "0/2", "3/2", "a/b", "1/2/3"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(value)
+
+
+def test_parse_fraction() -> None:
+    """Test function parse_fraction."""
+    assert parse_fraction("1") == 1
+    assert parse_fraction("0.25") == 0.25
+    for value in ("", "0", "-0.5", "1.5", "a", "nan"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_fraction(value)
+
+
 def test_get_status_color() -> None:
     """Test function get_status_color."""
     assert get_status_color(-1) == ""
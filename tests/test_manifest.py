@@ -0,0 +1,130 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on manifest."""
+
+import os
+import shutil
+from pathlib import Path
+
+import weechat_script_lint.manifest
+from weechat_script_lint.manifest import Manifest, get_fingerprints
+from weechat_script_lint.rules import CustomRule, CustomRules
+from weechat_script_lint.script import WeechatScript, read_script
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def get_messages(script: WeechatScript) -> list[tuple[str, int, str]]:
+    """Return the messages of a script."""
+    return [(msg.level, msg.line, msg.msg_name) for msg in script.messages]
+
+
+def run(manifest_path: Path, path: Path) -> tuple[bool, dict, WeechatScript]:
+    """Check a script with a manifest, which is updated."""
+    manifest = Manifest(manifest_path, {})
+    unchanged = manifest.is_unchanged(path, path.stat())
+    if unchanged:
+        cached = manifest.get_cached(manifest.records[str(path.absolute())])
+        script = manifest.get_script(path)
+    else:
+        cached = manifest.get_cached_results(path, read_script(path))
+        script = WeechatScript(path, cached=cached)
+        script.check()
+    manifest.add_script(0, path, script)
+    manifest.close(1, 1, {})
+    return unchanged, cached, script
+
+
+def test_get_fingerprints() -> None:
+    """Test fingerprints of checks."""
+    fingerprints = get_fingerprints()
+    assert list(fingerprints) == WeechatScript(Path("script.py"), content=b"").get_check_names()
+    assert len(set(fingerprints.values())) == len(fingerprints)
+    assert get_fingerprints() == fingerprints
+
+    # custom rules: a single fingerprint, not changed by score and message
+    rule = CustomRule("custom_test", "warning", score=-5, message="test", pattern="test")
+    fingerprints_rules = get_fingerprints(CustomRules([rule]))
+    assert fingerprints_rules.keys() == {*fingerprints, "_check_custom_rules"}
+    rule2 = CustomRule("custom_test", "warning", score=-10, message="other", pattern="test")
+    assert get_fingerprints(CustomRules([rule2])) == fingerprints_rules
+    rule3 = CustomRule("custom_test", "warning", score=-5, message="test", pattern="other")
+    assert get_fingerprints(CustomRules([rule3]))["_check_custom_rules"] != fingerprints_rules["_check_custom_rules"]
+
+
+def test_manifest(monkeypatch, tmp_path) -> None:
+    """Test manifest with changes in a script and in checks."""
+    path = tmp_path / "script.py"
+    shutil.copy(SCRIPTS_DIR / "script_all_errors.py", path)
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    manifest_path = tmp_path / "manifest.jsonl"
+    full = WeechatScript(path)
+    full.check()
+
+    # no manifest: all checks run
+    unchanged, cached, script = run(manifest_path, path)
+    assert not unchanged
+    assert cached == {}
+    assert get_messages(script) == get_messages(full)
+
+    # unchanged script: not read
+    unchanged, cached, script = run(manifest_path, path)
+    assert unchanged
+    assert cached.keys() == get_fingerprints().keys()
+    assert not script.script
+    assert get_messages(script) == get_messages(full)
+
+    # new stat values, same content: results are used
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    unchanged, cached, script = run(manifest_path, path)
+    assert not unchanged
+    assert cached.keys() == get_fingerprints().keys()
+    assert get_messages(script) == get_messages(full)
+
+    # a check has changed: only this check runs
+    fingerprints = get_fingerprints()
+
+    def get_fingerprints_changed(rules=None) -> dict[str, str]:  # noqa: ARG001
+        return {**fingerprints, "_check_exit": "changed"}
+
+    def fail(self) -> None:  # noqa: ARG001
+        raise AssertionError
+
+    monkeypatch.setattr(weechat_script_lint.manifest, "get_fingerprints", get_fingerprints_changed)
+    with monkeypatch.context() as context:
+        for name in fingerprints:
+            if name != "_check_exit":
+                context.setattr(WeechatScript, name, fail)
+        unchanged, cached, script = run(manifest_path, path)
+    assert not unchanged
+    assert cached.keys() == fingerprints.keys() - {"_check_exit"}
+    assert get_messages(script) == get_messages(full)
+    unchanged, cached, script = run(manifest_path, path)
+    assert unchanged
+
+    # content changed: all checks run
+    with path.open("a") as script_file:
+        script_file.write("\n")
+    unchanged, cached, script = run(manifest_path, path)
+    assert not unchanged
+    assert cached == {}
+    assert get_messages(script) == get_messages(full)
@@ -0,0 +1,131 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on observers."""
+
+from pathlib import Path
+
+from weechat_script_lint.observer import MetricsExporter, Observer
+from weechat_script_lint.script import ScriptMessage, WeechatScript
+from weechat_script_lint.worker import check_in_threads, check_in_workers
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+class RecordObserver(Observer):
+    """Observer recording events."""
+
+    def __init__(self) -> None:
+        """Initialize observer."""
+        self.events: list[tuple[str, str]] = []
+
+    def file_started(self, script: WeechatScript) -> None:
+        """Record start of checks."""
+        self.events.append(("file_started", script.path.name))
+
+    def rule_finished(self, script: WeechatScript, name: str, duration: float) -> None:  # noqa: ARG002
+        """Record end of a check."""
+        assert duration >= 0
+        self.events.append(("rule_finished", name))
+
+    def message_emitted(self, script: WeechatScript, message: ScriptMessage) -> None:  # noqa: ARG002
+        """Record a message."""
+        self.events.append(("message_emitted", message.msg_name))
+
+    def file_finished(self, script: WeechatScript, duration: float) -> None:
+        """Record end of checks."""
+        assert duration >= 0
+        self.events.append(("file_finished", script.path.name))
+
+
+def test_observer_events() -> None:
+    """Test events received by an observer."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+    script = WeechatScript(path)
+    script.check()
+    assert script.observer is None
+    assert script.check_times is None
+    expected = [("file_started", path.name)]
+    for name, (start, end) in script.check_ranges.items():
+        expected += [("message_emitted", msg.msg_name) for msg in script.messages[start:end]]
+        expected.append(("rule_finished", name))
+    expected.append(("file_finished", path.name))
+
+    observer = RecordObserver()
+    script = WeechatScript(path, observer=observer)
+    script.check()
+    assert observer.events == expected
+    assert script.check_times is not None
+    assert script.check_times.keys() == script.check_ranges.keys()
+
+    # check in steps
+    observer = RecordObserver()
+    script = WeechatScript(path, observer=observer)
+    for _ in script.check_steps(max_bytes=1):
+        pass
+    assert observer.events == expected
+
+    # check in a worker process: events sent in this process
+    observer = RecordObserver()
+    script = WeechatScript(path, observer=observer)
+    checked = list(check_in_workers([(0, script)]))
+    assert checked[0][1].observer is observer
+    assert observer.events == expected
+
+    # check in a worker thread: events sent in this thread
+    observer = RecordObserver()
+    script = WeechatScript(path, observer=observer)
+    checked = list(check_in_threads([(0, script)]))
+    assert checked[0][1].observer is observer
+    assert observer.events == expected
+
+
+def test_metrics_exporter(tmp_path) -> None:
+    """Test export of metrics."""
+    metrics = MetricsExporter()
+    paths = sorted(SCRIPTS_DIR.glob("*.py"))
+    count = {"error": 0, "warning": 0, "info": 0}
+    for path in paths:
+        script = WeechatScript(path, observer=metrics)
+        script.check()
+        for level in count:
+            count[level] += script.count[level]
+    num_checks = len(script.check_ranges)
+    path = SCRIPTS_DIR / "script_sys_exit.py"
+    script = WeechatScript(path, observer=metrics, cached={"_check_exit": [["warning", "sys_exit", 27, {}]]})
+    script.check()
+    count["warning"] += 1
+    metrics_file = tmp_path / "metrics.txt"
+    metrics.write(metrics_file)
+    lines = metrics_file.read_text().splitlines()
+    assert f"weechat_script_lint_files_total {len(paths) + 1}" in lines
+    size = sum(len(path.read_bytes()) for path in paths) + len(path.read_bytes())
+    assert f"weechat_script_lint_scanned_bytes_total {size}" in lines
+    for level, count_level in count.items():
+        assert f'weechat_script_lint_messages_total{{level="{level}"}} {count_level}' in lines
+    assert 'weechat_script_lint_check_cache_total{result="hit"} 1' in lines
+    misses = (len(paths) + 1) * num_checks - 1
+    assert f'weechat_script_lint_check_cache_total{{result="miss"}} {misses}' in lines
+    assert f'weechat_script_lint_check_duration_seconds_count{{check="email"}} {len(paths) + 1}' in lines
+    assert f'weechat_script_lint_check_duration_seconds_count{{check="exit"}} {len(paths)}' in lines
+    assert f'weechat_script_lint_check_duration_seconds_bucket{{check="exit",le="+Inf"}} {len(paths)}' in lines
+    assert lines[-1] == "# EOF"
+    assert not list(tmp_path.glob("*.new"))
@@ -0,0 +1,105 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on machine-readable output formats."""
+
+import io
+import json
+from pathlib import Path
+
+from weechat_script_lint.output import JsonlWriter, SarifWriter
+from weechat_script_lint.script import WeechatScript
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def get_checked_scripts() -> list[tuple[Path, WeechatScript]]:
+    """Return a list of checked scripts."""
+    scripts = []
+    for name in ("script_all_errors.py", "script_valid.py"):
+        path = SCRIPTS_DIR / name
+        script = WeechatScript(path)
+        script.check()
+        scripts.append((path, script))
+    return scripts
+
+
+def test_jsonl_writer() -> None:
+    """Test JSON Lines output."""
+    stream = io.StringIO()
+    writer = JsonlWriter(stream)
+    for path, script in get_checked_scripts():
+        writer.add_script(0, path, script)
+    writer.close(2, 1, {"error": 4, "warning": 8, "info": 4})
+    objs = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(objs) == 16 + 2 + 1
+    assert objs[0] == {
+        "type": "message",
+        "path": str(SCRIPTS_DIR / "script_all_errors.py"),
+        "line": 1,
+        "level": "error",
+        "name": "missing_email",
+        "text": "the author e-mail is missing",
+    }
+    assert objs[16] == {
+        "type": "script",
+        "path": str(SCRIPTS_DIR / "script_all_errors.py"),
+        "score": 0,
+        "count": {"error": 4, "warning": 8, "info": 4},
+    }
+    assert objs[17]["type"] == "script"
+    assert objs[17]["score"] == 100
+    assert objs[18] == {
+        "type": "report",
+        "scripts": 2,
+        "scripts_with_issues": 1,
+        "count": {"error": 4, "warning": 8, "info": 4},
+    }
+
+
+def test_sarif_writer() -> None:
+    """Test SARIF output."""
+    stream = io.StringIO()
+    writer = SarifWriter(stream)
+    for path, script in get_checked_scripts():
+        writer.add_script(0, path, script)
+    writer.close(2, 1, {"error": 4, "warning": 8, "info": 4})
+    sarif = json.loads(stream.getvalue())
+    assert sarif["version"] == "2.1.0"
+    assert len(sarif["runs"]) == 1
+    run = sarif["runs"][0]
+    rules = run["tool"]["driver"]["rules"]
+    assert rules[0]["id"] == "missing_email"
+    assert len(run["results"]) == 16
+    result = run["results"][-1]
+    assert result["ruleId"] == "missing_spdx_license"
+    assert rules[result["ruleIndex"]]["id"] == "missing_spdx_license"
+    assert result["level"] == "note"
+    location = result["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"]["uri"] == (SCRIPTS_DIR / "script_all_errors.py").as_uri()
+    assert location["region"]["startLine"] == 1
+
+    # no results
+    stream = io.StringIO()
+    writer = SarifWriter(stream)
+    writer.add_script(0, Path("script_valid.py"), get_checked_scripts()[1][1])
+    writer.close(1, 0, {"error": 0, "warning": 0, "info": 0})
+    assert json.loads(stream.getvalue())["runs"][0]["results"] == []
@@ -0,0 +1,116 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on facts of Python scripts."""
+
+import mmap
+
+from weechat_script_lint.python_facts import get_python_facts
+
+SCRIPT = b"""import sys as system
+from os import path, getenv as env
+from weechat import (
+    info_get,
+    infolist_free,
+)
+import weechat, os.path
+
+def exit():  # sys.exit() in a comment
+    text = "sys.exit()"
+    system.exit(1)
+    weechat.info_get(
+        "python2_" "bin",
+        env("HOME"),
+    ); info_get(b"version", name)
+    obj().infolist_free(x)
+"""
+
+
+def test_get_python_facts() -> None:
+    """Test facts extracted from a Python script."""
+    facts = get_python_facts(SCRIPT)
+    assert facts is not None
+    assert facts.imports == {
+        "system": "sys",
+        "path": "os.path",
+        "env": "os.getenv",
+        "info_get": "weechat.info_get",
+        "infolist_free": "weechat.infolist_free",
+        "weechat": "weechat",
+        "os": "os",
+    }
+    assert facts.find_names("sys.exit") == [11]
+    assert facts.find_names("exit") == [11]
+    assert facts.find_names("text") == [10]
+    assert facts.find_names("infolist_free") == [16]
+    assert facts.find_names("unknown") == []
+    calls = [(call.line, call.name, call.args) for call in facts.find_calls("info_get")]
+    assert calls == [(12, "weechat.info_get", ["python2_bin", None]), (15, "info_get", ["version", None])]
+    assert [call.args for call in facts.find_calls("os.getenv")] == [["HOME"]]
+    assert facts.indents == {"spaces"}
+
+
+def test_get_python_facts_indents() -> None:
+    """Test indentation of Python scripts."""
+    facts = get_python_facts(b"if True:\n    x = '''\n\ttext'''\n    # \tcomment\n")
+    assert facts is not None
+    assert facts.indents == {"spaces"}
+    facts = get_python_facts(b"if True:\n\tx = 1\nif True:\n    y = 2\n")
+    assert facts is not None
+    assert facts.indents == {"tabs", "spaces"}
+    facts = get_python_facts(b"if True:\n \tx = 1\n")
+    assert facts is not None
+    assert facts.indents == {"mixed"}
+    facts = get_python_facts(b"")
+    assert facts is not None
+    assert facts.indents == set()
+
+
+def test_get_python_facts_error() -> None:
+    """Test facts of scripts which can not be tokenized: the names are still found."""
+    assert get_python_facts(b"if True:\n        x = 1\n    y = 2\nsys.exit(0)\n").find_names("sys.exit") == [4]
+    assert get_python_facts(b"x = (1,\nsys.exit(0)\n").find_names("sys.exit") == [2]
+    assert get_python_facts(b"x = 'unterminated sys.exit(0)\nsys.exit(1)\n").find_names("sys.exit") == [2]
+    assert get_python_facts(b"x = '''unterminated\nsys.exit(0)\n").find_names("sys.exit") == []
+    assert get_python_facts(b"x = \xff\nsys.exit(0)\n").find_names("sys.exit") == [2]
+    facts = get_python_facts(b"from sys import exit as \xc3\xa9xit\n\nx = 'caf\xe9'\n\xc3\xa9xit(0)\n")
+    assert facts.find_names("sys.exit") == [4]
+    assert [(call.line, call.args) for call in facts.find_calls("sys.exit")] == [(4, [None])]
+
+
+def test_get_python_facts_strings() -> None:
+    """Test names in strings: triple quotes in strings and escaped quotes."""
+    content = b"""x = "'''"; sys.exit(1)
+y = '''a \\''' sys.exit(2) ''' + "sys.exit(3)"; sys.exit(4)
+z = \"\"\"
+sys.exit(5) \"\"\"; sys.exit(6)  # sys.exit(7)
+"""
+    assert get_python_facts(content).find_names("sys.exit") == [1, 2, 4]
+
+
+def test_get_python_facts_mmap(tmp_path) -> None:
+    """Test facts of a memory-mapped script."""
+    path = tmp_path / "script.py"
+    path.write_bytes(SCRIPT)
+    with path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        facts = get_python_facts(content)
+        assert facts.find_names("sys.exit") == [11]
+        assert [call.line for call in facts.find_calls("info_get")] == [12, 15]
@@ -0,0 +1,78 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on read-ahead functions."""
+
+import pathlib
+import threading
+import time
+from pathlib import Path
+
+from weechat_script_lint.reader import read_scripts
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def test_read_scripts() -> None:
+    """Test read_scripts function."""
+    paths = [(path, path.stat().st_size) for path in sorted(SCRIPTS_DIR.glob("*.py"))]
+    expected = [(path, path.read_bytes()) for path, _ in paths]
+
+    # no read-ahead
+    assert list(read_scripts(paths)) == expected
+
+    # read-ahead, order of paths is kept
+    assert list(read_scripts(paths, prefetch=1)) == expected
+    assert list(read_scripts(paths, prefetch=8)) == expected
+
+    # read-ahead with a very low memory limit: one file at a time
+    assert list(read_scripts(paths, prefetch=8, max_bytes=1)) == expected
+
+    # no paths
+    assert list(read_scripts([], prefetch=4)) == []
+
+
+def test_read_scripts_slow_storage(monkeypatch, tmp_path) -> None:
+    """Test read_scripts function with slow reads: the max number of bytes must be respected."""
+    paths = []
+    for index in range(8):
+        path = tmp_path / f"script{index}.py"
+        path.write_bytes(b"#" * 4096)
+        paths.append((path, 4096))
+    lock = threading.Lock()
+    started = 0
+    read_bytes = pathlib.Path.read_bytes
+
+    def slow_read_bytes(self: pathlib.Path) -> bytes:
+        nonlocal started
+        with lock:
+            started += 1
+        time.sleep(0.02)
+        return read_bytes(self)
+
+    monkeypatch.setattr(pathlib.Path, "read_bytes", slow_read_bytes)
+    returned = 0
+    for _, content in read_scripts(paths, prefetch=8, max_bytes=2 * 4096):
+        returned += 1
+        assert len(content) == 4096
+        # at most 2 files held: the one returned and one read ahead
+        assert started - returned <= 1
+    assert returned == 8
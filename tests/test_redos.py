@@ -0,0 +1,119 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on time of checks with adversarial inputs (ReDoS)."""
+
+import random
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+from weechat_script_lint.script import CHECK_TRIGGERS, EMAIL_REGEX, WeechatScript
+
+# sizes of inputs: the time of a check must grow linearly with the size
+SMALL_SIZE = 2_000
+BIG_SIZE = 16_000
+
+# max growth of time from small to big input (linear = 8, quadratic = 64),
+# times below MIN_TIME are ignored (not precise enough)
+MAX_GROWTH = 24
+MIN_TIME = 0.01
+
+# fragments of texts searched by the checks
+FRAGMENTS = [
+    *("a", "w", "0", ".", "-", "_", "*", "#", "@", "<", ">", "'", '"', ",", "(", "[", "]", " ", "\t", "\n", "\r"),
+    *(" at ", "[at]", "(at)", " dot ", "[dot]", "{dot}", "a@a", "a@a.a", "url:", "http://", "https://", "www."),
+    *("weechat", "hook_modifier", "hook_signal", "hook_process", "hook_process_hashtable", "info_get"),
+    *("python2_bin", "irc_in_", "irc_out_", "*,irc_out_", "irc_outtags_", "sys.exit", "infolist_get"),
+    *("completion_get_string", "completion_list_add", "SPDX-License-Identifier:", "\xe9"),
+]
+
+# texts repeated to build adversarial inputs: each fragment alone, and
+# random combinations of fragments
+PUMPS = [
+    *FRAGMENTS,
+    "a" * 64,
+    "a." * 32,
+    "http://www",
+    "hook_modifier('irc_in_",
+    "hook_signal('*,",
+    'hook_signal("a,irc_out_\n',
+    "a [at] a",
+    "a at a dot ",
+    *(
+        "".join(random.Random(seed).choices(FRAGMENTS, k=random.Random(seed).randint(2, 4)))  # noqa: S311
+        for seed in range(100)
+    ),
+]
+
+CHECKS = WeechatScript(Path("script.py"), content=b"").get_check_names()
+
+
+def get_input(pump: str, size: int) -> bytes:
+    """Return an adversarial input: a text repeated up to a size."""
+    data = pump.encode("utf-8")
+    return (data * (size // len(data) + 1))[:size]
+
+
+def measure(func, data: bytes) -> float:
+    """Return the min time of a function called with some data."""
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def assert_linear(func) -> None:
+    """Check that the time of a function grows linearly with the size of adversarial inputs."""
+    for pump in PUMPS:
+        small = measure(func, get_input(pump, SMALL_SIZE))
+        big = measure(func, get_input(pump, BIG_SIZE))
+        message = f"super-linear time with input {pump!r}: {small:g}s -> {big:g}s"
+        assert big <= max(MAX_GROWTH * small, MIN_TIME), message
+
+
+@pytest.mark.parametrize("check", CHECKS)
+def test_redos_checks(check) -> None:
+    """Test time of each check with adversarial inputs."""
+    for suffix in (".py", ".pl"):
+        path = Path(f"script{suffix}")
+        assert_linear(lambda data: getattr(WeechatScript(path, content=data), check)())  # noqa: B023
+
+
+@pytest.mark.parametrize("check", sorted(CHECK_TRIGGERS))
+def test_redos_triggers(check) -> None:
+    """Test time of regexes triggering checks in the language server with adversarial inputs."""
+    assert_linear(CHECK_TRIGGERS[check].search)
+
+
+def test_email_regex_start_of_name() -> None:
+    """Test that the e-mail regex finds e-mails only at the start of names, with the same results."""
+    lookbehind = rb"(?<![*#a-z0-9_.+-])"
+    assert lookbehind in EMAIL_REGEX.pattern
+    regex_any_start = re.compile(EMAIL_REGEX.pattern.replace(lookbehind, b""), flags=EMAIL_REGEX.flags)
+    rand = random.Random(0)  # noqa: S311
+    for _ in range(2_000):
+        data = "".join(rand.choices(FRAGMENTS, k=rand.randint(1, 12))).encode("utf-8")
+        assert bool(EMAIL_REGEX.search(data)) == bool(regex_any_start.search(data)), data
@@ -0,0 +1,84 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on sharding of scripts and results files."""
+
+from pathlib import Path
+
+from weechat_script_lint.results import (
+    ResultsWriter,
+    in_shard,
+    merge_results_files,
+    read_results_file,
+    record_to_script,
+    script_to_record,
+)
+from weechat_script_lint.script import WeechatScript
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def test_in_shard() -> None:
+    """Test in_shard function."""
+    paths = sorted(SCRIPTS_DIR.glob("*.py"))
+    for num_shards in (1, 2, 3, 7):
+        shards = [[path for path in paths if in_shard(path, shard, num_shards)] for shard in range(1, num_shards + 1)]
+        # each script is in exactly one shard
+        assert sorted(path for shard in shards for path in shard) == paths
+    # the shard depends only on the path
+    path = Path("scripts/script.py")
+    assert in_shard(path, 1, 2) == in_shard(Path("scripts/script.py"), 1, 2)
+    assert in_shard(path, 1, 2) != in_shard(path, 2, 2)
+
+
+def test_record() -> None:
+    """Test conversion of a script to a record and back."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+    script = WeechatScript(path)
+    script.check()
+    record = script_to_record(3, path, script)
+    assert record["index"] == 3
+    assert record["path"] == str(path)
+    assert len(record["messages"]) == 16
+    index, path2, script2 = record_to_script(record)
+    assert index == 3
+    assert path2 == path
+    assert script2.path == script.path
+    assert str(script2) == str(script)
+    assert script2.count == script.count
+    assert script2.score == script.score
+
+
+def test_merge_results_files(tmp_path) -> None:
+    """Test writing and merge of results files."""
+    paths = sorted(SCRIPTS_DIR.glob("*.py"))
+    results_files = [tmp_path / "shard1.jsonl", tmp_path / "shard2.jsonl"]
+    writers = [ResultsWriter(results_file) for results_file in results_files]
+    for index, path in enumerate(paths):
+        script = WeechatScript(path)
+        script.check()
+        writers[index % 2].add_script(index, path, script)
+    for writer in writers:
+        writer.close(0, 0, {})
+    assert len(list(read_results_file(results_files[0]))) == (len(paths) + 1) // 2
+    merged = list(merge_results_files(results_files))
+    assert [index for index, _, _ in merged] == list(range(len(paths)))
+    assert [path for _, path, _ in merged] == paths
@@ -0,0 +1,190 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on custom rules."""
+
+import pytest
+
+from weechat_script_lint.rules import CustomRule, CustomRules, RulesError, load_rules, tomllib
+from weechat_script_lint.script import WeechatScript
+
+requires_toml = pytest.mark.skipif(tomllib is None, reason="tomllib or tomli is required")
+
+
+def get_custom_messages(script: WeechatScript) -> list[tuple[int, str, str]]:
+    """Return the messages of custom rules found in a script."""
+    return [(msg.line, msg.msg_name, msg.text) for msg in script.messages if msg.msg_name.startswith("custom_")]
+
+
+RULES = r"""
+[rules.custom_hook_fd]
+level = "warning"
+score = -5
+message = "function {function} is not allowed"
+pattern = '(?P<function>hook_fd)\s*\('
+suffixes = [".py"]
+
+[rules.custom_print_date]
+level = "info"
+message = "print_date_tags found: {match}"
+pattern = 'print_date_tags'
+unless = 'get_date'
+
+[rules.custom_pl_only]
+level = "error"
+message = "perl only"
+pattern = 'weechat'
+suffixes = [".pl"]
+"""
+
+
+@requires_toml
+def test_load_rules(tmp_path) -> None:
+    """Test load_rules function and check of custom rules."""
+    rules_file = tmp_path / "rules.toml"
+    rules_file.write_text(RULES)
+    rules = load_rules(rules_file)
+    assert [rule.name for rule in rules.rules] == ["custom_hook_fd", "custom_print_date", "custom_pl_only"]
+
+    path = tmp_path / "script.py"
+    path.write_text(
+        "import weechat\n"
+        "weechat.hook_fd(1, 1, 0, 0, 'cb', '')\n"
+        "weechat.print_date_tags('', 0, '', 'test')\n"
+        "weechat.hook_fd (2, 1, 0, 0, 'cb', '')\n",
+    )
+    script = WeechatScript(path, rules=rules)
+    script.check()
+    assert get_custom_messages(script) == [
+        (2, "custom_hook_fd", "function hook_fd is not allowed"),
+        (4, "custom_hook_fd", "function hook_fd is not allowed"),
+        (3, "custom_print_date", "print_date_tags found: print_date_tags"),
+    ]
+    script_without_rules = WeechatScript(path)
+    script_without_rules.check()
+    assert script.score == script_without_rules.score - 5 - 5 - 1
+
+    # "unless" found: rule not reported
+    path.write_text("weechat.print_date_tags('', weechat.get_date(), '', 'test')\n")
+    script = WeechatScript(path, rules=rules)
+    script.check()
+    assert get_custom_messages(script) == []
+
+
+def test_custom_rules(tmp_path) -> None:
+    """Test CustomRules class."""
+    rules = CustomRules(
+        [
+            CustomRule("custom_a", "warning", score=-1, message="a", pattern="infolist_get"),
+            CustomRule("custom_b", "info", score=-1, message="b", pattern="INFOLIST", ignore_case=True),
+        ],
+    )
+    # each rule finds its texts, even if already found by another rule
+    rules.register()
+    path = tmp_path / "script.py"
+    path.write_text("weechat.infolist_get('buffer', '', '')\nweechat.INFOLIST\n")
+    script = WeechatScript(path, rules=rules)
+    script.check()
+    assert get_custom_messages(script) == [(1, "custom_a", "a"), (1, "custom_b", "b"), (2, "custom_b", "b")]
+
+
+def test_custom_rules_independent(tmp_path) -> None:
+    """Test custom rules with regular expressions valid only when compiled alone."""
+    rules = CustomRules(
+        [
+            # overlapping rules
+            CustomRule("custom_hook", "warning", score=-1, message="{match}", pattern=r"hook_\w+"),
+            CustomRule("custom_fd", "warning", score=-1, message="fd", pattern="hook_fd"),
+            # same named group in two rules
+            CustomRule("custom_f1", "info", score=-1, message="{f}", pattern="hook_(?P<f>fd)"),
+            CustomRule("custom_f2", "info", score=-1, message="{f}", pattern="hook_(?P<f>timer)"),
+            # inline flag
+            CustomRule("custom_flag", "info", score=-1, message="flag", pattern="(?i)HOOK_FD"),
+            # backreference
+            CustomRule("custom_secret", "error", score=-1, message="{match}", pattern=r"([\"'])secret\1"),
+        ],
+    )
+    rules.register()
+    path = tmp_path / "script.py"
+    path.write_text("weechat.hook_fd(1)\nweechat.hook_timer(1)\nx = 'secret\"\ny = 'secret'\n")
+    script = WeechatScript(path, rules=rules)
+    script.check()
+    assert get_custom_messages(script) == [
+        (4, "custom_secret", "'secret'"),
+        (1, "custom_hook", "hook_fd"),
+        (2, "custom_hook", "hook_timer"),
+        (1, "custom_fd", "fd"),
+        (1, "custom_f1", "fd"),
+        (2, "custom_f2", "timer"),
+        (1, "custom_flag", "flag"),
+    ]
+
+
+def test_custom_rules_unless(tmp_path) -> None:
+    """Test "unless" of custom rules: ignored in the texts matched by the pattern."""
+    rule = CustomRule("custom_a", "warning", score=-1, message="a", pattern="print_date_tags", unless="date")
+    CustomRules([rule]).register()
+    path = tmp_path / "script.py"
+    path.write_text("weechat.print_date_tags('', 0, '', 'test')\n")
+    script = WeechatScript(path, rules=CustomRules([rule]))
+    script.check()
+    assert get_custom_messages(script) == [(1, "custom_a", "a")]
+    path.write_text("weechat.print_date_tags('', date, '', 'test')\n")
+    script = WeechatScript(path, rules=CustomRules([rule]))
+    script.check()
+    assert get_custom_messages(script) == []
+
+
+@pytest.mark.parametrize(
+    ("content", "error"),
+    [
+        ("[rules.custom\n", "unable to read rules file"),
+        ('[rules.Custom]\nmessage = "a"\npattern = "a"\n', "invalid name"),
+        ('[rules.missing_email]\nmessage = "a"\npattern = "a"\n', "already used"),
+        ('[rules.custom]\nlevel = "fatal"\nmessage = "a"\npattern = "a"\n', "invalid level"),
+        ('[rules.custom]\nmessage = "a"\n', "missing key 'pattern'"),
+        ('[rules.custom]\nscore = "x"\nmessage = "a"\npattern = "a"\n', "invalid value for score"),
+        ('[rules.custom]\nscore = true\nmessage = "a"\npattern = "a"\n', "invalid value for score"),
+        ('[rules.custom]\nscore = 5\nmessage = "a"\npattern = "a"\n', "invalid score"),
+        ('[rules.custom]\nlevel = 1\nmessage = "a"\npattern = "a"\n', "invalid value for level"),
+        ('[rules.custom]\nmessage = 1\npattern = "a"\n', "invalid value for message"),
+        ('[rules.custom]\nmessage = "a"\npattern = "a"\nsuffixes = ".py"\n', "invalid value for suffixes"),
+        ('[rules.custom]\nmessage = "a"\npattern = "a"\nsuffixes = [1]\n', "invalid value for suffixes"),
+        ('[rules.custom]\nmessage = "a"\npattern = "a"\nignore_case = "false"\n', "invalid value for ignore_case"),
+        ('[rules.custom]\nmessage = "found {func}"\npattern = "a"\n', "unknown argument in message: \\{func\\}"),
+        ('[rules.custom]\nmessage = "found {}"\npattern = "a"\n', "unknown argument in message"),
+        ('[rules.custom]\nmessage = "found {match.x}"\npattern = "a"\n', "unknown argument in message"),
+        ('[rules.custom]\nmessage = "found {match:d}"\npattern = "a"\n', "invalid message"),
+        ('[rules.custom]\nmessage = "found {"\npattern = "a"\n', "invalid message"),
+        ('[rules.custom]\nmessage = "a"\npattern = "("\n', "invalid regular expression"),
+        ('[rules.custom]\nmessage = "a"\npattern = "a"\nunless = "(?u)a"\n', "invalid regular expression"),
+        ('[rules.custom]\nmessage = "a"\npattern = "(?P<a>a)(?P<a>b)"\n', "invalid regular expression"),
+    ],
+)
+@requires_toml
+def test_load_rules_errors(tmp_path, content, error) -> None:
+    """Test errors in rules file."""
+    rules_file = tmp_path / "rules.toml"
+    rules_file.write_text(content)
+    with pytest.raises(RulesError, match=error):
+        load_rules(rules_file)
+    with pytest.raises(RulesError, match="unable to read rules file"):
+        load_rules(tmp_path / "missing.toml")
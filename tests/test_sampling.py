@@ -0,0 +1,96 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on sampling of scripts."""
+
+import math
+import os
+from pathlib import Path
+
+import pytest
+
+from weechat_script_lint.sampling import Sampler, get_sample_key
+from weechat_script_lint.script import WeechatScript
+
+PATHS = [Path(f"dir/script{i}.py") for i in range(1000)]
+STAT = os.stat_result((0,) * 10)
+
+
+def select(sampler: Sampler, paths: list[Path]) -> list[Path]:
+    """Return paths selected by a sampler."""
+    return [path for _, path, _ in sampler.select((index, path, STAT) for index, path in enumerate(paths))]
+
+
+def test_get_sample_key() -> None:
+    """Test function get_sample_key."""
+    assert 0 <= get_sample_key(PATHS[0], 0) < 1
+    assert get_sample_key(PATHS[0], 0) == get_sample_key(PATHS[0], 0)
+    assert get_sample_key(PATHS[0], 0) != get_sample_key(PATHS[0], 1)
+    assert get_sample_key(PATHS[0], 0) != get_sample_key(PATHS[1], 0)
+
+
+def test_sampler_select() -> None:
+    """Test selection of scripts."""
+    sampler = Sampler(fraction=0.1)
+    sample = select(sampler, PATHS)
+    assert sampler.population == len(PATHS)
+    assert 50 < len(sample) < 150
+    # same sample whatever the order of scripts, scripts are in the same order
+    assert select(Sampler(fraction=0.1), PATHS[::-1]) == sample[::-1]
+    assert select(Sampler(fraction=0.1, seed=1), PATHS) != sample
+
+    sampler = Sampler(count=100)
+    sample = select(sampler, PATHS)
+    assert sampler.population == len(PATHS)
+    assert len(sample) == 100
+    assert sample == sorted(sample, key=PATHS.index)
+    assert select(Sampler(count=100), PATHS[::-1]) == sample[::-1]
+    # the scripts with the lowest keys are selected
+    assert set(sample) == set(sorted(PATHS, key=lambda path: get_sample_key(path, 0))[:100])
+    assert select(Sampler(count=2000), PATHS) == PATHS
+
+
+def test_sampler_estimate() -> None:
+    """Test estimates of results on all scripts."""
+    sampler = Sampler(fraction=1)
+    assert math.isnan(sampler.estimate("error")[1])
+    assert math.isnan(sampler.estimate_proportion("issues")[1])
+    sampler.population = 100
+    for score in (100, 100, 90, 50):
+        script = WeechatScript(Path("script.py"), content=b"")
+        script.score = score
+        script.count["error"] = 1 if score < 100 else 0
+        sampler.add_script(script)
+    value, low, high = sampler.estimate("error", scale=sampler.population)
+    assert value == pytest.approx(50)
+    assert 0 <= low < value < high
+    value, low, high = sampler.estimate("score", maximum=100)
+    assert value == pytest.approx(85)
+    assert low < value < high <= 100
+    # score 0-49: no script in the sample, but the interval is not empty
+    value, low, high = sampler.estimate_proportion("score_0_49")
+    assert value == 0
+    assert low == pytest.approx(0)
+    assert high > 10
+    # all scripts in the sample: exact values
+    sampler.population = 4
+    assert sampler.estimate("error", scale=4) == (2, 2, 2)
+    assert sampler.estimate_proportion("score_100_100") == (50, 50, 50)
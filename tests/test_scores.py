@@ -0,0 +1,50 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on aggregation of scores."""
+
+from pathlib import Path
+
+from weechat_script_lint.scores import ScoreAggregator
+
+
+def test_score_aggregator() -> None:
+    """Test ScoreAggregator class."""
+    scores = ScoreAggregator(worst=3)
+    assert scores.scores() == []
+    assert scores.worst() == []
+    assert scores.average == 100.0
+    for index, score in enumerate([100, 80, 0, 95, 80, 100, 80, 42]):
+        scores.add(index, Path(f"script{index}.py"), score)
+    assert scores.num_scripts == 8
+    assert scores.average == 72.125
+    assert scores.scores() == [(100, 2), (95, 1), (80, 3), (42, 1), (0, 1)]
+    assert scores.worst() == [
+        (Path("script2.py"), 0),
+        (Path("script7.py"), 42),
+        (Path("script1.py"), 80),
+    ]
+
+    # no worst scripts kept
+    scores = ScoreAggregator()
+    scores.add(0, Path("script.py"), 50)
+    assert scores.scores() == [(50, 1)]
+    assert scores.worst() == []
@@ -21,9 +21,12 @@
 
 """Tests on WeechatScript class."""
 
+import mmap
+import pickle
 from pathlib import Path
 
-from weechat_script_lint.script import WeechatScript
+import weechat_script_lint.script
+from weechat_script_lint.script import WeechatScript, find_invalid_utf8, read_script
 
 SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
 
@@ -118,9 +121,188 @@ def test_script_empty_file() -> None:
     assert script.use_colors is True
     assert not script.messages
     assert script.count == {"error": 0, "warning": 0, "info": 0}
-    assert script.script == ""
+    assert script.script == b""
     script.check()
     assert str(script)
     assert script.count == {"error": 1, "warning": 0, "info": 2}
     assert len(script.get_report(False).split("\n")) == 3
     assert script.get_report(True) == "script_empty.py"
+
+
+def test_script_check_steps(tmp_path) -> None:
+    """Tests on check of a script in steps."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+    num_checks = len(WeechatScript(path).get_checks())
+
+    # no limit: a single step
+    script = WeechatScript(path)
+    steps = list(script.check_steps())
+    assert len(steps) == 1
+    assert [(msg.level, msg.line, msg.msg_name) for msg in steps[0]] == ALL_ERRORS
+
+    # one part of check per step: line checks are done line by line
+    script = WeechatScript(path)
+    steps = list(script.check_steps(max_bytes=1))
+    num_lines = len(script.get_line_windows(1))
+    num_line_checks = len([name for name in script.get_check_names() if script.is_line_check(name)])
+    assert num_line_checks == 3
+    assert len(steps) == num_checks + num_line_checks * (num_lines - 1)
+    messages = [msg for step in steps for msg in step]
+    assert messages == script.messages
+    assert [(msg.level, msg.line, msg.msg_name) for msg in messages] == ALL_ERRORS
+    assert script.count == {"error": 4, "warning": 8, "info": 4}
+    assert script.score == 0
+
+    # time limit
+    script = WeechatScript(path)
+    steps = list(script.check_steps(max_time=0.000001))
+    assert 1 <= len(steps) <= num_checks
+    assert [(msg.level, msg.line, msg.msg_name) for step in steps for msg in step] == ALL_ERRORS
+
+    # big script: line checks split in windows, same messages as a single check
+    path = tmp_path / "script.py"
+    lines = (
+        b'weechat.hook_signal("*,irc_outtags_privmsg", "cb", "")\nweechat.hook_signal("*,irc_out_privmsg", "cb", "")\n'
+    )
+    path.write_bytes((SCRIPTS_DIR / "script_valid.py").read_bytes() + lines * 100)
+    full = WeechatScript(path)
+    full.check()
+    script = WeechatScript(path)
+    steps = list(script.check_steps(max_bytes=1000))
+    assert len(steps) > len(path.read_bytes()) // 1000
+    assert [(msg.line, msg.msg_name) for msg in script.messages] == [(msg.line, msg.msg_name) for msg in full.messages]
+    assert len(full.messages) == 200
+    assert script.count == full.count
+    assert script.score == full.score
+
+
+def test_script_check_modes() -> None:
+    """Tests on check of a script with evaluation modes "any" and "score"."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+
+    # stop after the first message, except for errors (all counted)
+    errors = [name for level, _, name in ALL_ERRORS if level == "error"]
+    script = WeechatScript(path, mode="any")
+    script.check()
+    assert script.stopped
+    assert [msg.msg_name for msg in script.messages] == errors
+    assert script.count == {"error": len(errors), "warning": 0, "info": 0}
+    assert script.get_report(True) == "script_all_errors.py"
+
+    # stop when the score reaches 0
+    script = WeechatScript(path, mode="score")
+    script.check()
+    assert script.stopped
+    assert script.score == 0
+    names = [msg.msg_name for msg in script.messages]
+    assert names == [name for _, _, name in ALL_ERRORS[: len(names)]]
+    assert len(names) < len(ALL_ERRORS)
+
+    # only reported messages stop the checks, line numbers are not computed
+    script = WeechatScript(path, msg_level="warning", ignore="missing_email", mode="any")
+    script.check()
+    assert [(msg.level, msg.line, msg.msg_name) for msg in script.messages] == [
+        ("error", 0, "missing_infolist_free"),
+        ("error", 0, "python2_bin"),
+        ("error", 1, "mixed_tabs_spaces"),
+    ]
+
+    # warning first: checks are stopped, but errors are all counted
+    script = WeechatScript(path, ignore=",".join(errors[1:]), mode="any")
+    script.message("warning", "sys_exit")
+    script.check()
+    assert [msg.msg_name for msg in script.messages] == ["sys_exit", "missing_email"]
+
+    # same result displayed and same number of errors as with all checks
+    for path in sorted(SCRIPTS_DIR.glob("*.py")):
+        full = WeechatScript(path)
+        full.check()
+        script_any = WeechatScript(path, mode="any")
+        script_any.check()
+        assert bool(script_any.messages) == bool(full.messages)
+        assert script_any.count["error"] == full.count["error"]
+        script_score = WeechatScript(path, mode="score")
+        script_score.check()
+        assert script_score.score == full.score
+        assert script_score.count["error"] == full.count["error"]
+
+
+def test_script_python_facts() -> None:
+    """Tests on checks of Python scripts using facts: comments and strings are ignored."""
+    content = b"""import sys
+from sys import exit as quit_now
+# sys.exit() and weechat.info_get("python2_bin", "")
+text = "sys.exit() weechat.infolist_get()"
+weechat.info_get("python2_bin", "")
+quit_now(0)
+\t\"\"\"
+    sys.exit(1)\"\"\"
+"""
+
+    def get_messages(content: bytes) -> list[tuple[int, str]]:
+        script = WeechatScript(Path("script.py"), msg_level="warning", ignore="missing_email", content=content)
+        script.check()
+        return [(msg.line, msg.msg_name) for msg in script.messages]
+
+    assert get_messages(content) == [(5, "python2_bin"), (6, "sys_exit")]
+    # script which can not be tokenized: facts are still found around the names
+    assert get_messages(content + b"x = (\n") == [(5, "python2_bin"), (6, "sys_exit")]
+    # infolist_free called only in a comment
+    content = b"infolist = weechat.infolist_get('buffer', '', '')\n# weechat.infolist_free(infolist)\n"
+    assert get_messages(content) == [(1, "missing_infolist_free")]
+    assert get_messages(content.replace(b"# ", b"")) == []
+
+
+def test_script_invalid_utf8(tmp_path) -> None:
+    """Tests on a script with invalid UTF-8 data."""
+    path = tmp_path / "script_invalid_utf8.py"
+    path.write_bytes((SCRIPTS_DIR / "script_valid.py").read_bytes() + b"# caf\xe9\n")
+    script = WeechatScript(path)
+    script.check()
+    errors = [(msg.level, msg.line, msg.msg_name) for msg in script.messages]
+    assert errors == [("error", 12, "invalid_utf8")]
+    assert script.score == 80
+
+    # Latin-1 script which can not be tokenized: checks use the text
+    path.write_bytes(b"import sys\n\nimport weechat\n# caf\xe9\nsys.exit(0)\n")
+    script = WeechatScript(path)
+    script.check()
+    errors = [(msg.level, msg.line, msg.msg_name) for msg in script.messages]
+    assert ("error", 4, "invalid_utf8") in errors
+    assert ("warning", 5, "sys_exit") in errors
+
+
+def test_find_invalid_utf8(monkeypatch) -> None:
+    """Tests on function find_invalid_utf8."""
+    assert find_invalid_utf8(b"") == -1
+    assert find_invalid_utf8(b"test") == -1
+    assert find_invalid_utf8("café ☕".encode()) == -1
+    assert find_invalid_utf8(b"caf\xe9") == 3
+    assert find_invalid_utf8(b"abc\xc3") == 3
+    assert find_invalid_utf8(b"\xff") == 0
+
+    # small chunks: multi-byte chars split between chunks
+    monkeypatch.setattr(weechat_script_lint.script, "UTF8_CHUNK_SIZE", 2)
+    assert find_invalid_utf8("aébc".encode()) == -1
+    assert find_invalid_utf8("a☕bcdef".encode()) == -1
+    assert find_invalid_utf8(b"ab\xffcd") == 2
+    assert find_invalid_utf8(b"a\xc3bc") == 1
+    assert find_invalid_utf8(b"abc\xc3") == 3
+
+
+def test_script_mmap(monkeypatch) -> None:
+    """Tests on a script memory-mapped."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+    monkeypatch.setattr(weechat_script_lint.script, "MMAP_MIN_SIZE", 1)
+    content = read_script(path)
+    assert isinstance(content, mmap.mmap)
+    script = WeechatScript(path)
+    assert isinstance(script.script, mmap.mmap)
+    script.check()
+    assert [(msg.level, msg.line, msg.msg_name) for msg in script.messages] == ALL_ERRORS
+
+    # pickle of script copies the content
+    script2 = pickle.loads(pickle.dumps(WeechatScript(path)))  # noqa: S301
+    assert script2.script == path.read_bytes()
+    script2.check()
+    assert [(msg.level, msg.line, msg.msg_name) for msg in script2.messages] == ALL_ERRORS
@@ -0,0 +1,195 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on language server."""
+
+import io
+import json
+import random
+from pathlib import Path
+
+from weechat_script_lint.script import PYTHON_CHECKS
+from weechat_script_lint.server import (
+    Document,
+    LanguageServer,
+    char_index,
+    line_length,
+    read_message,
+    split_lines,
+    uri_to_path,
+    write_message,
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def get_messages(document: Document) -> list[tuple[int, str, str]]:
+    """Return messages of a document, sorted by line."""
+    diagnostics = document.get_diagnostics()
+    return sorted((diag["range"]["start"]["line"], diag["code"], diag["message"]) for diag in diagnostics)
+
+
+def test_split_lines() -> None:
+    """Test split_lines function."""
+    assert split_lines("") == [""]
+    assert split_lines("a") == ["a"]
+    assert split_lines("a\n") == ["a\n", ""]
+    assert split_lines("a\r\nb\rc\nd") == ["a\r\n", "b\r", "c\n", "d"]
+
+
+def test_positions() -> None:
+    """Test conversion of positions."""
+    assert uri_to_path("file:///home/user/my%20script.py") == Path("/home/user/my script.py")
+    line = "aé\U0001f600b\n"
+    assert char_index(line, 2, "utf-32") == 2
+    assert char_index(line, 3, "utf-8") == 2
+    assert char_index(line, 2, "utf-16") == 2
+    assert char_index(line, 4, "utf-16") == 3
+    assert char_index(line, 99, "utf-16") == 4
+    assert line_length(line, "utf-32") == 4
+    assert line_length(line, "utf-8") == 8
+    assert line_length(line, "utf-16") == 5
+
+
+def test_document_incremental() -> None:
+    """Test incremental check of a document: same messages as a full check."""
+    text = (SCRIPTS_DIR / "script_all_errors.py").read_text()
+    document = Document("file:///tmp/script.py", text)
+    assert get_messages(document) == get_messages(Document("file:///tmp/script.py", text))
+    assert any(code == "sys_exit" for _, code, _ in get_messages(document))
+    pieces = [
+        "",
+        "\n",
+        "import sys\n",
+        "sys.exit(0)\n",
+        "weechat.hook_modifier(\n'irc_in_privmsg', 'cb', '')\n",
+        "\thello",
+        "# http://www.weechat.org/\n",
+        "weechat.infolist_get('buffer', '', '')\n",
+        "weechat.infolist_free(infolist)\n",
+        "# SPDX-License-Identifier: GPL-3.0-or-later\n",
+        "weechat.hook_process('url:https://weechat.org', 1000, 'cb', '')\n",
+        "weechat.hook_url('https://weechat.org', {}, 1000, 'cb', '')\n",
+        "#!/usr/bin/env python\n",
+        "flashcode@flashtux.org",
+    ]
+    rand = random.Random(42)  # noqa: S311
+    for _ in range(300):
+        start_line = rand.randrange(len(document.lines))
+        end_line = min(len(document.lines) - 1, start_line + rand.randrange(3))
+        start = {"line": start_line, "character": rand.randrange(len(document.lines[start_line]) + 1)}
+        end = {"line": end_line, "character": rand.randrange(len(document.lines[end_line]) + 1)}
+        if end_line == start_line and end["character"] < start["character"]:
+            start, end = end, start
+        document.apply_change(start, end, rand.choice(pieces))
+        document.update()
+        assert get_messages(document) == get_messages(Document("file:///tmp/script.py", "".join(document.lines)))
+
+
+def test_document_update() -> None:
+    """Test checks done after a change in a document."""
+    document = Document("file:///tmp/script.py", "import sys\n\nsys.exit(0)\n")
+    assert [code for _, code, _ in get_messages(document)] == [
+        "missing_email",
+        "missing_spdx_copyright",
+        "missing_spdx_license",
+        "sys_exit",
+    ]
+    # checks of Python script done again on the whole document
+    document.apply_change({"line": 1, "character": 0}, {"line": 1, "character": 0}, "\n\n")
+    assert document._pending == PYTHON_CHECKS  # noqa: SLF001
+    assert get_messages(document)[-1] == (4, "sys_exit", "sys.exit() causes WeeChat to exit itself")
+    document.update()
+    assert get_messages(document)[-1] == (4, "sys_exit", "sys.exit() causes WeeChat to exit itself")
+    # e-mail added: check done again
+    document.apply_change({"line": 0, "character": 0}, {"line": 0, "character": 0}, "# flashcode@flashtux.org\n")
+    assert document._pending == {"_check_email", *PYTHON_CHECKS}  # noqa: SLF001
+    document.update()
+    assert "missing_email" not in [code for _, code, _ in get_messages(document)]
+    # no check on whole document needed
+    document = Document("file:///tmp/script.pl", "# comment\n\n\nweechat::infolist_get();\n")
+    document.apply_change({"line": 0, "character": 0}, {"line": 0, "character": 0}, "\n\n")
+    assert not document._pending  # noqa: SLF001
+    assert (5, "missing_infolist_free", "missing call to infolist_free") in get_messages(document)
+
+
+def send(*messages: dict) -> io.BytesIO:
+    """Return an input stream with JSON-RPC messages."""
+    stream = io.BytesIO()
+    for message in messages:
+        write_message(stream, message)
+    stream.seek(0)
+    return stream
+
+
+def receive(stream: io.BytesIO) -> list[dict]:
+    """Return JSON-RPC messages written in an output stream."""
+    stream.seek(0)
+    messages = []
+    while (message := read_message(stream)) is not None:
+        messages.append(message)
+    return messages
+
+
+def test_language_server() -> None:
+    """Test language server."""
+    uri = "file:///tmp/script.py"
+    reader = send(
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"capabilities": {}}},
+        {"jsonrpc": "2.0", "method": "initialized", "params": {}},
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didOpen",
+            "params": {"textDocument": {"uri": uri, "languageId": "python", "version": 1, "text": "sys.exit(0)\n"}},
+        },
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": uri, "version": 2},
+                "contentChanges": [
+                    {"range": {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 11}}, "text": ""},
+                ],
+            },
+        },
+        {"jsonrpc": "2.0", "method": "textDocument/didClose", "params": {"textDocument": {"uri": uri}}},
+        {"jsonrpc": "2.0", "id": 2, "method": "unknown"},
+        {"jsonrpc": "2.0", "id": 3, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    )
+    writer = io.BytesIO()
+    server = LanguageServer(reader, writer, msg_level="warning")
+    assert server.run() == 0
+    responses = receive(writer)
+    assert len(responses) == 6
+    assert responses[0]["id"] == 1
+    assert responses[0]["result"]["capabilities"]["positionEncoding"] == "utf-16"
+    assert [diag["code"] for diag in responses[1]["params"]["diagnostics"]] == ["missing_email", "sys_exit"]
+    assert [diag["code"] for diag in responses[2]["params"]["diagnostics"]] == ["missing_email"]
+    assert responses[3]["params"] == {"uri": uri, "diagnostics": []}
+    assert responses[4]["error"]["code"] == -32601
+    assert responses[5] == {"jsonrpc": "2.0", "id": 3, "result": None}
+
+    # end of input without shutdown
+    reader = io.BytesIO(b"Content-Type: text/plain\r\n\r\n{}")
+    writer = io.BytesIO()
+    assert LanguageServer(reader, writer).run() == 1
+    assert json.loads(writer.getvalue().split(b"\r\n\r\n")[1])["error"]["code"] == -32700
@@ -0,0 +1,74 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on columnar store of messages."""
+
+from pathlib import Path
+
+from weechat_script_lint.script import WeechatScript
+from weechat_script_lint.store import ResultStore
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def test_result_store() -> None:
+    """Test ResultStore class."""
+    store = ResultStore()
+    assert len(store) == 0
+    assert list(store) == []
+    assert list(store.by_path()) == []
+    assert store.count() == {"error": 0, "warning": 0, "info": 0}
+
+    scripts = []
+    for path in sorted(SCRIPTS_DIR.glob("*.py")):
+        script = WeechatScript(path)
+        script.check()
+        store.add_script(script)
+        scripts.append(script)
+    messages = [msg for script in scripts for msg in script.messages]
+    assert len(store) == len(messages)
+    assert [msg.as_str() for msg in store] == [msg.as_str() for msg in messages]
+
+    # paths are stored once, only for scripts with messages
+    assert store.paths == [script.path for script in scripts if script.messages]
+
+    # filters
+    assert [msg.as_str() for msg in store.filter(level="warning")] == [
+        msg.as_str() for msg in messages if msg.level == "warning"
+    ]
+    assert [msg.as_str() for msg in store.filter(msg_name="missing_email")] == [
+        msg.as_str() for msg in messages if msg.msg_name == "missing_email"
+    ]
+    assert list(store.filter(level="info", msg_name="missing_email")) == []
+
+    # counters
+    count = {"error": 0, "warning": 0, "info": 0}
+    for script in scripts:
+        for level, num in script.count.items():
+            count[level] += num
+    assert store.count() == count
+
+    # messages grouped by script
+    groups = list(store.by_path())
+    assert [path for path, _ in groups] == store.paths
+    assert [[msg.as_str() for msg in msgs] for _, msgs in groups] == [
+        [msg.as_str() for msg in script.messages] for script in scripts if script.messages
+    ]
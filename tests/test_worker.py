@@ -0,0 +1,199 @@
+#
+# SPDX-FileCopyrightText: 2026 Sébastien Helleu <flashcode@flashtux.org>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# This file is part of weechat-script-lint.
+#
+# Weechat-script-lint is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# Weechat-script-lint is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with weechat-script-lint.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests on check of scripts in worker processes or threads."""
+
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from weechat_script_lint import worker as worker_module
+from weechat_script_lint.rules import CustomRule, CustomRules
+from weechat_script_lint.script import MESSAGES, WeechatScript
+from weechat_script_lint.worker import (
+    check_in_process,
+    check_in_threads,
+    check_in_workers,
+    get_executor,
+    in_order,
+    is_gil_disabled,
+    worker_loop,
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+class SlowScript(WeechatScript):
+    """A script taking a very long time to check."""
+
+    def _check_slow(self) -> None:
+        """Simulate a pathological check."""
+        time.sleep(60)
+
+
+class FailingScript(WeechatScript):
+    """A script raising an exception during check."""
+
+    def _check_fail(self) -> None:
+        """Simulate a bug in a check."""
+        raise ValueError
+
+
+def test_check_in_process() -> None:
+    """Test check_in_process function."""
+    path = SCRIPTS_DIR / "script_all_errors.py"
+    results = list(check_in_process([("key", WeechatScript(path))]))
+    assert len(results) == 1
+    assert results[0][0] == "key"
+    assert results[0][1].count == {"error": 4, "warning": 8, "info": 4}
+
+
+def test_check_in_workers() -> None:
+    """Test check_in_workers function."""
+    paths = sorted(SCRIPTS_DIR.glob("*.py"))
+    expected = {}
+    for path in paths:
+        script = WeechatScript(path)
+        script.check()
+        expected[path] = [(msg.level, msg.line, msg.msg_name) for msg in script.messages]
+    tasks = [(path, WeechatScript(path)) for path in paths]
+    results = {
+        path: [(msg.level, msg.line, msg.msg_name) for msg in script.messages]
+        for path, script in check_in_workers(tasks, jobs=2)
+    }
+    assert results == expected
+
+
+def test_check_in_workers_timeout() -> None:
+    """Test check_in_workers function with a timeout."""
+    path = SCRIPTS_DIR / "script_valid.py"
+    tasks = [
+        ("slow", SlowScript(path)),
+        ("valid", WeechatScript(path)),
+    ]
+    start = time.monotonic()
+    results = dict(check_in_workers(tasks, timeout=0.5))
+    assert time.monotonic() - start < 30
+    assert [msg.msg_name for msg in results["slow"].messages] == ["file_timeout"]
+    assert results["slow"].count == {"error": 1, "warning": 0, "info": 0}
+    assert results["slow"].score == 0
+    assert not results["valid"].messages
+    assert results["valid"].score == 100
+
+
+def test_check_in_workers_cancel(monkeypatch) -> None:
+    """Test check_in_workers function stopped early: checks in progress are cancelled."""
+    workers = []
+
+    class SpyWorker(worker_module.Worker):
+        """Worker recorded on creation."""
+
+        def __init__(self) -> None:
+            """Start a worker process and record it."""
+            super().__init__()
+            workers.append(self)
+
+    monkeypatch.setattr(worker_module, "Worker", SpyWorker)
+    path = SCRIPTS_DIR / "script_valid.py"
+    tasks = [
+        ("slow1", SlowScript(path)),
+        ("slow2", SlowScript(path)),
+        ("valid", WeechatScript(path)),
+    ]
+    start = time.monotonic()
+    checked = check_in_workers(tasks, jobs=3)
+    key, _ = next(checked)
+    assert key == "valid"
+    checked.close()
+    assert time.monotonic() - start < 30
+    assert len(workers) == 3
+    assert not any(worker.process.is_alive() for worker in workers)
+
+
+def test_check_in_workers_exception() -> None:
+    """Test check_in_workers function with an exception raised in check."""
+    path = SCRIPTS_DIR / "script_valid.py"
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(check_in_workers([("fail", FailingScript(path))]))
+
+
+def test_worker_loop_rules(monkeypatch) -> None:
+    """Test registration of custom rules in a worker process not forked."""
+    # messages of a process started with "spawn": custom rules not registered
+    monkeypatch.setitem(MESSAGES, "error", dict(MESSAGES["error"]))
+    rules = CustomRules([CustomRule("custom_test", "error", score=-5, message="test", pattern="hook_process")])
+    conn, child_conn = multiprocessing.Pipe()
+    conn.send(WeechatScript(SCRIPTS_DIR / "script_hook_process.py", rules=rules))
+    conn.send(None)
+    worker_loop(child_conn)
+    success, (messages, *_) = conn.recv()
+    assert success
+    assert (messages[-1].msg_name, messages[-1].text) == ("custom_test", "test")
+    assert MESSAGES["error"]["custom_test"] == (-5, "test")
+
+
+def test_check_in_threads() -> None:
+    """Test check_in_threads function."""
+    paths = sorted(SCRIPTS_DIR.glob("*.py")) * 3
+    expected = []
+    for path in paths:
+        script = WeechatScript(path)
+        script.check()
+        expected.append([(msg.level, msg.line, msg.msg_name) for msg in script.messages])
+    tasks = [(index, WeechatScript(path)) for index, path in enumerate(paths)]
+    results = sorted(
+        (index, [(msg.level, msg.line, msg.msg_name) for msg in script.messages])
+        for index, script in check_in_threads(tasks, jobs=4)
+    )
+    assert [messages for _, messages in results] == expected
+    assert list(check_in_threads([], jobs=4)) == []
+
+
+def test_check_in_threads_exception() -> None:
+    """Test check_in_threads function with an exception raised in check."""
+    path = SCRIPTS_DIR / "script_valid.py"
+    tasks = [("valid", WeechatScript(path)), ("fail", FailingScript(path))]
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(check_in_threads(tasks, jobs=2))
+
+
+def test_get_executor(monkeypatch) -> None:
+    """Test get_executor and is_gil_disabled functions."""
+    assert is_gil_disabled() == (hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled())  # noqa: SLF001
+    assert get_executor("process") == "process"
+    assert get_executor("thread") == "thread"
+    monkeypatch.setattr("weechat_script_lint.worker.is_gil_disabled", lambda: False)
+    assert get_executor("auto") == "process"
+    monkeypatch.setattr("weechat_script_lint.worker.is_gil_disabled", lambda: True)
+    assert get_executor("auto") == "thread"
+    assert get_executor("auto", timeout=30) == "process"
+
+
+def test_in_order() -> None:
+    """Test in_order function."""
+    path = SCRIPTS_DIR / "script_valid.py"
+    scripts = {key: WeechatScript(path) for key in range(5)}
+    results = [(key, scripts[key]) for key in (3, 0, 4, 1, 2)]
+    assert list(in_order(results, range(5))) == sorted(scripts.items())
+    assert list(in_order([], range(5))) == []